@@ -6,4 +6,26 @@ import logging
 logging.disable(logging.WARNING)
 
 def pytest_configure():
-    settings.DEBUG = False 
\ No newline at end of file
+    settings.DEBUG = False
+    # Keep tests independent from a shared memcached instance
+    settings.CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+        }
+        for alias in ('default', 'responses', 'sessions', 'tokens')
+    }
+    # A second connection to the test database for the replica routing
+    # tests, only used when they list it in DATABASE_REPLICAS
+    settings.DATABASES['replica'] = {
+        **settings.DATABASES['default'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import caches
+    for cache in caches.all():
+        cache.clear()
+    yield 
\ No newline at end of file
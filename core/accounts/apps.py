@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core.accounts'
+
+    def ready(self):
+        import core.accounts.signals  # noqa: F401
@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from core.merchants.models import Merchant
+
+# User fields the views read on every request; others load on first access
+PRINCIPAL_FIELDS = ('id', 'username', 'is_active', 'is_staff', 'is_superuser')
+
+
+def partial_instance(model, values):
+    """A model instance as if loaded with only(*values), the rest deferred."""
+    fields = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, fields, [values[field] for field in fields])
+
+
+def principal_key(user_id):
+    return f'{settings.CACHE_KEY_PREFIX}principal:{user_id}'
+
+
+def invalidate_principal(user_id):
+    key = principal_key(user_id)
+    cache.delete(key)
+    # Again after commit, a concurrent request may have cached the old rows
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class PrincipalJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request user query: the principal
+    (the user's flags and merchant id) is cached for PRINCIPAL_CACHE_TTL
+    and dropped whenever the user or their merchant changes.
+
+    request.user is a User with only PRINCIPAL_FIELDS loaded and
+    request.user.merchant a Merchant with only its id; any other field is
+    read from the database on first access.
+    """
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def principal_queryset(self, user_id):
+        fields = [*PRINCIPAL_FIELDS, 'merchant__id']
+        if api_settings.CHECK_REVOKE_TOKEN:
+            fields.append('password')
+        return self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values(*fields)
+
+    def make_principal(self, row):
+        if row is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        principal = {field: row[field] for field in PRINCIPAL_FIELDS}
+        principal['merchant_id'] = row['merchant__id']
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # The hash of the hash, as in the token claim
+            principal['password'] = get_md5_hash_password(row['password'])
+        return principal
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        key = principal_key(user_id)
+        principal = cache.get(key)
+        if principal is None:
+            principal = self.make_principal(self.principal_queryset(user_id).first())
+            cache.set(key, principal, settings.PRINCIPAL_CACHE_TTL)
+        return self.build_user(principal, validated_token)
+
+    def build_user(self, principal, validated_token):
+        if not principal['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != principal['password']:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        user = partial_instance(self.user_model, {field: principal[field] for field in PRINCIPAL_FIELDS})
+        merchant = None
+        if principal['merchant_id']:
+            merchant = partial_instance(Merchant, {'id': principal['merchant_id'], 'user_id': user.pk})
+            Merchant.user.field.set_cached_value(merchant, user)
+        # hasattr(user, 'merchant') is answered without a query, even when None
+        self.user_model.merchant.related.set_cached_value(user, merchant)
+        return user
+
+
+class AsyncJWTAuthentication(PrincipalJWTAuthentication):
+    """
+    PrincipalJWTAuthentication for async views: the token is checked in the
+    event loop and the principal is read with the async cache and ORM.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        key = principal_key(user_id)
+        principal = await cache.aget(key)
+        if principal is None:
+            principal = self.make_principal(await self.principal_queryset(user_id).afirst())
+            await cache.aset(key, principal, settings.PRINCIPAL_CACHE_TTL)
+        return self.build_user(principal, validated_token)
@@ -0,0 +1,57 @@
+import logging
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# user id -> time of the last login not yet written, per process
+_pending = {}
+_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def record_login(user):
+    """
+    Set ``user.last_login`` without writing it: the logins of the process
+    are saved together by flush_logins, at most every LAST_LOGIN_FLUSH_INTERVAL.
+    """
+    user.last_login = timezone.now()
+    with _lock:
+        _pending[user.pk] = user.last_login
+
+
+def flush_logins(force=False):
+    """
+    Write the pending last_login values in one UPDATE if the flush interval
+    has passed (or ``force``), returning the number of users written. Runs
+    after each request and when a server worker exits.
+    """
+    global _flushed_at
+    with _lock:
+        if not _pending or not force and time.monotonic() - _flushed_at < settings.LAST_LOGIN_FLUSH_INTERVAL:
+            return 0
+        pending = dict(_pending)
+        _pending.clear()
+        _flushed_at = time.monotonic()
+
+    try:
+        get_user_model().objects.filter(pk__in=pending).update(last_login=Case(
+            # Never move last_login back, another process may have written a later one
+            *[
+                When(Q(pk=pk) & (Q(last_login__isnull=True) | Q(last_login__lt=at)), then=at)
+                for pk, at in pending.items()
+            ],
+            default=F('last_login'),
+        ))
+    except DatabaseError:
+        logger.warning('Could not write %d last logins, retrying later', len(pending), exc_info=True)
+        with _lock:
+            for pk, at in pending.items():
+                _pending[pk] = max(at, _pending.get(pk, at))
+        return 0
+    return len(pending)
@@ -0,0 +1,44 @@
+import time
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Time password checks with each hasher of PASSWORD_HASHERS at its "
+        "configured cost, reporting the logins a CPU core sustains per "
+        "second. The first hasher hashes new passwords."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=3.0, help='Seconds per hasher')
+        parser.add_argument('--hashers', help='Comma separated algorithms, e.g. argon2,pbkdf2_sha256')
+
+    def handle(self, *args, **options):
+        if options['duration'] <= 0:
+            raise CommandError('--duration must be positive')
+        hashers = get_hashers()
+        if options['hashers']:
+            algorithms = [algorithm.strip() for algorithm in options['hashers'].split(',')]
+            unknown = set(algorithms) - {hasher.algorithm for hasher in hashers}
+            if unknown:
+                raise CommandError(f'Unknown hashers: {", ".join(sorted(unknown))}')
+            hashers = [hasher for hasher in hashers if hasher.algorithm in algorithms]
+
+        self.stdout.write(f'{"hasher":>14} {"ms/login":>9} {"logins/s/core":>14}  parameters')
+        for hasher in hashers:
+            encoded = hasher.encode('benchmark-password', hasher.salt())
+            count, started, cpu_started = 0, time.perf_counter(), time.process_time()
+            while time.perf_counter() - started < options['duration']:
+                hasher.verify('benchmark-password', encoded)
+                count += 1
+            # CPU time, so the result holds for a busy core and multi-lane hashes
+            cpu = time.process_time() - cpu_started
+            parameters = {
+                key: value for key, value in hasher.safe_summary(encoded).items()
+                if key not in ('algorithm', 'salt', 'hash')
+            }
+            self.stdout.write(
+                f'{hasher.algorithm:>14} {cpu * 1000 / count:>9.1f} {count / cpu:>14.1f}  '
+                + ', '.join(f'{key} {value}' for key, value in parameters.items())
+            )
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import models
 from core.models import BaseModel
 from phonenumber_field.modelfields import PhoneNumberField
 
@@ -12,3 +13,15 @@ class User(AbstractUser, BaseModel):
 
     class Meta:
         db_table = 'users'
+
+
+class RevokedToken(models.Model):
+    """
+    Revoked refresh tokens, written behind the token cache and checked when
+    it misses, see core.accounts.revocation.
+    """
+    jti = models.CharField(max_length=255, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'revoked_tokens'
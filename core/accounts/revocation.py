@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError
+from core.accounts.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# jti -> expiry of revocations not yet written to the database, per process
+_pending = {}
+_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def revocation_key(jti):
+    return f'{settings.CACHE_KEY_PREFIX}revoked:{jti}'
+
+
+def token_cache():
+    return caches[settings.TOKEN_BLACKLIST_CACHE_ALIAS]
+
+
+def revoke(jti, exp):
+    """
+    Revoke the token ``jti`` until its expiry ``exp`` (a timestamp), when
+    the entry expires by itself. Returns False if it already was revoked:
+    the check and the revocation are one atomic cache add, so a refresh
+    token is accepted once even by concurrent requests.
+
+    The revocation is written to the database behind the cache, see
+    flush_revocations, and at once when the cache is unreachable.
+    """
+    expires_at = datetime.fromtimestamp(exp, timezone.utc)
+    timeout = max(int(exp - time.time()), 1)
+    try:
+        added = token_cache().add(revocation_key(jti), True, timeout)
+    except Exception:
+        logger.warning('Token cache unreachable, revoking %s in the database', jti, exc_info=True)
+    else:
+        if added:
+            with _lock:
+                _pending[jti] = expires_at
+        return added
+
+    _, created = RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+    return created
+
+
+def is_revoked(jti):
+    """
+    Checked in the cache, then in the database: the cache may have been
+    unreachable when the token was revoked, or have evicted the entry since.
+    """
+    try:
+        if token_cache().get(revocation_key(jti)) is not None:
+            return True
+    except Exception:
+        logger.warning('Token cache unreachable, checking %s in the database', jti, exc_info=True)
+
+    with _lock:
+        if jti in _pending:
+            return True
+    expires_at = RevokedToken.objects.filter(jti=jti).values_list('expires_at', flat=True).first()
+    if expires_at is None:
+        return False
+    # Answer the next check from the cache again
+    try:
+        token_cache().add(revocation_key(jti), True, max(int(expires_at.timestamp() - time.time()), 1))
+    except Exception:
+        pass
+    return True
+
+
+def flush_revocations(force=False):
+    """
+    Write the pending revocations in one INSERT if TOKEN_REVOCATION_FLUSH_INTERVAL
+    has passed (or ``force``), purging the expired ones, and return how
+    many were written. Runs after each request and when a server worker exits.
+    """
+    global _flushed_at
+    with _lock:
+        if not _pending or not force and time.monotonic() - _flushed_at < settings.TOKEN_REVOCATION_FLUSH_INTERVAL:
+            return 0
+        pending = dict(_pending)
+        _pending.clear()
+        _flushed_at = time.monotonic()
+
+    try:
+        RevokedToken.objects.filter(expires_at__lte=datetime.now(timezone.utc)).delete()
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=jti, expires_at=expires_at) for jti, expires_at in pending.items()],
+            ignore_conflicts=True,
+        )
+    except DatabaseError:
+        logger.warning('Could not write %d revocations, retrying later', len(pending), exc_info=True)
+        with _lock:
+            _pending.update(pending)
+        return 0
+    return len(pending)
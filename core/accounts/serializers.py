@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from phonenumber_field.serializerfields import PhoneNumberField
+from rest_framework_simplejwt.serializers import TokenBlacklistSerializer, TokenRefreshSerializer
+from core.accounts.tokens import PrincipalRefreshToken
 
 User = get_user_model()
 
@@ -32,3 +34,11 @@ class UserSerializer(serializers.ModelSerializer):
 class LoginSerializer(serializers.Serializer):
     username = serializers.CharField()
     password = serializers.CharField()
+
+
+class PrincipalTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = PrincipalRefreshToken
+
+
+class PrincipalTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = PrincipalRefreshToken
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.accounts.authentication import invalidate_principal
+from core.accounts.logins import flush_logins
+from core.accounts.revocation import flush_revocations
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    # Deactivation, staff flags and password changes apply to the next request
+    invalidate_principal(instance.pk)
+
+
+@receiver(request_finished)
+def flush_due_writes(sender, **kwargs):
+    # After the response is sent, so no request waits for the writes
+    flush_logins()
+    flush_revocations()
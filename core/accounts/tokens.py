@@ -0,0 +1,38 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.accounts.revocation import is_revoked, revoke
+
+
+class PrincipalRefreshToken(RefreshToken):
+    """
+    Refresh token whose claims, copied into its access tokens, describe the
+    principal when it was minted: the user's merchant and staff flag. The
+    server itself trusts the cached principal, see PrincipalJWTAuthentication.
+
+    Revoked tokens (rotated by a refresh, or logged out) are refused until
+    they expire, see core.accounts.revocation.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        merchant = getattr(user, 'merchant', None)
+        token['merchant_id'] = str(merchant.pk) if merchant else None
+        token['is_staff'] = user.is_staff
+        return token
+
+    def verify(self):
+        self.check_blacklist()
+        super().verify()
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        # Called by the refresh (BLACKLIST_AFTER_ROTATION) and logout
+        # serializers; losing the race to a concurrent refresh is a reuse
+        if not revoke(self.payload[api_settings.JTI_CLAIM], self.payload['exp']):
+            raise TokenError(_("Token is blacklisted"))
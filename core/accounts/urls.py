@@ -1,5 +1,6 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
+from rest_framework_simplejwt.views import TokenBlacklistView, TokenRefreshView
+from core.accounts.serializers import PrincipalTokenBlacklistSerializer, PrincipalTokenRefreshSerializer
 from core.accounts.views import RegisterView, LoginView
 
 app_name = 'accounts'
@@ -7,5 +8,14 @@ app_name = 'accounts'
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path(
+        'token/refresh/',
+        TokenRefreshView.as_view(serializer_class=PrincipalTokenRefreshSerializer),
+        name='token_refresh'
+    ),
+    path(
+        'logout/',
+        TokenBlacklistView.as_view(serializer_class=PrincipalTokenBlacklistSerializer),
+        name='logout'
+    ),
 ]
@@ -1,16 +1,22 @@
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from core.accounts.serializers import UserSerializer, LoginSerializer
+from core.accounts.logins import record_login
+from core.accounts.tokens import PrincipalRefreshToken
+from core.throttling import ClientThrottle, UsernameThrottle
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from rest_framework_simplejwt.settings import api_settings
 
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
+    # Refused before the password is hashed
+    throttle_classes = [ClientThrottle, UsernameThrottle]
+    throttle_scope = 'register'
     
     @swagger_auto_schema(
         operation_description="Create a new user account",
@@ -24,7 +30,7 @@ class RegisterView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = PrincipalRefreshToken.for_user(user)
             return Response({
                 'user': UserSerializer(user).data,
                 'refresh': str(refresh),
@@ -36,6 +42,9 @@ class RegisterView(generics.CreateAPIView):
 class LoginView(generics.GenericAPIView):
     serializer_class = LoginSerializer
     permission_classes = [AllowAny]
+    # Refused before the password is hashed
+    throttle_classes = [ClientThrottle, UsernameThrottle]
+    throttle_scope = 'login'
     
     @swagger_auto_schema(
         operation_description="Login with username and password",
@@ -63,7 +72,9 @@ class LoginView(generics.GenericAPIView):
                 password=serializer.validated_data['password']
             )
             if user:
-                refresh = RefreshToken.for_user(user)
+                if api_settings.UPDATE_LAST_LOGIN:
+                    record_login(user)
+                refresh = PrincipalRefreshToken.for_user(user)
                 return Response({
                     'user': UserSerializer(user).data,
                     'refresh': str(refresh),
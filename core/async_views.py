@@ -0,0 +1,141 @@
+from contextlib import nullcontext
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+from core.accounts.authentication import AsyncJWTAuthentication
+from core.cache import CachedResponseMixin, response_cache
+from core.merchants.context import get_request_merchant
+from core.pagination import SelectablePagination
+
+
+async def apaginate_queryset(paginator, queryset, request, view):
+    """
+    Async PageNumberPagination.paginate_queryset(): the COUNT and the page
+    are read with the async ORM, prefetches included. Cursor pages of
+    SelectablePagination still go through the sync paginator.
+    """
+    if isinstance(paginator, SelectablePagination) and paginator.use_cursor(request):
+        return await sync_to_async(paginator.paginate_queryset)(queryset, request, view)
+    paginator.cursor_paginator = None
+
+    page_size = paginator.get_page_size(request)
+    if not page_size:
+        return None
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    # Paginator.count is a cached property, fill it without a sync COUNT
+    django_paginator.count = await queryset.acount()
+    page_number = paginator.get_page_number(request, django_paginator)
+    try:
+        page = django_paginator.page(page_number)
+    except InvalidPage as exc:
+        raise exceptions.NotFound(
+            paginator.invalid_page_message.format(page_number=page_number, message=str(exc))
+        )
+    page.object_list = [obj async for obj in page.object_list]
+    paginator.page = page
+    paginator.request = request
+    return page.object_list
+
+
+class AsyncReadView(View):
+    """
+    Async GET variant of a DRF list or retrieve view.
+
+    The DRF view in ``view_class`` still provides the queryset, filters,
+    permissions, serializer, pagination and response cache; this view only
+    does the I/O asynchronously: JWT authentication, cache lookups and the
+    queries, which must all be prefetched so that serializing touches no
+    database. Under ASGI a slow client then holds no thread.
+    """
+    view_class = None
+    detail = False
+    http_method_names = ['get', 'options']
+    authentication = AsyncJWTAuthentication()
+    renderer = JSONRenderer()
+
+    async def get(self, request, *args, **kwargs):
+        drf_request = Request(request)
+        view = self.view_class()
+        view.setup(drf_request, *args, **kwargs)
+        view.format_kwarg = None
+        view.headers = {}
+        try:
+            auth = await self.authentication.aauthenticate(request)
+            if auth is None:
+                raise exceptions.NotAuthenticated()
+            drf_request.user, drf_request.auth = auth
+            await sync_to_async(self.check_request)(view, drf_request)
+
+            key = None
+            if isinstance(view, CachedResponseMixin):
+                key = await view.aget_cache_key(drf_request)
+            data = await response_cache().aget(key) if key else None
+            if data is None:
+                async with await self.read_context(view):
+                    data = await (self.retrieve(view) if self.detail else self.list(view))
+                if key:
+                    await response_cache().aset(key, data, view.get_cache_timeout())
+        except Exception as exc:
+            return self.handle_exception(exc, view)
+        return self.render(data)
+
+    @staticmethod
+    def check_request(view, request):
+        # In a thread: the merchant may be queried, permissions may query
+        # too and the cache's async incr is not atomic. The views' cache
+        # scope then reads the merchant resolved here.
+        get_request_merchant(request)
+        view.check_permissions(request)
+        view.check_throttles(request)
+
+    @staticmethod
+    async def read_context(view):
+        # Misses are read from a replica as in the sync views
+        if isinstance(view, CachedResponseMixin):
+            return await view.aread_context()
+        return nullcontext()
+
+    async def list(self, view):
+        queryset = view.filter_queryset(view.get_queryset())
+        page = await apaginate_queryset(view.paginator, queryset, view.request, view)
+        if page is None:
+            return view.get_serializer([obj async for obj in queryset], many=True).data
+        return view.paginator.get_paginated_response(view.get_serializer(page, many=True).data).data
+
+    async def retrieve(self, view):
+        queryset = view.filter_queryset(view.get_queryset())
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        try:
+            obj = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+        except ObjectDoesNotExist:
+            raise exceptions.NotFound(f'No {queryset.model._meta.object_name} matches the given query.')
+        view.check_object_permissions(view.request, obj)
+        return view.get_serializer(obj).data
+
+    def handle_exception(self, exc, view):
+        response = exception_handler(exc, {'view': view, 'args': view.args, 'kwargs': view.kwargs, 'request': view.request})
+        if response is None:
+            raise exc
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response.status_code = status.HTTP_401_UNAUTHORIZED
+            response['WWW-Authenticate'] = self.authentication.authenticate_header(view.request)
+        rendered = self.render(response.data, response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        response = HttpResponse(
+            self.renderer.render(data),
+            status=status_code,
+            content_type=self.renderer.media_type,
+        )
+        patch_vary_headers(response, ['Accept'])
+        return response
@@ -0,0 +1,217 @@
+import hashlib
+import time
+from contextlib import nullcontext
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+from core.routers import areplica_reads, replica_reads
+from core.merchants.context import get_request_merchant
+
+
+CATALOG_NAMESPACE = 'catalog'
+TAXONOMY_NAMESPACE = 'taxonomy'
+MERCHANTS_NAMESPACE = 'merchants'
+
+
+def response_cache():
+    # Responses are large and many, keep them from evicting the versions
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def version_key(namespace, scope=None):
+    if scope is None:
+        return f'{settings.CACHE_KEY_PREFIX}version:{namespace}'
+    return f'{settings.CACHE_KEY_PREFIX}version:{namespace}:{scope}'
+
+
+def _initial_version():
+    # Millisecond clock, so a version key that was evicted never restarts
+    # below a value that cached responses may still be stored under.
+    return int(time.time() * 1000)
+
+
+def get_versions(keys):
+    versions = cache.get_many(keys)
+    for key in keys:
+        if versions.get(key) is None:
+            cache.add(key, _initial_version(), timeout=None)
+            versions[key] = cache.get(key) or 0
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(keys):
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if versions.get(key) is None:
+            await cache.aadd(key, _initial_version(), timeout=None)
+            versions[key] = await cache.aget(key) or 0
+    return [versions[key] for key in keys]
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+
+
+def primary_key(key):
+    return f'{key}:primary'
+
+
+def pin_to_primary(keys):
+    # Replicas may not have replayed the write yet: read what it changed
+    # from the primary for a while, which also keeps stale replica reads
+    # out of the response cache under the new version.
+    if settings.DATABASE_REPLICAS:
+        cache.set_many({primary_key(key): 1 for key in keys}, settings.REPLICA_PIN_SECONDS)
+
+
+def bump_versions_on_commit(keys):
+    keys = list(keys)
+
+    def bump():
+        for key in keys:
+            bump_version(key)
+        pin_to_primary(keys)
+
+    if keys:
+        transaction.on_commit(bump)
+
+
+def pinned_to_primary(keys):
+    return bool(settings.DATABASE_REPLICAS and cache.get_many([primary_key(key) for key in keys]))
+
+
+async def apinned_to_primary(keys):
+    return bool(settings.DATABASE_REPLICAS and await cache.aget_many([primary_key(key) for key in keys]))
+
+
+def invalidate_catalog(merchant_ids):
+    bump_versions_on_commit(
+        version_key(CATALOG_NAMESPACE, merchant_id)
+        for merchant_id in set(merchant_ids) if merchant_id
+    )
+
+
+def invalidate_taxonomy():
+    bump_versions_on_commit([version_key(TAXONOMY_NAMESPACE)])
+
+
+def invalidate_merchants():
+    bump_versions_on_commit([version_key(MERCHANTS_NAMESPACE)])
+
+
+def response_cache_key(endpoint, scope, versions, path, params):
+    query = '&'.join(
+        f'{name}={value}'
+        for name, values in sorted(params)
+        for value in sorted(values)
+    )
+    digest = hashlib.md5(f'{path}?{query}'.encode()).hexdigest()
+    version = '.'.join(str(v) for v in versions)
+    return f'{settings.CACHE_KEY_PREFIX}response:{endpoint}:{scope}:{version}:{digest}'
+
+
+class CachedResponseMixin:
+    """
+    Caches list/retrieve responses of DRF generic views.
+
+    Entries are keyed on the cache scope (the merchant for merchant-scoped
+    views), the endpoint, the path and the query string, and embed the
+    current version of every namespace the response depends on. Writes bump
+    those versions (see the app signals), so stale entries are never read
+    again and simply expire.
+
+    Misses are read from a replica (see core.routers), unless a recent
+    write pinned one of the namespaces to the primary.
+    """
+    cache_namespaces = ()
+    cache_timeout = settings.CACHE_TTL
+    read_from_replica = True
+
+    def get_cache_scope(self):
+        return 'all'
+
+    def get_cache_timeout(self):
+        return self.cache_timeout
+
+    def get_cache_version_keys(self, scope):
+        keys = []
+        for namespace in self.cache_namespaces:
+            if namespace == CATALOG_NAMESPACE:
+                keys.append(version_key(namespace, scope))
+            else:
+                keys.append(version_key(namespace))
+        return keys
+
+    def read_context(self):
+        """Where a miss is read: a replica, unless its namespaces are pinned to the primary."""
+        if self.read_from_replica and not pinned_to_primary(self.get_cache_version_keys(self.get_cache_scope())):
+            return replica_reads()
+        return nullcontext()
+
+    async def aread_context(self):
+        """read_context() for the async read views, see core.async_views."""
+        if self.read_from_replica and not await apinned_to_primary(self.get_cache_version_keys(self.get_cache_scope())):
+            return areplica_reads()
+        return nullcontext()
+
+    def get_cache_key(self, request):
+        scope = self.get_cache_scope()
+        if scope is None:
+            return None
+        versions = get_versions(self.get_cache_version_keys(scope))
+        return response_cache_key(
+            self.__class__.__name__,
+            scope,
+            versions,
+            request.path,
+            request.query_params.lists(),
+        )
+
+    async def aget_cache_key(self, request):
+        """get_cache_key() for the async read views, see core.async_views."""
+        scope = self.get_cache_scope()
+        if scope is None:
+            return None
+        versions = await aget_versions(self.get_cache_version_keys(scope))
+        return response_cache_key(
+            self.__class__.__name__,
+            scope,
+            versions,
+            request.path,
+            request.query_params.lists(),
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+
+        data = response_cache().get(key)
+        if data is not None:
+            return Response(data)
+
+        with self.read_context():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response_cache().set(key, response.data, self.get_cache_timeout())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class MerchantScopedCacheMixin(CachedResponseMixin):
+    cache_namespaces = (CATALOG_NAMESPACE, TAXONOMY_NAMESPACE)
+
+    def get_cache_scope(self):
+        # Users without a merchant only ever see empty/denied responses
+        merchant = get_request_merchant(self.request)
+        return str(merchant.id) if merchant else None
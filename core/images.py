@@ -0,0 +1,251 @@
+import os
+from io import BytesIO
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db import transaction
+from PIL import Image, ImageOps
+from rest_framework import serializers
+from core.media.storage import blob_digest
+from core.tasks.registry import task
+
+
+# Rendition encoders by format; saving without exif/xmp strips the metadata
+# of the upload, only the colour profile is carried over
+ENCODERS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+
+# Image fields with renditions, by catalog type
+IMAGE_FIELDS = {
+    'products': ('products.Product', 'image'),
+    'merchants': ('merchants.Merchant', 'logo'),
+}
+
+
+# Field holding the merchant whose cached responses embed each model's images
+IMAGE_MERCHANT_FIELDS = {
+    'products.Product': 'merchant_id',
+    'merchants.Merchant': 'pk',
+}
+
+
+def invalidate_image_responses(model_label, merchant_ids):
+    """Drop the cached responses showing images of ``model_label`` rows of these merchants."""
+    # core.cache reaches the models, which import this module
+    from core.cache import invalidate_catalog, invalidate_merchants
+
+    invalidate_catalog(merchant_ids)
+    if model_label == 'merchants.Merchant':
+        invalidate_merchants()
+
+
+def rendition_storage():
+    # Renditions get names derived from their original, which a
+    # content-addressed media storage would not keep
+    return storages['default']
+
+
+def renditions():
+    """Rendition name -> (max width, max height), smallest last."""
+    return dict(sorted(settings.IMAGE_RENDITIONS.items(), key=lambda item: item[1], reverse=True))
+
+
+def rendition_name(name, rendition, fmt):
+    """Storage name of a rendition, next to the original upload."""
+    root, _ = os.path.splitext(name)
+    return f'{root}_{rendition}.{"jpg" if fmt == "jpeg" else fmt}'
+
+
+def validate_image_upload(file):
+    """Reject uploads over the configured size or pixel count."""
+    if file.size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            f'Image files may not exceed {settings.IMAGE_MAX_UPLOAD_SIZE // (1024 * 1024)} MB.'
+        )
+    position = file.tell()
+    try:
+        # Only the header is read, the pixels are never decoded here
+        with Image.open(file) as image:
+            width, height = image.size
+    except (OSError, Image.DecompressionBombError):
+        # Left to the image field, which reports invalid images
+        return
+    finally:
+        file.seek(position)
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(f'Image dimensions {width}x{height} are too large.')
+
+
+def _prepare(image):
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def _encode(image, fmt, icc_profile):
+    if fmt == 'jpeg' and image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = BytesIO()
+    options = dict(ENCODERS[fmt])
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    image.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def generate_renditions(field_file):
+    """
+    Write every rendition of an uploaded image in every format next to it
+    and return their storage names. Each size is downscaled from the
+    previous, larger one, and JPEG uploads are decoded at reduced scale
+    when the largest rendition allows it.
+    """
+    storage = rendition_storage()
+    sizes = renditions()
+    written = []
+    with field_file.storage.open(field_file.name, 'rb') as source, Image.open(source) as original:
+        icc_profile = original.info.get('icc_profile')
+        # draft() keeps at least the requested size, so quality is unaffected
+        original.draft(None, max(sizes.values()))
+        image = _prepare(original)
+        for rendition, size in sizes.items():
+            image = image.copy()
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+            for fmt in ENCODERS:
+                name = rendition_name(field_file.name, rendition, fmt)
+                # Names are derived from the original, replace a stale copy
+                storage.delete(name)
+                written.append(storage.save(name, ContentFile(_encode(image, fmt, icc_profile))))
+    return written
+
+
+def renditions_ready(name):
+    """
+    Whether the renditions of ``name`` have been generated, checked with
+    the one generate_renditions() writes last.
+    """
+    rendition = list(renditions())[-1]
+    return rendition_storage().exists(rendition_name(name, rendition, list(ENCODERS)[-1]))
+
+
+def renditions_exist(name):
+    storage = rendition_storage()
+    return all(
+        storage.exists(rendition_name(name, rendition, fmt))
+        for rendition in renditions() for fmt in ENCODERS
+    )
+
+
+def release_upload(field_file):
+    """
+    Drop the reference of a model field to its file when the storage counts
+    references, deleting the renditions along with the last one.
+    """
+    release_uploads(field_file.storage, [field_file.name])
+
+
+def release_uploads(storage, names):
+    """release_upload() for the files ``names`` of ``storage``, in one batch."""
+    release_many = getattr(storage, 'release_many', None)
+    released = release_many([name for name in names if name]) if release_many else []
+
+    def delete_renditions():
+        # After the blobs' deletion, which skips a blob uploaded again
+        for name in released:
+            if not storage.exists(name):
+                for rendition in renditions():
+                    for fmt in ENCODERS:
+                        rendition_storage().delete(rendition_name(name, rendition, fmt))
+
+    if released:
+        transaction.on_commit(delete_renditions)
+
+
+def is_rendition_name(name):
+    """Whether ``name`` is a rendition of a content-addressed upload."""
+    for rendition in renditions():
+        for fmt in ENCODERS:
+            suffix = rendition_name('', rendition, fmt)
+            if name.endswith(suffix) and blob_digest(name[:-len(suffix)]):
+                return True
+    return False
+
+
+def track_upload(instance, field_name):
+    """pre_save helper: remember whether the field holds a new upload, and the file it replaces."""
+    field_file = getattr(instance, field_name)
+    instance._pending_uploads = getattr(instance, '_pending_uploads', {})
+    if field_file and not field_file._committed:
+        previous = None
+        if not instance._state.adding:
+            previous = type(instance).objects.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+        instance._pending_uploads[field_name] = previous
+
+
+def process_upload(instance, field_name):
+    """
+    post_save helper: queue rendering of the upload remembered by
+    track_upload() and release the file it replaced.
+    """
+    pending = getattr(instance, '_pending_uploads', {})
+    if field_name in pending:
+        previous = pending.pop(field_name)
+        field_file = getattr(instance, field_name)
+        if previous and previous != field_file.name:
+            release_upload(type(field_file)(instance, field_file.field, previous))
+        render_upload.enqueue(
+            model=instance._meta.label,
+            pk=str(instance.pk),
+            field_name=field_name,
+            name=getattr(instance, field_name).name,
+        )
+
+
+@task('images.render', queue='images')
+def render_upload(model, pk, field_name, name):
+    merchant_field = IMAGE_MERCHANT_FIELDS[model]
+    instance = apps.get_model(model).objects.filter(pk=pk).only('pk', merchant_field, field_name).first()
+    field_file = getattr(instance, field_name, None)
+    # Deleted, or replaced by a newer upload which has its own task
+    if not field_file or field_file.name != name:
+        return None
+    # Content-addressed uploads share the renditions of identical files
+    if renditions_exist(name):
+        return []
+    written = generate_renditions(field_file)
+    # Cached responses point the renditions at the original until now
+    invalidate_image_responses(model, [getattr(instance, merchant_field)])
+    return written
+
+
+class ImageRenditionsField(serializers.Field):
+    """
+    Read-only URLs of every rendition of an image field, by format. Until
+    the background task has generated them, each one is the original image.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        storage = rendition_storage()
+        ready = renditions_ready(value.name)
+        result = {}
+        for rendition in renditions():
+            result[rendition] = {}
+            for fmt in ENCODERS:
+                url = storage.url(rendition_name(value.name, rendition, fmt)) if ready else value.url
+                result[rendition][fmt] = request.build_absolute_uri(url) if request else url
+        return result
@@ -0,0 +1,69 @@
+from django.apps import apps
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from core.images import (
+    IMAGE_FIELDS, IMAGE_MERCHANT_FIELDS, ENCODERS, invalidate_image_responses, rendition_name,
+    rendition_storage, render_upload, renditions,
+)
+from core.media.storage import BLOB_PREFIX, ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = (
+        "Move product images and merchant logos uploaded before the media "
+        "storage was content-addressed into shared blobs, deleting the "
+        "original copies and queueing renditions for blobs without them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(IMAGE_FIELDS), help='Defaults to both')
+
+    def handle(self, *args, **options):
+        kinds = [options['type']] if options['type'] else sorted(IMAGE_FIELDS)
+        for kind in kinds:
+            model_label, field_name = IMAGE_FIELDS[kind]
+            model = apps.get_model(model_label)
+            storage = model._meta.get_field(field_name).storage
+            if not isinstance(storage, ContentAddressedStorage):
+                raise CommandError(f'{model_label}.{field_name} is not stored content-addressed')
+
+            legacy = model.objects.exclude(**{field_name: ''}).exclude(
+                **{f'{field_name}__startswith': f'{BLOB_PREFIX}/'}
+            )
+            moved, missing, blobs = 0, 0, set()
+            for old_name in legacy.values_list(field_name, flat=True).distinct().iterator():
+                try:
+                    with transaction.atomic():
+                        with storage.open(old_name, 'rb') as f:
+                            new_name = storage.save(old_name, File(f))
+                        rows = model.objects.filter(**{field_name: old_name})
+                        merchant_ids = list(rows.values_list(IMAGE_MERCHANT_FIELDS[model_label], flat=True))
+                        # One reference per row, save() counted the first.
+                        # update() sends no signals, drop the cached URLs here.
+                        count = rows.update(**{field_name: new_name})
+                        if count > 1:
+                            storage.retain(new_name, count - 1)
+                        invalidate_image_responses(model_label, merchant_ids)
+                        # Only once the rows point at the blob
+                        transaction.on_commit(lambda old_name=old_name: self.delete_legacy(storage, old_name))
+                except FileNotFoundError:
+                    missing += 1
+                    self.stderr.write(f'{kind}: {old_name} is missing')
+                    continue
+
+                if new_name not in blobs:
+                    pk = model.objects.filter(**{field_name: new_name}).values_list('pk', flat=True).first()
+                    render_upload.enqueue(model=model_label, pk=str(pk), field_name=field_name, name=new_name)
+                blobs.add(new_name)
+                moved += 1
+
+            self.stdout.write(self.style.SUCCESS(
+                f'Moved {moved} {kind} files into {len(blobs)} blobs ({missing} missing)'
+            ))
+
+    def delete_legacy(self, storage, name):
+        storage.delete(name)
+        for rendition in renditions():
+            for fmt in ENCODERS:
+                rendition_storage().delete(rendition_name(name, rendition, fmt))
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class Blob(models.Model):
+    """
+    A unique uploaded file stored by core.media.storage.ContentAddressedStorage,
+    with the number of model fields referencing it.
+    """
+    name = models.CharField(max_length=255, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'media_blobs'
+
+    def __str__(self):
+        return f'{self.name} ({self.refcount})'
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import connection, transaction
+
+
+BLOB_PREFIX = 'blobs'
+CHUNK_SIZE = 64 * 1024
+BLOB_NAME = re.compile(rf'^{BLOB_PREFIX}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/(?P<digest>[0-9a-f]{{64}})(?P<ext>\.[a-z0-9]+)?$')
+
+INCREMENT_SQL = '''
+    INSERT INTO media_blobs (name, size, refcount, created_at) VALUES (%s, %s, 1, NOW())
+    ON CONFLICT (name) DO UPDATE SET refcount = media_blobs.refcount + 1
+'''
+DECREMENT_SQL = '''
+    UPDATE media_blobs SET refcount = GREATEST(media_blobs.refcount - released.count, 0)
+    FROM unnest(%s::varchar[], %s::integer[]) AS released (name, count)
+    WHERE media_blobs.name = released.name AND media_blobs.refcount > 0
+    RETURNING media_blobs.name, media_blobs.refcount
+'''
+
+
+def media_storage():
+    """Storage of product images and merchant logos, the 'media' alias of STORAGES."""
+    return storages['media']
+
+
+def blob_digest(name):
+    """SHA-256 of a content-addressed name, None for any other file."""
+    match = BLOB_NAME.match(name or '')
+    return match['digest'] if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every file once under ``blobs/<aa>/<bb>/<sha256><ext>``, whatever
+    the requested name, so identical uploads share one blob. References are
+    counted in the media_blobs table: each save adds one and release()
+    removes one, deleting the blob with its last reference.
+
+    Files saved before the storage was content-addressed keep their names
+    and are never reference counted.
+    """
+
+    def _save(self, name, content):
+        tmp_dir = self.path(os.path.join(BLOB_PREFIX, 'tmp'))
+        os.makedirs(tmp_dir, exist_ok=True)
+        # Hashed while streamed to a temporary file on the same filesystem,
+        # so the upload is read once and moved into place atomically
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False) as tmp:
+            try:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks(CHUNK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+
+        hexdigest = digest.hexdigest()
+        _, ext = os.path.splitext(name)
+        blob_name = f'{BLOB_PREFIX}/{hexdigest[:2]}/{hexdigest[2:4]}/{hexdigest}{ext.lower()}'
+        # Referenced before the file is put in place: the upsert waits for
+        # a release deleting the blob (see _delete_unreferenced) to finish,
+        # and once it is visible the blob is no longer deleted
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(INCREMENT_SQL, [blob_name, size])
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+        full_path = self.path(blob_name)
+        if os.path.exists(full_path):
+            os.unlink(tmp.name)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp.name, self.file_permissions_mode)
+            # Identical bytes, a concurrent save of the same blob is harmless
+            os.replace(tmp.name, full_path)
+        return blob_name
+
+    def retain(self, name, count=1):
+        """Add references to an existing blob."""
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE media_blobs SET refcount = refcount + %s WHERE name = %s', [count, name])
+
+    def release(self, name):
+        """
+        Drop one reference to a blob, deleting it with the last one once
+        the transaction commits. Returns True when it was the last one.
+        """
+        return bool(self.release_many([name]))
+
+    def release_many(self, names):
+        """
+        release() every name, once per occurrence, with a single UPDATE.
+        Returns the names whose last reference went.
+        """
+        counts = Counter(name for name in names if blob_digest(name))
+        if not counts:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(DECREMENT_SQL, [list(counts), list(counts.values())])
+            released = [name for name, refcount in cursor.fetchall() if refcount == 0]
+
+        def delete_unreferenced():
+            for name in released:
+                self._delete_unreferenced(name)
+
+        if released:
+            transaction.on_commit(delete_unreferenced)
+        return released
+
+    def _delete_unreferenced(self, name):
+        # The row is locked while the file goes: a concurrent save of the
+        # same blob waits, and one committed since leaves the blob in place
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SELECT refcount FROM media_blobs WHERE name = %s FOR UPDATE', [name])
+            row = cursor.fetchone()
+            if row is None or row[0] > 0:
+                return
+            self.delete(name)
+            cursor.execute('DELETE FROM media_blobs WHERE name = %s', [name])
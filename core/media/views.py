@@ -0,0 +1,51 @@
+import mimetypes
+from django.http import FileResponse, Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+from core.images import is_rendition_name, rendition_storage
+from core.media.storage import BLOB_PREFIX, blob_digest, media_storage
+
+
+BLOB_MAX_AGE = 60 * 60 * 24 * 365
+# Blobs never change under their name, renditions generated next to them
+# are rewritten when IMAGE_RENDITIONS changes
+DERIVED_MAX_AGE = 60 * 60 * 24
+
+
+@require_safe
+def serve_blob(request, path):
+    """
+    Serve a content-addressed blob, or a rendition of one, with an ETag
+    and answer revalidations with 304. Blobs are cached for a year
+    without revalidation.
+
+    Any other name under MEDIA_ROOT is not found: the route is public,
+    and MEDIA_ROOT holds private files such as catalog imports.
+    """
+    name = f'{BLOB_PREFIX}/{path}'
+    digest = blob_digest(name)
+    if digest:
+        storage = media_storage()
+    elif is_rendition_name(name):
+        storage = rendition_storage()
+    else:
+        raise Http404
+    if not storage.exists(name):
+        raise Http404
+
+    if digest:
+        etag = quote_etag(digest)
+    else:
+        etag = quote_etag(f'{int(storage.get_modified_time(name).timestamp())}-{storage.size(name)}')
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        content_type, _ = mimetypes.guess_type(name)
+        response = FileResponse(storage.open(name, 'rb'), content_type=content_type or 'application/octet-stream')
+
+    response.headers['ETag'] = etag
+    if digest:
+        patch_cache_control(response, public=True, max_age=BLOB_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=DERIVED_MAX_AGE)
+    return response
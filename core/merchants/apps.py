@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MerchantsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core.merchants'
+
+    def ready(self):
+        import core.merchants.signals  # noqa: F401
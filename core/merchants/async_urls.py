@@ -0,0 +1,10 @@
+from django.urls import path
+from core.merchants.async_views import MerchantListAsyncView, MerchantRetrieveAsyncView
+
+
+app_name = 'merchants-async'
+
+urlpatterns = [
+    path('', MerchantListAsyncView.as_view(), name='merchant-list'),
+    path('<uuid:pk>/', MerchantRetrieveAsyncView.as_view(), name='merchant-detail'),
+]
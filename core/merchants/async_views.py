@@ -0,0 +1,11 @@
+from core.async_views import AsyncReadView
+from core.merchants.views import MerchantListView, MerchantRetrieveUpdateDestroyView
+
+
+class MerchantListAsyncView(AsyncReadView):
+    view_class = MerchantListView
+
+
+class MerchantRetrieveAsyncView(AsyncReadView):
+    view_class = MerchantRetrieveUpdateDestroyView
+    detail = True
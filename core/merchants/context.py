@@ -0,0 +1,21 @@
+from core.merchants.models import Merchant
+
+
+def get_request_merchant(request):
+    """
+    The authenticated user's merchant, or None, resolved at most once per
+    request. The result, None included, is cached on request.user, so the
+    permissions, views and serializers that call this (or read
+    request.user.merchant afterwards) share it without another query.
+    PrincipalJWTAuthentication fills that cache before the view runs.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    related = type(user).merchant.related
+    if not related.is_cached(user):
+        merchant = Merchant.objects.filter(user=user).first()
+        if merchant is not None:
+            Merchant.user.field.set_cached_value(merchant, user)
+        related.set_cached_value(user, merchant)
+    return related.get_cached_value(user)
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:15
+
+import core.images
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('merchants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='merchant',
+            name='logo',
+            field=models.ImageField(blank=True, upload_to='merchants/logos/', validators=[core.images.validate_image_upload]),
+        ),
+    ]
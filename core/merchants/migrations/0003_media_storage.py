@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:23
+
+import core.images
+import core.media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('merchants', '0002_image_upload_limits'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='merchant',
+            name='logo',
+            field=models.ImageField(blank=True, storage=core.media.storage.media_storage, upload_to='merchants/logos/', validators=[core.images.validate_image_upload]),
+        ),
+    ]
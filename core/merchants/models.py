@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from core.images import validate_image_upload
+from core.media.storage import media_storage
 from core.models import BaseModel
 
 
@@ -7,7 +9,9 @@ class Merchant(BaseModel):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
-    logo = models.ImageField(upload_to='merchants/logos/', blank=True)
+    logo = models.ImageField(
+        upload_to='merchants/logos/', storage=media_storage, blank=True, validators=[validate_image_upload]
+    )
     address = models.TextField()
 
     class Meta:
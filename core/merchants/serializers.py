@@ -1,14 +1,16 @@
 from rest_framework import serializers
 from core.merchants.models import Merchant
 from core.accounts.serializers import UserSerializer
+from core.images import ImageRenditionsField
 
 
 class MerchantSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
-    
+    logo_renditions = ImageRenditionsField(source='logo')
+
     class Meta:
         model = Merchant
-        fields = ('id', 'user', 'name', 'description', 'logo', 'address', 'created_at', 'updated_at')
+        fields = ('id', 'user', 'name', 'description', 'logo', 'logo_renditions', 'address', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
 
     def create(self, validated_data):
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from core.accounts.authentication import invalidate_principal
+from core.cache import invalidate_catalog, invalidate_merchants
+from core.images import process_upload, release_upload, track_upload
+from core.merchants.models import Merchant
+
+
+@receiver([post_save, post_delete], sender=Merchant)
+def merchant_changed(sender, instance, **kwargs):
+    invalidate_merchants()
+    invalidate_catalog([instance.pk])
+    # The owner's cached principal carries the merchant id
+    invalidate_principal(instance.user_id)
+
+
+@receiver(pre_save, sender=Merchant)
+def merchant_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        track_upload(instance, 'logo')
+
+
+@receiver(post_save, sender=Merchant)
+def merchant_saved(sender, instance, raw=False, **kwargs):
+    process_upload(instance, 'logo')
+
+
+@receiver(post_delete, sender=Merchant)
+def merchant_deleted(sender, instance, **kwargs):
+    release_upload(instance.logo)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, created, **kwargs):
+    # Merchant responses embed the owning user
+    if not created:
+        invalidate_merchants()
@@ -1,6 +1,7 @@
 from rest_framework import generics, permissions
 from core.merchants.models import Merchant
 from core.merchants.serializers import MerchantSerializer
+from core.cache import CachedResponseMixin, MERCHANTS_NAMESPACE
 from drf_yasg.utils import swagger_auto_schema
 
 
@@ -20,10 +21,11 @@ class MerchantCreateView(generics.CreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
-class MerchantRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class MerchantRetrieveUpdateDestroyView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = MerchantSerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Merchant.objects.all()
+    cache_namespaces = (MERCHANTS_NAMESPACE,)
+    queryset = Merchant.objects.select_related('user')
     
     @swagger_auto_schema(
         operation_description="Get merchant details",
@@ -57,9 +59,10 @@ class MerchantRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         return super().delete(request, *args, **kwargs)
 
 
-class MerchantListView(generics.ListAPIView):
+class MerchantListView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = MerchantSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_namespaces = (MERCHANTS_NAMESPACE,)
     
     def get_queryset(self):
-        return Merchant.objects.all()
+        return Merchant.objects.select_related('user').order_by('-created_at', '-id')
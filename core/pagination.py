@@ -0,0 +1,35 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+
+
+class SelectablePagination(PageNumberPagination):
+    """
+    Page number pagination unless the client asks for ``?pagination=cursor``
+    (or follows a link carrying a ``cursor``). Cursor mode is keyset
+    pagination on (created_at, id): no COUNT query and no OFFSET scan, so deep
+    pages cost the same as the first one.
+    """
+    mode_query_param = 'pagination'
+    cursor_pagination_class = CreatedAtCursorPagination
+
+    def use_cursor(self, request):
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,7 +1,9 @@
 from rest_framework import permissions
+from core.merchants.context import get_request_merchant
+
 
 class HasMerchantPermission(permissions.BasePermission):
     message = "You need to create a merchant before performing this action"
 
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and hasattr(request.user, 'merchant')) 
\ No newline at end of file
+        return get_request_merchant(request) is not None
@@ -0,0 +1,18 @@
+from django.urls import path
+from core.products.async_views import (
+    ProductListAsyncView, ProductRetrieveAsyncView,
+    ServiceListAsyncView, ServiceRetrieveAsyncView,
+    PromotionListAsyncView, PromotionRetrieveAsyncView,
+)
+
+
+app_name = 'products-async'
+
+urlpatterns = [
+    path('products/', ProductListAsyncView.as_view(), name='product-list'),
+    path('products/<uuid:pk>/', ProductRetrieveAsyncView.as_view(), name='product-detail'),
+    path('services/', ServiceListAsyncView.as_view(), name='service-list'),
+    path('services/<uuid:pk>/', ServiceRetrieveAsyncView.as_view(), name='service-detail'),
+    path('promotions/', PromotionListAsyncView.as_view(), name='promotion-list'),
+    path('promotions/<uuid:pk>/', PromotionRetrieveAsyncView.as_view(), name='promotion-detail'),
+]
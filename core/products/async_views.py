@@ -0,0 +1,36 @@
+from core.async_views import AsyncReadView
+from core.products.views import (
+    ProductListCreateView,
+    ProductRetrieveUpdateDestroyView,
+    ServiceListCreateView,
+    ServiceRetrieveUpdateDestroyView,
+    PromotionListCreateView,
+    PromotionRetrieveUpdateDestroyView,
+)
+
+
+class ProductListAsyncView(AsyncReadView):
+    view_class = ProductListCreateView
+
+
+class ProductRetrieveAsyncView(AsyncReadView):
+    view_class = ProductRetrieveUpdateDestroyView
+    detail = True
+
+
+class ServiceListAsyncView(AsyncReadView):
+    view_class = ServiceListCreateView
+
+
+class ServiceRetrieveAsyncView(AsyncReadView):
+    view_class = ServiceRetrieveUpdateDestroyView
+    detail = True
+
+
+class PromotionListAsyncView(AsyncReadView):
+    view_class = PromotionListCreateView
+
+
+class PromotionRetrieveAsyncView(AsyncReadView):
+    view_class = PromotionRetrieveUpdateDestroyView
+    detail = True
@@ -0,0 +1,97 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case, Count, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Upper
+from core.products.models import Product, Service
+
+
+# Below this length trigrams carry no signal, only prefixes are matched
+MIN_TRIGRAM_LENGTH = 3
+
+_trigram_support = {}
+
+# Tables whose names get a trigram index, see create_trigram_indexes
+TRIGRAM_TABLES = ('categories', 'hashtags', 'keywords')
+
+
+def trigram_available(using='default'):
+    """Whether pg_trgm is installed, checked once per database alias."""
+    if using not in _trigram_support:
+        connection = connections[using]
+        available = False
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                available = cursor.fetchone() is not None
+        _trigram_support[using] = available
+    return _trigram_support[using]
+
+
+def create_trigram_indexes(using='default'):
+    """
+    Install pg_trgm and the trigram GIN indexes on the taxonomy names, if
+    the server offers the extension; returns whether it does. The indexes
+    are built without locking writes, so this must not run in a transaction.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return False
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table in TRIGRAM_TABLES:
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_name_trgm_idx '
+                f'ON {table} USING gin (UPPER(name) gin_trgm_ops)'
+            )
+    _trigram_support.pop(using, None)
+    return True
+
+
+def usage_count(model):
+    """Number of products and services tagged with each row, as subqueries."""
+    counts = []
+    for item_model in (Product, Service):
+        field = next(
+            f for f in item_model._meta.many_to_many if f.related_model is model
+        )
+        target = field.m2m_reverse_field_name()
+        links = field.remote_field.through.objects.filter(
+            **{target: OuterRef('pk')}
+        ).values(target).annotate(total=Count('*')).values('total')
+        counts.append(Coalesce(Subquery(links), 0))
+    product_count, service_count = counts
+    return product_count + service_count
+
+
+def suggest(model, text, limit=10):
+    """
+    Top ``limit`` names for a tag picker: prefix matches first, then fuzzy
+    matches by pg_trgm word similarity, ties broken by how many products and
+    services use the row. Both filters are served by the trigram GIN index on
+    UPPER(name); without pg_trgm only prefixes are matched.
+    """
+    text = text.strip().upper()
+    queryset = model.objects.alias(upper_name=Upper('name')).annotate(
+        is_prefix=Case(
+            When(upper_name__startswith=text, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        usage_count=usage_count(model),
+    )
+    ordering = ['-is_prefix']
+
+    if len(text) >= MIN_TRIGRAM_LENGTH and trigram_available(queryset.db):
+        queryset = queryset.filter(
+            Q(upper_name__startswith=text) | Q(upper_name__trigram_word_similar=text)
+        ).annotate(
+            similarity=TrigramWordSimilarity(text, 'upper_name'),
+        )
+        ordering.append('-similarity')
+    else:
+        queryset = queryset.filter(upper_name__startswith=text)
+
+    return queryset.order_by(*ordering, '-usage_count', 'name', 'id')[:limit]
@@ -0,0 +1,167 @@
+from django.db import connection, models, transaction
+from core.cache import invalidate_catalog, invalidate_taxonomy
+from core.images import release_uploads
+from core.products.models import Category, Hashtag, Keyword, Promotion
+from core.products.pricing import refresh_prices
+from core.products.search import refresh_search_vectors
+
+
+BATCH_SIZE = 1000
+
+# M2M relations shared by products and services, by relation name
+RELATION_MODELS = {
+    'categories': Category,
+    'hashtags': Hashtag,
+    'keywords': Keyword,
+}
+
+
+def write_relations(model, objects, relations, replace=False):
+    """
+    Write the M2M through rows of ``objects`` with one bulk INSERT per
+    relation. ``relations`` holds one dict per object mapping a relation
+    name to the target ids; with ``replace`` the existing rows of every
+    relation present in that dict are deleted first.
+    """
+    for relation_name in RELATION_MODELS:
+        field = model._meta.get_field(relation_name)
+        through = field.remote_field.through
+        source = f'{field.m2m_field_name()}_id'
+        target = f'{field.m2m_reverse_field_name()}_id'
+
+        touched = [obj.pk for obj, rel in zip(objects, relations) if relation_name in rel]
+        if replace and touched:
+            through.objects.filter(**{f'{source}__in': touched}).delete()
+        through.objects.bulk_create(
+            (
+                through(**{source: obj.pk, target: pk})
+                for obj, rel in zip(objects, relations)
+                for pk in dict.fromkeys(rel.get(relation_name, []))
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+
+def create_items(model, merchant_id, items, relations):
+    with transaction.atomic():
+        objects = model.objects.bulk_create(
+            (model(merchant_id=merchant_id, **item) for item in items),
+            batch_size=BATCH_SIZE,
+        )
+        write_relations(model, objects, relations)
+        refresh_search_vectors(model, [obj.pk for obj in objects])
+        invalidate_catalog([merchant_id])
+    return objects
+
+
+def delete_items(queryset):
+    """
+    Delete the items of ``queryset`` with one DELETE per table, returning
+    their ids. Model.delete() would run the item signals row by row; their
+    work is done once for all the items instead: syncing the merchants of
+    the promotions they were on, releasing their uploads and invalidating
+    the catalogs.
+    """
+    model = queryset.model
+    file_fields = [field.attname for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+    with transaction.atomic():
+        rows = list(queryset.values_list('pk', 'merchant_id', *file_fields))
+        if not rows:
+            return []
+        pks = [row[0] for row in rows]
+        promotions = model.promotions.through.objects.filter(**{f'{model._meta.model_name}__in': pks})
+        promotion_ids = set(promotions.values_list('promotion_id', flat=True))
+
+        # The through rows first, none of these deletes sends signals
+        promotions.delete()
+        for relation_name in RELATION_MODELS:
+            field = model._meta.get_field(relation_name)
+            field.remote_field.through.objects.filter(**{f'{field.m2m_field_name()}__in': pks}).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)} WHERE id = ANY(%s)', [pks]
+            )
+
+        Promotion.objects.filter(pk__in=promotion_ids).sync_merchants()
+        for index, attname in enumerate(file_fields, start=2):
+            release_uploads(model._meta.get_field(attname).storage, [row[index] for row in rows])
+        invalidate_catalog(row[1] for row in rows)
+    return pks
+
+
+def update_items(model, objects, fields, relations):
+    with transaction.atomic():
+        model.objects.bulk_update(objects, sorted(fields), batch_size=BATCH_SIZE)
+        write_relations(model, objects, relations, replace=True)
+        refresh_search_vectors(model, [obj.pk for obj in objects])
+        invalidate_catalog(obj.merchant_id for obj in objects)
+    return objects
+
+
+def resolve_names(model, names, known=None):
+    """
+    Map taxonomy names to ids, creating the missing rows with a single bulk
+    INSERT. ``known`` is an optional name -> id dict reused across calls.
+    """
+    known = {} if known is None else known
+    pending = {name for name in names if name not in known}
+    if pending:
+        # Names are not unique, the oldest row wins
+        for name, pk in model.objects.filter(name__in=pending).order_by('created_at').values_list('name', 'id'):
+            known.setdefault(name, pk)
+        missing = [name for name in pending if name not in known]
+        if missing:
+            for obj in model.objects.bulk_create(
+                (model(name=name) for name in missing),
+                batch_size=BATCH_SIZE,
+            ):
+                known[obj.name] = obj.pk
+            invalidate_taxonomy()
+    return known
+
+
+def add_promotion_items(promotion, model, merchant_id, pks):
+    """
+    Attach items to a promotion with one membership lookup and one
+    bulk INSERT. Returns the ids added and the ids already attached.
+    """
+    through = model.promotions.through
+    item_field = f'{model._meta.model_name}_id'
+    pks = set(pks)
+    with transaction.atomic():
+        existing = set(through.objects.filter(
+            promotion_id=promotion.pk, **{f'{item_field}__in': pks}
+        ).values_list(item_field, flat=True))
+        added = pks - existing
+        # ignore_conflicts covers a concurrent call attaching the same items
+        through.objects.bulk_create(
+            (through(promotion_id=promotion.pk, **{item_field: pk}) for pk in added),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        if added:
+            promotion_items_changed(promotion, model, merchant_id, added)
+    return added, existing
+
+
+def remove_promotion_items(promotion, model, merchant_id, pks):
+    """Detach items with one DELETE. Returns the ids removed and the ids that were not attached."""
+    through = model.promotions.through
+    item_field = f'{model._meta.model_name}_id'
+    pks = set(pks)
+    with transaction.atomic():
+        links = through.objects.filter(promotion_id=promotion.pk, **{f'{item_field}__in': pks})
+        removed = set(links.values_list(item_field, flat=True))
+        if removed:
+            links.delete()
+            promotion_items_changed(promotion, model, merchant_id, removed)
+    return removed, pks - removed
+
+
+def promotion_items_changed(promotion, model, merchant_id, pks):
+    # Through rows written directly send no m2m_changed, do what the
+    # signal handlers would. Every merchant the promotion is listed for,
+    # before or after the change, has it in their cached catalog.
+    refresh_prices(model, pks)
+    merchant_ids = Promotion.objects.filter(pk=promotion.pk).sync_merchants()
+    invalidate_catalog([merchant_id, *merchant_ids])
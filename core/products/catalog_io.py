@@ -0,0 +1,232 @@
+import csv
+import json
+from itertools import islice
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from rest_framework import serializers
+from core.products.bulk import RELATION_MODELS, create_items, resolve_names
+from core.products.models import Product, Service, Promotion
+
+
+# Column layout shared by catalog imports and exports. Relation columns hold
+# names separated by LIST_SEPARATOR in CSV files and plain lists in JSONL.
+FIELDS = ('name', 'description', 'price', 'is_active', 'categories', 'hashtags', 'keywords')
+LIST_SEPARATOR = '|'
+FORMATS = ('csv', 'jsonl')
+EXPORT_FIELDS = ('id',) + FIELDS
+PROMOTION_FIELDS = (
+    'id', 'name', 'description', 'discount_percent', 'start_date',
+    'end_date', 'is_active', 'products', 'services',
+)
+CONTENT_TYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+CATALOG_MODELS = {'products': Product, 'services': Service}
+EXPORT_KINDS = ('products', 'services', 'promotions')
+
+
+class CatalogRowSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True, default='')
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    is_active = serializers.BooleanField(default=True)
+    categories = serializers.ListField(child=serializers.CharField(max_length=100), default=list)
+    hashtags = serializers.ListField(child=serializers.CharField(max_length=100), default=list)
+    keywords = serializers.ListField(child=serializers.CharField(max_length=100), default=list)
+
+    def validate_hashtags(self, value):
+        return [name.lstrip('#') for name in value]
+
+
+def guess_format(path):
+    return 'jsonl' if str(path).endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(stream, fmt):
+    """
+    Yield raw row dicts from a CSV or JSONL text stream, one at a time. A
+    JSONL line that does not parse is yielded as a ValidationError, which
+    the importer counts as an invalid row.
+    """
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            for relation_name in RELATION_MODELS:
+                value = row.get(relation_name) or ''
+                row[relation_name] = [name.strip() for name in value.split(LIST_SEPARATOR) if name.strip()]
+            if row.get('is_active') in ('', None):
+                row.pop('is_active', None)
+            yield row
+    else:
+        for line in stream:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield serializers.ValidationError(f'Invalid JSON: {exc}')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class CatalogImporter:
+    """
+    Stream rows into products or services ``chunk_size`` rows at a time.
+
+    Each chunk resolves its category/hashtag/keyword names (creating missing
+    ones) with one query per type and is written by core.products.bulk in
+    its own transaction, so memory stays bounded by the chunk size and an
+    interrupted import can resume after the last committed chunk.
+    ``on_chunk`` runs in that transaction, progress it writes to the
+    database commits with the chunk.
+    """
+    max_errors = 100
+
+    def __init__(self, model, merchant_id, chunk_size=1000):
+        self.model = model
+        self.merchant_id = merchant_id
+        self.chunk_size = chunk_size
+        # One instance for every row, building serializer fields is costly
+        self.validator = CatalogRowSerializer()
+        self.known_names = {relation_name: {} for relation_name in RELATION_MODELS}
+        self.rows = 0
+        self.created = 0
+        # An item created by the last chunk, None when all its rows were invalid
+        self.last_created_id = None
+        self.invalid = 0
+        # Only the first invalid rows are kept, to keep memory bounded
+        self.errors = []
+
+    def run(self, rows, skip=0, on_chunk=None):
+        rows = enumerate(rows, start=1)
+        if skip:
+            rows = islice(rows, skip, None)
+            self.rows = skip
+
+        for chunk in chunked(rows, self.chunk_size):
+            with transaction.atomic():
+                self.import_chunk(chunk)
+                self.rows = chunk[-1][0]
+                if on_chunk:
+                    on_chunk(self)
+        return self
+
+    def import_chunk(self, chunk):
+        items = []
+        for line, row in chunk:
+            try:
+                if isinstance(row, serializers.ValidationError):
+                    raise row
+                # Rows that are not objects are rejected by the serializer
+                items.append(dict(self.validator.run_validation(row)))
+            except serializers.ValidationError as exc:
+                self.invalid += 1
+                if len(self.errors) < self.max_errors:
+                    self.errors.append((line, exc.detail))
+        self.last_created_id = None
+        if not items:
+            return
+
+        relations = [{} for _ in items]
+        with transaction.atomic():
+            for relation_name, model in RELATION_MODELS.items():
+                names = {name for item in items for name in item[relation_name]}
+                ids = resolve_names(model, names, self.known_names[relation_name])
+                for item, rel in zip(items, relations):
+                    rel[relation_name] = [ids[name] for name in item.pop(relation_name)]
+
+            objects = create_items(self.model, self.merchant_id, items, relations)
+        self.created += len(items)
+        self.last_created_id = objects[-1].pk
+
+
+def iter_items(model, merchant_id, chunk_size=2000):
+    """
+    Yield export rows for a merchant's products or services.
+
+    Rows are read with a server-side cursor and the relation names of each
+    chunk are fetched with one query per relation, so memory is bounded by
+    ``chunk_size`` whatever the catalog size.
+    """
+    rows = model.objects.filter(merchant_id=merchant_id).values(
+        'id', 'name', 'description', 'price', 'is_active'
+    ).iterator(chunk_size=chunk_size)
+
+    for chunk in chunked(rows, chunk_size):
+        ids = [row['id'] for row in chunk]
+        names = {relation_name: {} for relation_name in RELATION_MODELS}
+        for relation_name in RELATION_MODELS:
+            field = model._meta.get_field(relation_name)
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            links = field.remote_field.through.objects.filter(
+                **{f'{source}_id__in': ids}
+            ).values_list(f'{source}_id', f'{target}__name')
+            for item_id, name in links:
+                names[relation_name].setdefault(item_id, []).append(name)
+
+        for row in chunk:
+            for relation_name in RELATION_MODELS:
+                row[relation_name] = names[relation_name].get(row['id'], [])
+            yield row
+
+
+def iter_promotions(merchant_id, chunk_size=2000):
+    rows = Promotion.objects.for_merchant(merchant_id).values(
+        'id', 'name', 'description', 'discount_percent',
+        'start_date', 'end_date', 'is_active',
+    ).iterator(chunk_size=chunk_size)
+
+    for chunk in chunked(rows, chunk_size):
+        ids = [row['id'] for row in chunk]
+        members = {'products': {}, 'services': {}}
+        for relation_name in members:
+            through = Promotion._meta.get_field(relation_name).remote_field.through
+            target = 'product_id' if relation_name == 'products' else 'service_id'
+            for promotion_id, item_id in through.objects.filter(
+                promotion_id__in=ids
+            ).values_list('promotion_id', target):
+                members[relation_name].setdefault(promotion_id, []).append(item_id)
+
+        for row in chunk:
+            for relation_name, mapping in members.items():
+                row[relation_name] = mapping.get(row['id'], [])
+            yield row
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, tuple)):
+        return LIST_SEPARATOR.join(str(v) for v in value)
+    return value
+
+
+def render_rows(rows, fmt, fields, batch_size=500):
+    """Encode rows as CSV or JSONL text, a batch of lines per yielded string."""
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+
+        def encode(row):
+            return writer.writerow([_csv_value(row[field]) for field in fields])
+
+        yield writer.writerow(fields)
+    else:
+        def encode(row):
+            return json.dumps({field: row[field] for field in fields}, cls=DjangoJSONEncoder) + '\n'
+
+    for batch in chunked(rows, batch_size):
+        yield ''.join(encode(row) for row in batch)
+
+
+def export_catalog(kind, merchant_id, fmt, chunk_size=2000):
+    if kind == 'promotions':
+        rows, fields = iter_promotions(merchant_id, chunk_size), PROMOTION_FIELDS
+    else:
+        rows, fields = iter_items(CATALOG_MODELS[kind], merchant_id, chunk_size), EXPORT_FIELDS
+    return render_rows(rows, fmt, fields)
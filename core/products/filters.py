@@ -0,0 +1,37 @@
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from core.products.serializers import CatalogPriceQuerySerializer
+
+
+class EffectivePriceFilter(BaseFilterBackend):
+    """
+    ``?min_price=``/``?max_price=`` on the price after the best active
+    promotion, and ``?on_sale=true|false``. Served by the
+    (merchant, effective_price) indexes.
+    """
+    def filter_queryset(self, request, queryset, view):
+        params = CatalogPriceQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        if 'min_price' in filters:
+            queryset = queryset.filter(effective_price__gte=filters['min_price'])
+        if 'max_price' in filters:
+            queryset = queryset.filter(effective_price__lte=filters['max_price'])
+        if filters['on_sale'] is True:
+            queryset = queryset.filter(best_discount_percent__gt=0)
+        elif filters['on_sale'] is False:
+            queryset = queryset.filter(best_discount_percent=0)
+        return queryset
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    ``?ordering=`` with ``id`` as the final tie-breaker, so pages never
+    overlap. The tie-breaker follows the direction of the first field, which
+    lets the (merchant, effective_price, id) indexes serve both directions.
+    """
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or [])
+        if ordering and not any(field.lstrip('-') == 'id' for field in ordering):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return ordering
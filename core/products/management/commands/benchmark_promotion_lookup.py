@@ -0,0 +1,119 @@
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from core.merchants.models import Merchant
+from core.products.models import Product, Service, Promotion
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the merchant promotion lookup against the previous OR + DISTINCT "
+        "query for growing numbers of promoted items. Seeds a throwaway "
+        "dataset that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', default='100,1000,5000',
+                            help='Comma separated promoted items per merchant')
+        parser.add_argument('--promotions', type=int, default=20,
+                            help='Promotions per merchant, each covering every item')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--timeout', type=int, default=5,
+                            help='Seconds after which a query is cancelled (PostgreSQL)')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['items'].split(',')]
+        except ValueError:
+            raise CommandError('--items must be comma separated integers')
+        if options['repeat'] < 1 or options['promotions'] < 1 or min(sizes) < 1:
+            raise CommandError('--items, --promotions and --repeat must be positive')
+
+        self.stdout.write(f'{"items":>8} {"or+distinct ms":>15} {"for_merchant ms":>16}')
+        with transaction.atomic():
+            for size in sizes:
+                merchant = self.seed(size, options['promotions'])
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        for table in ('products', 'services', 'promotions',
+                                      'promotions_products', 'promotions_services'):
+                            cursor.execute(f'ANALYZE {table}')
+
+                legacy = Promotion.objects.filter(
+                    Q(products__merchant_id=merchant.pk) | Q(services__merchant_id=merchant.pk)
+                ).distinct()
+                current = Promotion.objects.for_merchant(merchant.pk)
+                self.stdout.write(
+                    f'{size:>8} {self.time(legacy, options):>15} '
+                    f'{self.time(current, options):>16}'
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def time(queryset, options):
+        """Median milliseconds, or the timeout when the query was cancelled."""
+        timings = []
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET statement_timeout = %s', [options['timeout'] * 1000])
+            try:
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    try:
+                        with transaction.atomic():
+                            list(queryset.all())
+                    except OperationalError:
+                        return f'> {options["timeout"] * 1000}'
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('SET statement_timeout = 0')
+        return f'{statistics.median(timings):.2f}'
+
+    @staticmethod
+    def seed(item_count, promotion_count):
+        now = timezone.now()
+        user = User.objects.create(username=f'benchmark-{uuid.uuid4().hex}', password='!')
+        merchant = Merchant.objects.create(user=user, name='Benchmark', address='-')
+        promotions = Promotion.objects.bulk_create(
+            Promotion(
+                name=f'Promotion {i}',
+                description='-',
+                discount_percent=Decimal('10.00'),
+                start_date=now - timedelta(days=1),
+                end_date=now + timedelta(days=7),
+            )
+            for i in range(promotion_count)
+        )
+
+        for model, relation_name in ((Product, 'products'), (Service, 'services')):
+            items = model.objects.bulk_create(
+                (
+                    model(merchant=merchant, name=f'Item {i}', description='-', price=Decimal('100.00'))
+                    for i in range(item_count)
+                ),
+                batch_size=1000,
+            )
+            through = Promotion._meta.get_field(relation_name).remote_field.through
+            item_field = f'{model._meta.model_name}_id'
+            through.objects.bulk_create(
+                (
+                    through(promotion_id=promotion.pk, **{item_field: item.pk})
+                    for promotion in promotions
+                    for item in items
+                ),
+                batch_size=5000,
+            )
+        # bulk_create() sends no m2m_changed, link the merchant by hand
+        Promotion.objects.filter(pk__in=[p.pk for p in promotions]).sync_merchants()
+        return merchant
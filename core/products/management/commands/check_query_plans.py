@@ -0,0 +1,162 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from core.merchants.models import Merchant
+from core.products.models import (
+    Category,
+    Hashtag,
+    Keyword,
+    Product,
+    Service,
+    Promotion,
+)
+from core.products.search import refresh_search_vectors, search_catalog
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway dataset, EXPLAIN the hot catalog queries and fail "
+        "if the planner does not use the expected indexes. Nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--merchants', type=int, default=20)
+        parser.add_argument('--items', type=int, default=200,
+                            help='Products and services per merchant')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plans can only be checked on PostgreSQL')
+
+        failures = []
+        with transaction.atomic():
+            merchant = self.seed(options['merchants'], options['items'])
+            with connection.cursor() as cursor:
+                for table in ('products', 'services', 'promotions', 'promotions_merchants',
+                              'categories', 'hashtags', 'keywords'):
+                    cursor.execute(f'ANALYZE {table}')
+                # Fresh GIN entries sit in the pending list until autovacuum
+                # merges them, which the planner would count against the index
+                for index in ('products_search_idx', 'services_search_idx'):
+                    cursor.execute('SELECT gin_clean_pending_list(%s::regclass)', [index])
+
+            for label, queryset, index in self.get_checks(merchant, options['items']):
+                plan = queryset.explain()
+                used = index in plan
+                if options['verbosity'] > 1 or not used:
+                    self.stdout.write(f'{label}:\n{plan}\n')
+                if used:
+                    self.stdout.write(self.style.SUCCESS(f'{label}: uses {index}'))
+                else:
+                    failures.append(f'{label} does not use {index}')
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError('; '.join(failures))
+
+    def get_checks(self, merchant, item_count):
+        now = timezone.now()
+        # Matches one item per merchant
+        text = str(item_count - 1)
+        return [
+            (
+                'Active products of a merchant',
+                Product.objects.filter(merchant=merchant, is_active=True).order_by('-created_at')[:10],
+                'products_merchant_active_idx',
+            ),
+            (
+                'Active services of a merchant',
+                Service.objects.filter(merchant=merchant, is_active=True).order_by('-created_at')[:10],
+                'services_merchant_active_idx',
+            ),
+            (
+                'Products of a merchant by final price',
+                Product.objects.filter(merchant=merchant).order_by('effective_price', 'id')[:10],
+                'products_merchant_price_idx',
+            ),
+            (
+                'Promotions of a merchant',
+                Promotion.objects.for_merchant(merchant.pk),
+                # Auto-created M2M index, the name ends with a hash
+                'promotions_merchants_merchant_id',
+            ),
+            (
+                'Currently active promotions',
+                Promotion.objects.active(now),
+                'promotions_active_window_idx',
+            ),
+            ('Category by name', Category.objects.filter(name='category-1'), 'categories_name_idx'),
+            ('Hashtag by name', Hashtag.objects.filter(name='hashtag-1'), 'hashtags_name_idx'),
+            ('Keyword by name', Keyword.objects.filter(name='keyword-1'), 'keywords_name_idx'),
+            ('Product search', search_catalog(Product, text)[:10], 'products_search_idx'),
+            ('Service search', search_catalog(Service, text)[:10], 'services_search_idx'),
+        ]
+
+    def seed(self, merchant_count, item_count):
+        now = timezone.now()
+        users = User.objects.bulk_create(
+            User(username=f'plan-check-{uuid.uuid4().hex}', password='!')
+            for _ in range(merchant_count)
+        )
+        merchants = Merchant.objects.bulk_create(
+            Merchant(user=user, name=f'Merchant {i}', address='-')
+            for i, user in enumerate(users)
+        )
+
+        for model in (Product, Service):
+            model.objects.bulk_create(
+                (
+                    model(
+                        merchant=merchant,
+                        name=f'Item {i}',
+                        description='-',
+                        price=Decimal('100.00'),
+                        is_active=i % 5 != 0,
+                    )
+                    for merchant in merchants
+                    for i in range(item_count)
+                ),
+                batch_size=1000,
+            )
+            refresh_search_vectors(model, model.objects.filter(merchant__in=merchants).values('pk'))
+
+        # Mostly expired or disabled promotions, as in a long-running catalog
+        promotion_count = merchant_count * item_count // 2
+        promotions = Promotion.objects.bulk_create(
+            (
+                Promotion(
+                    name=f'Promotion {i}',
+                    description='-',
+                    discount_percent=Decimal('10.00'),
+                    start_date=now - timedelta(days=i + 30),
+                    end_date=now + timedelta(days=7) if i % 100 == 0 else now - timedelta(days=i + 1),
+                    is_active=i % 3 != 0,
+                )
+                for i in range(promotion_count)
+            ),
+            batch_size=1000,
+        )
+        through = Promotion.merchants.through
+        through.objects.bulk_create(
+            (
+                through(promotion_id=promotion.pk, merchant_id=merchants[i % merchant_count].pk)
+                for i, promotion in enumerate(promotions)
+            ),
+            batch_size=1000,
+        )
+
+        for model, prefix in ((Category, 'category'), (Hashtag, 'hashtag'), (Keyword, 'keyword')):
+            model.objects.bulk_create(
+                (model(name=f'{prefix}-{i}') for i in range(merchant_count * item_count // 2)),
+                batch_size=1000,
+            )
+
+        return merchants[0]
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from core.products.autocomplete import create_trigram_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Install pg_trgm and the trigram indexes of category, hashtag and "
+        "keyword names, e.g. once the extension has been made available "
+        "after migration 0005 skipped them. Does not block writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if not create_trigram_indexes(options['database']):
+            raise CommandError('The pg_trgm extension is not available on this database server')
+        self.stdout.write(self.style.SUCCESS('Trigram indexes created'))
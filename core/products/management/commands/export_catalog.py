@@ -0,0 +1,37 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from core.merchants.models import Merchant
+from core.products.catalog_io import EXPORT_KINDS, FORMATS, export_catalog, guess_format
+
+
+class Command(BaseCommand):
+    help = (
+        "Export a merchant's products, services or promotions as CSV or JSONL, "
+        "streaming rows from a server-side cursor."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--merchant', required=True, help='Merchant id')
+        parser.add_argument('--type', choices=EXPORT_KINDS, default='products')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the output extension, or csv')
+        parser.add_argument('--output', help='Output file, stdout when omitted')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            merchant = Merchant.objects.get(pk=options['merchant'])
+        except (Merchant.DoesNotExist, ValidationError, ValueError):
+            raise CommandError(f"Merchant {options['merchant']} not found")
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        output = options['output']
+        fmt = options['format'] or (guess_format(output) if output else 'csv')
+        chunks = export_catalog(options['type'], merchant.pk, fmt, options['chunk_size'])
+
+        if output:
+            with open(output, 'w', newline='', encoding='utf-8') as f:
+                f.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
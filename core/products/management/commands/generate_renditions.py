@@ -0,0 +1,42 @@
+import time
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from core.images import IMAGE_FIELDS, IMAGE_MERCHANT_FIELDS, generate_renditions, invalidate_image_responses
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the resized renditions of product images and merchant "
+        "logos, e.g. for uploads made before the pipeline existed or after "
+        "changing IMAGE_RENDITIONS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(IMAGE_FIELDS), help='Defaults to both')
+
+    def handle(self, *args, **options):
+        kinds = [options['type']] if options['type'] else sorted(IMAGE_FIELDS)
+        for kind in kinds:
+            model_label, field_name = IMAGE_FIELDS[kind]
+            model = apps.get_model(model_label)
+            field = model._meta.get_field(field_name)
+            started = time.monotonic()
+            done = failed = 0
+            # Content-addressed files shared by several rows are rendered once
+            names = model.objects.exclude(**{field_name: ''}).values_list(field_name, flat=True).distinct()
+            for name in names.iterator(chunk_size=500):
+                try:
+                    generate_renditions(field.attr_class(None, field, name))
+                except OSError as exc:
+                    failed += 1
+                    self.stderr.write(f'{kind}: {name}: {exc}')
+                    continue
+                done += 1
+            # Responses cached before an image had renditions point at the original
+            invalidate_image_responses(
+                model_label,
+                model.objects.exclude(**{field_name: ''}).values_list(IMAGE_MERCHANT_FIELDS[model_label], flat=True),
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Rendered {done} {kind} images in {time.monotonic() - started:.1f}s ({failed} failed)'
+            ))
@@ -0,0 +1,116 @@
+import json
+import os
+import time
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from core.merchants.models import Merchant
+from core.products.catalog_io import (
+    CATALOG_MODELS,
+    FORMATS,
+    CatalogImporter,
+    guess_format,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a CSV or JSONL catalog file into a merchant's products or "
+        "services with batched writes. Missing categories, hashtags and "
+        "keywords are created by name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file to import')
+        parser.add_argument('--merchant', required=True, help='Merchant id')
+        parser.add_argument('--type', choices=sorted(CATALOG_MODELS), default='products')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording the last committed row; resumes from it when present',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            merchant = Merchant.objects.get(pk=options['merchant'])
+        except (Merchant.DoesNotExist, ValidationError, ValueError):
+            raise CommandError(f"Merchant {options['merchant']} not found")
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        model = CATALOG_MODELS[options['type']]
+        checkpoint = options['checkpoint']
+        skip = self.read_checkpoint(checkpoint, path, model)
+        if skip:
+            self.stdout.write(f'Resuming after row {skip}')
+
+        importer = CatalogImporter(model, merchant.pk, options['chunk_size'])
+        started = time.monotonic()
+        committed = skip
+
+        def report(importer):
+            nonlocal committed
+            if checkpoint:
+                # Before the chunk commits, see read_checkpoint
+                self.write_checkpoint(checkpoint, path, committed, {
+                    'rows': importer.rows,
+                    'id': importer.last_created_id and str(importer.last_created_id),
+                })
+            committed = importer.rows
+            elapsed = time.monotonic() - started
+            rate = (importer.rows - skip) / elapsed if elapsed else 0
+            self.stdout.write(
+                f'rows={importer.rows} created={importer.created} '
+                f'invalid={importer.invalid} {rate:.0f} rows/s'
+            )
+
+        with open(path, newline='', encoding='utf-8') as stream:
+            importer.run(read_rows(stream, fmt), skip=skip, on_chunk=report)
+        if checkpoint:
+            self.write_checkpoint(checkpoint, path, importer.rows)
+
+        for line, errors in importer.errors:
+            self.stderr.write(f'Row {line}: {errors}')
+        if importer.invalid > len(importer.errors):
+            self.stderr.write(f'... and {importer.invalid - len(importer.errors)} more invalid rows')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.created} {options["type"]} from {importer.rows - skip} rows '
+            f'in {elapsed:.1f}s ({importer.invalid} invalid)'
+        ))
+
+    @staticmethod
+    def read_checkpoint(checkpoint, path, model):
+        """
+        Rows committed by the interrupted run. A file cannot commit with
+        the database: each chunk's rows are written as ``pending`` before
+        the chunk commits, with an item it created, and count as committed
+        if that item exists.
+        """
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as f:
+            state = json.load(f)
+        if state.get('source') != os.path.abspath(path):
+            raise CommandError(f'Checkpoint {checkpoint} belongs to {state.get("source")}')
+        pending = state.get('pending')
+        # A chunk of invalid rows wrote nothing, skipping it again is harmless
+        if pending and (pending['id'] is None or model.objects.filter(pk=pending['id']).exists()):
+            return pending['rows']
+        return state['rows']
+
+    @staticmethod
+    def write_checkpoint(checkpoint, path, rows, pending=None):
+        tmp = f'{checkpoint}.tmp'
+        state = {'source': os.path.abspath(path), 'rows': rows}
+        if pending:
+            state['pending'] = pending
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, checkpoint)
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from core.products.catalog_io import CATALOG_MODELS
+from core.products.search import rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the full-text search vectors of products and services in "
+        "batches, e.g. after changing SEARCH_CONFIG."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(CATALOG_MODELS), help='Defaults to both')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        kinds = [options['type']] if options['type'] else sorted(CATALOG_MODELS)
+        for kind in kinds:
+            started = time.monotonic()
+            done = 0
+            for done in rebuild_search_vectors(CATALOG_MODELS[kind], options['batch_size']):
+                self.stdout.write(f'{kind}: {done} rows')
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt {done} {kind} search vectors in {time.monotonic() - started:.1f}s'
+            ))
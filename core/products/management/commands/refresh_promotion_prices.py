@@ -0,0 +1,50 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from core.cache import invalidate_catalog
+from core.merchants.models import Merchant
+from core.products.pricing import (
+    CATALOG_ITEM_MODELS,
+    promotions_changing_between,
+    refresh_prices,
+    refresh_promotion_items,
+)
+from core.products.signals import promotion_merchant_ids
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the effective prices of items whose promotions started or "
+        "ended recently. Schedule it every minute (cron, systemd timer); runs "
+        "overlap through --lookback so a missed run is caught up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookback', type=int, default=10,
+                            help='Minutes of promotion window changes to apply')
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every product and service')
+
+    def handle(self, *args, **options):
+        if options['lookback'] < 1:
+            raise CommandError('--lookback must be positive')
+        now = timezone.now()
+
+        if options['all']:
+            with transaction.atomic():
+                for model in CATALOG_ITEM_MODELS:
+                    updated = refresh_prices(model, now=now)
+                    self.stdout.write(f'{model._meta.db_table}: {updated} rows')
+                invalidate_catalog(Merchant.objects.values_list('pk', flat=True))
+            return
+
+        since = now - timedelta(minutes=options['lookback'])
+        with transaction.atomic():
+            promotion_ids = list(promotions_changing_between(since, now).values_list('pk', flat=True))
+            if promotion_ids:
+                refresh_promotion_items(promotion_ids, now)
+                invalidate_catalog(promotion_merchant_ids(promotion_ids))
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed the items of {len(promotion_ids)} promotions'
+        ))
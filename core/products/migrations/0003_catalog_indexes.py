@@ -0,0 +1,41 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:23
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('merchants', '0001_initial'),
+        ('products', '0002_rename_title_promotion_name_remove_promotion_product_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='category',
+            index=models.Index(fields=['name'], name='categories_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='hashtag',
+            index=models.Index(fields=['name'], name='hashtags_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='keyword',
+            index=models.Index(fields=['name'], name='keywords_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['merchant', 'is_active', 'created_at'], name='products_merchant_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='promotion',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['end_date', 'start_date'], name='promotions_active_window_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='service',
+            index=models.Index(fields=['merchant', 'is_active', 'created_at'], name='services_merchant_active_idx'),
+        ),
+    ]
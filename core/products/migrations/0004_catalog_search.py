@@ -0,0 +1,78 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:35
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def search_vector(model):
+    # core.products.search.search_vector as of this migration, on the
+    # historical models
+    config = settings.SEARCH_CONFIG
+    vector = SearchVector('name', weight='A', config=config)
+    for relation_name in ('categories', 'hashtags', 'keywords'):
+        field = model._meta.get_field(relation_name)
+        source = field.m2m_field_name()
+        names = field.remote_field.through.objects.filter(
+            **{source: OuterRef('pk')}
+        ).values(source).annotate(
+            names=StringAgg(f'{field.m2m_reverse_field_name()}__name', ' ')
+        ).values('names')
+        vector += SearchVector(
+            Coalesce(Subquery(names), Value(''), output_field=TextField()), weight='B', config=config
+        )
+    return vector + SearchVector('description', weight='C', config=config)
+
+
+def backfill_search_vectors(apps, schema_editor):
+    for model_name in ('Product', 'Service'):
+        model = apps.get_model('products', model_name)
+        vector = search_vector(model)
+        batch = []
+        for pk in model.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=BATCH_SIZE):
+            batch.append(pk)
+            if len(batch) == BATCH_SIZE:
+                model.objects.filter(pk__in=batch).update(search_vector=vector)
+                batch = []
+        if batch:
+            model.objects.filter(pk__in=batch).update(search_vector=vector)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('merchants', '0001_initial'),
+        ('products', '0003_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='products_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='service',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='services_search_idx'),
+        ),
+    ]
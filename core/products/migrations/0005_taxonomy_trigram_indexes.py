@@ -0,0 +1,30 @@
+from django.db import migrations
+from core.products.autocomplete import TRIGRAM_TABLES, create_trigram_indexes
+
+
+def create_indexes(apps, schema_editor):
+    # Without pg_trgm autocomplete falls back to prefix matching; install
+    # the extension later and run `manage.py create_trigram_indexes`
+    create_trigram_indexes(schema_editor.connection.alias)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TRIGRAM_TABLES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {table}_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. The indexes
+    # are not declared on the models because pg_trgm may be unavailable.
+    atomic = False
+
+    dependencies = [
+        ('products', '0004_catalog_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
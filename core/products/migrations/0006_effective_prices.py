@@ -0,0 +1,74 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:45
+
+import django.db.models.expressions
+import django.db.models.functions.math
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import DecimalField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill_discounts(apps, schema_editor):
+    # core.products.pricing.refresh_prices as of this migration, on the
+    # historical models
+    now = timezone.now()
+    active = apps.get_model('products', 'Promotion').objects.filter(
+        is_active=True, start_date__lte=now, end_date__gte=now,
+    )
+    for model_name in ('Product', 'Service'):
+        model = apps.get_model('products', model_name)
+        item_field = model._meta.model_name
+        discounts = model.promotions.through.objects.filter(
+            **{item_field: OuterRef('pk')},
+            promotion__in=active.values('pk'),
+        ).values(item_field).annotate(best=Max('promotion__discount_percent')).values('best')
+        model.objects.update(best_discount_percent=Coalesce(
+            Subquery(discounts), Value(0),
+            output_field=DecimalField(max_digits=5, decimal_places=2),
+        ))
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    # Adding a stored generated column rewrites the products and services
+    # tables under an ACCESS EXCLUSIVE lock, blocking reads and writes of
+    # the table for the duration: run it in a maintenance window.
+    atomic = False
+
+    dependencies = [
+        ('merchants', '0001_initial'),
+        ('products', '0005_taxonomy_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='best_discount_percent',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='best_discount_percent',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('price'), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('best_discount_percent'))), '/', models.Value(100)), 2), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='effective_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('price'), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('best_discount_percent'))), '/', models.Value(100)), 2), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.RunPython(backfill_discounts, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['merchant', 'effective_price', 'id'], name='products_merchant_price_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='service',
+            index=models.Index(fields=['merchant', 'effective_price', 'id'], name='services_merchant_price_idx'),
+        ),
+    ]
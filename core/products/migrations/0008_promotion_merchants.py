@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+BACKFILL_SQL = '''
+    INSERT INTO promotions_merchants (promotion_id, merchant_id)
+    SELECT DISTINCT links.promotion_id, items.merchant_id
+    FROM {through} links JOIN {table} items ON items.id = links.{column}
+    ON CONFLICT DO NOTHING
+'''
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('merchants', '0001_initial'),
+        ('products', '0006_effective_prices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='promotion',
+            name='merchants',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='promotions', to='merchants.merchant'),
+        ),
+        migrations.RunSQL(
+            [
+                BACKFILL_SQL.format(through='promotions_products', table='products', column='product_id'),
+                BACKFILL_SQL.format(through='promotions_services', table='services', column='service_id'),
+            ],
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:15
+
+import core.images
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_promotion_merchants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(upload_to='products/images/', validators=[core.images.validate_image_upload]),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:23
+
+import core.images
+import core.media.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_image_upload_limits'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(storage=core.media.storage.media_storage, upload_to='products/images/', validators=[core.images.validate_image_upload]),
+        ),
+    ]
@@ -1,4 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Round
+from django.utils import timezone
+from core.images import validate_image_upload
+from core.media.storage import media_storage
 from core.models import BaseModel
 from django.core.exceptions import ValidationError
 
@@ -9,6 +15,9 @@ class Category(BaseModel):
     
     class Meta:
         db_table = 'categories'
+        indexes = [
+            models.Index(fields=['name'], name='categories_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -19,6 +28,9 @@ class Hashtag(BaseModel):
     
     class Meta:
         db_table = 'hashtags'
+        indexes = [
+            models.Index(fields=['name'], name='hashtags_name_idx'),
+        ]
 
     def __str__(self):
         return f'#{self.name}'
@@ -29,24 +41,67 @@ class Keyword(BaseModel):
     
     class Meta:
         db_table = 'keywords'
+        indexes = [
+            models.Index(fields=['name'], name='keywords_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class CatalogItemQuerySet(models.QuerySet):
+    def with_related(self, now=None, promotions=True):
+        # Batch every relation the serializers touch, so a page costs the same
+        # number of queries whatever its size. Lists read the denormalized
+        # prices instead of the promotions, see core.products.pricing.
+        queryset = self.prefetch_related('categories', 'hashtags', 'keywords')
+        if not promotions:
+            return queryset
+        return queryset.prefetch_related(
+            models.Prefetch(
+                'promotions',
+                queryset=Promotion.objects.active(now).prefetch_related(
+                    models.Prefetch('products', queryset=Product.objects.only('id')),
+                    models.Prefetch('services', queryset=Service.objects.only('id')),
+                ),
+                to_attr='active_promotions',
+            ),
+        )
+
+
 class Product(BaseModel):
     merchant = models.ForeignKey('merchants.Merchant', on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
-    image = models.ImageField(upload_to='products/images/')
+    image = models.ImageField(upload_to='products/images/', storage=media_storage, validators=[validate_image_upload])
     categories = models.ManyToManyField(Category)
     hashtags = models.ManyToManyField(Hashtag)
     keywords = models.ManyToManyField(Keyword)
     is_active = models.BooleanField(default=True)
+    # Maintained by core.products.search, see signals and bulk writes
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Best active promotion, maintained by core.products.pricing
+    best_discount_percent = models.DecimalField(max_digits=5, decimal_places=2, default=0, editable=False)
+    # Price after that discount, computed by the database
+    effective_price = models.GeneratedField(
+        expression=Round(models.F('price') * (100 - models.F('best_discount_percent')) / 100, 2),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+
+    objects = CatalogItemQuerySet.as_manager()
 
     class Meta:
         db_table = 'products'
+        indexes = [
+            models.Index(
+                fields=['merchant', 'is_active', 'created_at'],
+                name='products_merchant_active_idx',
+            ),
+            models.Index(fields=['merchant', 'effective_price', 'id'], name='products_merchant_price_idx'),
+            GinIndex(fields=['search_vector'], name='products_search_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name} - {self.merchant.name}'
@@ -61,14 +116,80 @@ class Service(BaseModel):
     hashtags = models.ManyToManyField(Hashtag)
     keywords = models.ManyToManyField(Keyword)
     is_active = models.BooleanField(default=True)
+    # Maintained by core.products.search, see signals and bulk writes
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Best active promotion, maintained by core.products.pricing
+    best_discount_percent = models.DecimalField(max_digits=5, decimal_places=2, default=0, editable=False)
+    # Price after that discount, computed by the database
+    effective_price = models.GeneratedField(
+        expression=Round(models.F('price') * (100 - models.F('best_discount_percent')) / 100, 2),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+
+    objects = CatalogItemQuerySet.as_manager()
 
     class Meta:
         db_table = 'services'
+        indexes = [
+            models.Index(
+                fields=['merchant', 'is_active', 'created_at'],
+                name='services_merchant_active_idx',
+            ),
+            models.Index(fields=['merchant', 'effective_price', 'id'], name='services_merchant_price_idx'),
+            GinIndex(fields=['search_vector'], name='services_search_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name} - {self.merchant.name}'
 
 
+class PromotionQuerySet(models.QuerySet):
+    def active(self, now=None):
+        now = now or timezone.now()
+        return self.filter(is_active=True, start_date__lte=now, end_date__gte=now)
+
+    def for_merchant(self, merchant_id):
+        # One indexed join on the maintained merchant links, instead of
+        # OR-ing joins through both item tables and deduplicating the rows
+        return self.filter(merchants=merchant_id)
+
+    def sync_merchants(self):
+        """
+        Rebuild the merchant links of these promotions from their items.
+        Returns the ids of the merchants linked before or after.
+        """
+        promotion_ids = list(self.values_list('pk', flat=True))
+        if not promotion_ids:
+            return set()
+        wanted = set()
+        for model in (Product, Service):
+            wanted.update(
+                model.objects.filter(promotions__in=promotion_ids)
+                .values_list('promotions', 'merchant_id').distinct()
+            )
+
+        through = Promotion.merchants.through
+        current = set(
+            through.objects.filter(promotion_id__in=promotion_ids)
+            .values_list('promotion_id', 'merchant_id')
+        )
+        stale = current - wanted
+        if stale:
+            condition = models.Q()
+            for promotion_id, merchant_id in stale:
+                condition |= models.Q(promotion_id=promotion_id, merchant_id=merchant_id)
+            through.objects.filter(condition).delete()
+        through.objects.bulk_create(
+            (
+                through(promotion_id=promotion_id, merchant_id=merchant_id)
+                for promotion_id, merchant_id in wanted - current
+            ),
+            ignore_conflicts=True,
+        )
+        return {merchant_id for _, merchant_id in current | wanted}
+
+
 class Promotion(BaseModel):
     name = models.CharField(max_length=255)
     description = models.TextField()
@@ -78,9 +199,24 @@ class Promotion(BaseModel):
     is_active = models.BooleanField(default=True)
     products = models.ManyToManyField(Product, related_name='promotions', blank=True)
     services = models.ManyToManyField(Service, related_name='promotions', blank=True)
+    # Merchants owning at least one item of the promotion, kept in sync with
+    # products/services by core.products.signals
+    merchants = models.ManyToManyField(
+        'merchants.Merchant', related_name='promotions', blank=True, editable=False
+    )
+
+    objects = PromotionQuerySet.as_manager()
 
     class Meta:
         db_table = 'promotions'
+        indexes = [
+            # Only active promotions are ever looked up by date window
+            models.Index(
+                fields=['end_date', 'start_date'],
+                condition=models.Q(is_active=True),
+                name='promotions_active_window_idx',
+            ),
+        ]
         
     def clean(self):
         if self.start_date and self.end_date and self.start_date >= self.end_date:
@@ -0,0 +1,44 @@
+from django.db.models import DecimalField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from core.products.models import Product, Service, Promotion
+
+
+CATALOG_ITEM_MODELS = (Product, Service)
+
+
+def best_discount(model, now=None):
+    """Highest discount among the item's active promotions, 0 without any."""
+    through = model.promotions.through
+    item_field = model._meta.model_name
+    discounts = through.objects.filter(
+        **{item_field: OuterRef('pk')},
+        promotion__in=Promotion.objects.active(now).values('pk'),
+    ).values(item_field).annotate(best=Max('promotion__discount_percent')).values('best')
+    return Coalesce(
+        Subquery(discounts), Value(0),
+        output_field=DecimalField(max_digits=5, decimal_places=2),
+    )
+
+
+def refresh_prices(model, pks=None, now=None):
+    """
+    Recompute ``best_discount_percent`` in one SQL UPDATE for the given items
+    (every item when ``pks`` is None). ``effective_price`` is a generated
+    column and follows it.
+    """
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    return queryset.update(best_discount_percent=best_discount(model, now))
+
+
+def refresh_promotion_items(promotion_ids, now=None):
+    """Refresh every product and service of the given promotions."""
+    for model in CATALOG_ITEM_MODELS:
+        refresh_prices(model, model.objects.filter(promotions__in=promotion_ids).values('pk'), now)
+
+
+def promotions_changing_between(since, now):
+    """Promotions whose window opened or closed in (since, now]."""
+    return Promotion.objects.filter(
+        Q(start_date__gt=since, start_date__lte=now) |
+        Q(end_date__gte=since, end_date__lt=now)
+    )
@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db.models import Exists, F, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from core.products.models import Promotion
+
+
+RELATION_NAMES = ('categories', 'hashtags', 'keywords')
+# The item name weighs most, then its taxonomy names, then the description
+RELATION_WEIGHT = 'B'
+HIGHLIGHT_OPTIONS = {'start_sel': '<mark>', 'stop_sel': '</mark>', 'max_fragments': 2}
+
+
+def relation_names(model, relation_name):
+    """Space separated names of one M2M relation, as a correlated subquery."""
+    field = model._meta.get_field(relation_name)
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    names = field.remote_field.through.objects.filter(
+        **{source: OuterRef('pk')}
+    ).values(source).annotate(
+        names=StringAgg(f'{target}__name', ' ')
+    ).values('names')
+    return Coalesce(Subquery(names), Value(''), output_field=TextField())
+
+
+def search_vector(model):
+    config = settings.SEARCH_CONFIG
+    vector = SearchVector('name', weight='A', config=config)
+    for relation_name in RELATION_NAMES:
+        vector += SearchVector(relation_names(model, relation_name), weight=RELATION_WEIGHT, config=config)
+    return vector + SearchVector('description', weight='C', config=config)
+
+
+def refresh_search_vectors(model, pks=None):
+    """
+    Recompute ``search_vector`` in SQL for the given items (every item when
+    ``pks`` is None). Runs as a plain UPDATE, so no signals fire.
+    """
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    return queryset.update(search_vector=search_vector(model))
+
+
+def rebuild_search_vectors(model, batch_size=1000):
+    """Refresh every item, ``batch_size`` rows per UPDATE, yielding progress."""
+    done = 0
+    pks = model.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size)
+    batch = []
+    for pk in pks:
+        batch.append(pk)
+        if len(batch) == batch_size:
+            done += refresh_search_vectors(model, batch)
+            batch = []
+            yield done
+    if batch:
+        done += refresh_search_vectors(model, batch)
+        yield done
+
+
+def search_catalog(model, text, merchant=None, category=None, min_price=None,
+                   max_price=None, on_promotion=None):
+    """
+    Active items matching ``text`` (web search syntax) ranked by relevance,
+    with highlighted ``name_highlight`` and ``description_highlight``.
+    Matching uses the GIN index on ``search_vector``.
+    """
+    config = settings.SEARCH_CONFIG
+    query = SearchQuery(text, search_type='websearch', config=config)
+    queryset = model.objects.filter(is_active=True, search_vector=query)
+
+    if merchant is not None:
+        queryset = queryset.filter(merchant_id=merchant)
+    if category is not None:
+        queryset = queryset.filter(categories=category)
+    if min_price is not None:
+        queryset = queryset.filter(effective_price__gte=min_price)
+    if max_price is not None:
+        queryset = queryset.filter(effective_price__lte=max_price)
+    if on_promotion is not None:
+        through = model.promotions.through
+        item_field = model._meta.model_name
+        has_promotion = Exists(through.objects.filter(
+            **{item_field: OuterRef('pk')},
+            promotion__in=Promotion.objects.active().values('pk'),
+        ))
+        queryset = queryset.filter(has_promotion if on_promotion else ~has_promotion)
+
+    return queryset.annotate(
+        rank=SearchRank(F('search_vector'), query),
+        name_highlight=SearchHeadline('name', query, config=config, **HIGHLIGHT_OPTIONS),
+        description_highlight=SearchHeadline('description', query, config=config, **HIGHLIGHT_OPTIONS),
+    ).defer('search_vector').prefetch_related(*RELATION_NAMES).order_by('-rank', '-created_at', '-id')
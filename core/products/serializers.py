@@ -1,4 +1,11 @@
+import uuid
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
+from core.images import ImageRenditionsField, validate_image_upload
+from core.merchants.context import get_request_merchant
+from core.products.bulk import create_items, update_items
+from core.products.catalog_io import FORMATS, guess_format
 from core.products.models import (
     Category,
     Hashtag,
@@ -7,7 +14,6 @@ from core.products.models import (
     Service,
     Promotion,
 )
-from django.utils import timezone
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -28,6 +34,17 @@ class KeywordSerializer(serializers.ModelSerializer):
         fields = ('id', 'name')
 
 
+class TaxonomySuggestQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class TaxonomySuggestionSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    usage_count = serializers.IntegerField()
+
+
 class PromotionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Promotion
@@ -46,11 +63,118 @@ class PromotionSerializer(serializers.ModelSerializer):
         return data
 
 
+class BulkCatalogListSerializer(serializers.ListSerializer):
+    """
+    Bulk create/update for products and services.
+
+    Referenced categories, hashtags and keywords are checked with one query
+    per type for the whole batch, and rows (including the M2M through rows)
+    are written by core.products.bulk.
+    """
+    relation_fields = {
+        'category_ids': ('categories', Category),
+        'hashtag_ids': ('hashtags', Hashtag),
+        'keyword_ids': ('keywords', Keyword),
+    }
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', settings.BULK_MAX_ITEMS)
+        kwargs.setdefault('allow_empty', False)
+        super().__init__(*args, **kwargs)
+        self.matched_ids = set()
+        self.matched_instances = []
+        self.existing_ids = {}
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            # Bulk update: self.instance maps str(id) to the loaded object
+            item_id = str(data.get('id')) if isinstance(data, dict) else None
+            if item_id not in self.instance:
+                raise serializers.ValidationError({'id': ['Not found.']})
+            if item_id in self.matched_ids:
+                raise serializers.ValidationError({'id': ['Duplicate item in request.']})
+            self.matched_ids.add(item_id)
+            self.child.instance = self.instance[item_id]
+
+        item = super().run_child_validation(data)
+
+        errors = {}
+        for field_name in self.relation_fields:
+            missing = [str(pk) for pk in item.get(field_name, []) if pk not in self.existing_ids[field_name]]
+            if missing:
+                errors[field_name] = [f"Unknown ids: {', '.join(missing)}"]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        if self.instance is not None:
+            self.matched_instances.append(self.child.instance)
+        return item
+
+    def to_internal_value(self, data):
+        self.matched_ids = set()
+        self.matched_instances = []
+        self.existing_ids = {field_name: set() for field_name in self.relation_fields}
+        if not isinstance(data, list) or (self.max_length is not None and len(data) > self.max_length):
+            # Rejected by the base class before any item is looked at
+            return super().to_internal_value(data)
+
+        for field_name, (_, model) in self.relation_fields.items():
+            requested = self.collect_uuids(data, field_name)
+            self.existing_ids[field_name] = set(
+                model.objects.filter(id__in=requested).values_list('id', flat=True)
+            ) if requested else set()
+        return super().to_internal_value(data)
+
+    @staticmethod
+    def collect_uuids(data, field_name):
+        uuids = set()
+        for item in data:
+            values = item.get(field_name) if isinstance(item, dict) else None
+            if not isinstance(values, list):
+                continue
+            for value in values:
+                try:
+                    uuids.add(uuid.UUID(str(value)))
+                except ValueError:
+                    pass
+        return uuids
+
+    def pop_relations(self, validated_data):
+        return [
+            {
+                relation_name: item.pop(field_name)
+                for field_name, (relation_name, _) in self.relation_fields.items()
+                if field_name in item
+            }
+            for item in validated_data
+        ]
+
+    def create(self, validated_data):
+        merchant = get_request_merchant(self.context['request'])
+        relations = self.pop_relations(validated_data)
+        return create_items(self.child.Meta.model, merchant.pk, validated_data, relations)
+
+    def update(self, instance, validated_data):
+        objects = self.matched_instances
+        relations = self.pop_relations(validated_data)
+        now = timezone.now()
+
+        fields = {'updated_at'}
+        for obj, item in zip(objects, validated_data):
+            for attr, value in item.items():
+                setattr(obj, attr, value)
+                fields.add(attr)
+            obj.updated_at = now
+
+        return update_items(self.child.Meta.model, objects, fields, relations)
+
+
 class ProductSerializer(serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
     hashtags = HashtagSerializer(many=True, read_only=True)
     keywords = KeywordSerializer(many=True, read_only=True)
     promotions = serializers.SerializerMethodField()
+    effective_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
     # Fields for receiving IDs during creation/update
     category_ids = serializers.ListField(
@@ -68,18 +192,24 @@ class ProductSerializer(serializers.ModelSerializer):
         write_only=True,
         required=False
     )
-    image = serializers.ImageField(required=False)
+    image = serializers.ImageField(required=False, validators=[validate_image_upload])
+    image_renditions = ImageRenditionsField(source='image')
 
     class Meta:
         model = Product
         fields = (
             'id', 'merchant', 'name', 'description', 'price',
-            'image', 'categories', 'hashtags', 'keywords',
+            'effective_price', 'best_discount_percent',
+            'image', 'image_renditions', 'categories', 'hashtags', 'keywords',
             'is_active', 'created_at', 'updated_at',
             'category_ids', 'hashtag_ids', 'keyword_ids',
             'promotions'
         )
-        read_only_fields = ('id', 'merchant', 'created_at', 'updated_at')
+        read_only_fields = (
+            'id', 'merchant', 'effective_price', 'best_discount_percent',
+            'created_at', 'updated_at'
+        )
+        list_serializer_class = BulkCatalogListSerializer
 
     def create(self, validated_data):
         category_ids = validated_data.pop('category_ids', [])
@@ -87,7 +217,7 @@ class ProductSerializer(serializers.ModelSerializer):
         keyword_ids = validated_data.pop('keyword_ids', [])
         
         # Get merchant from current user
-        validated_data['merchant'] = self.context['request'].user.merchant
+        validated_data['merchant'] = get_request_merchant(self.context['request'])
         
         product = Product.objects.create(**validated_data)
         
@@ -102,18 +232,27 @@ class ProductSerializer(serializers.ModelSerializer):
         return product
 
     def get_promotions(self, obj):
-        active_promotions = obj.promotions.filter(
-            is_active=True,
-            start_date__lte=timezone.now(),
-            end_date__gte=timezone.now()
-        )
+        # Populated by CatalogItemQuerySet.with_related() on detail views
+        active_promotions = getattr(obj, 'active_promotions', None)
+        if active_promotions is None:
+            active_promotions = obj.promotions.active().prefetch_related('products', 'services')
         return PromotionSerializer(active_promotions, many=True).data
 
+
+class ProductListSerializer(ProductSerializer):
+    # Lists carry the denormalized prices and never read the promotions
+    promotions = None
+
+    class Meta(ProductSerializer.Meta):
+        fields = tuple(f for f in ProductSerializer.Meta.fields if f != 'promotions')
+
+
 class ServiceSerializer(serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
     hashtags = HashtagSerializer(many=True, read_only=True)
     keywords = KeywordSerializer(many=True, read_only=True)
     promotions = serializers.SerializerMethodField()
+    effective_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
     category_ids = serializers.ListField(
         child=serializers.UUIDField(),
@@ -135,19 +274,24 @@ class ServiceSerializer(serializers.ModelSerializer):
         model = Service
         fields = (
             'id', 'merchant', 'name', 'description', 'price',
+            'effective_price', 'best_discount_percent',
             'categories', 'hashtags', 'keywords', 'is_active',
             'created_at', 'updated_at',
             'category_ids', 'hashtag_ids', 'keyword_ids',
             'promotions'
         )
-        read_only_fields = ('id', 'merchant', 'created_at', 'updated_at')
+        read_only_fields = (
+            'id', 'merchant', 'effective_price', 'best_discount_percent',
+            'created_at', 'updated_at'
+        )
+        list_serializer_class = BulkCatalogListSerializer
 
     def create(self, validated_data):
         category_ids = validated_data.pop('category_ids', [])
         hashtag_ids = validated_data.pop('hashtag_ids', [])
         keyword_ids = validated_data.pop('keyword_ids', [])
         
-        validated_data['merchant'] = self.context['request'].user.merchant
+        validated_data['merchant'] = get_request_merchant(self.context['request'])
         
         service = Service.objects.create(**validated_data)
         
@@ -161,13 +305,64 @@ class ServiceSerializer(serializers.ModelSerializer):
         return service
 
     def get_promotions(self, obj):
-        active_promotions = obj.promotions.filter(
-            is_active=True,
-            start_date__lte=timezone.now(),
-            end_date__gte=timezone.now()
-        )
+        # Populated by CatalogItemQuerySet.with_related() on detail views
+        active_promotions = getattr(obj, 'active_promotions', None)
+        if active_promotions is None:
+            active_promotions = obj.promotions.active().prefetch_related('products', 'services')
         return PromotionSerializer(active_promotions, many=True).data
 
+
+class ServiceListSerializer(ServiceSerializer):
+    promotions = None
+
+    class Meta(ServiceSerializer.Meta):
+        fields = tuple(f for f in ServiceSerializer.Meta.fields if f != 'promotions')
+
+
+class CatalogSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    type = serializers.ChoiceField(choices=('products', 'services'), default='products')
+    merchant = serializers.UUIDField(required=False)
+    category = serializers.UUIDField(required=False)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    promotion = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+
+class CatalogImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=FORMATS, required=False)
+
+    def validate(self, data):
+        if 'format' not in data:
+            data['format'] = guess_format(data['file'].name)
+        return data
+
+
+class CatalogPriceQuerySerializer(serializers.Serializer):
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    on_sale = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+
+class CatalogSearchResultSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    merchant = serializers.UUIDField(source='merchant_id')
+    name = serializers.CharField()
+    description = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    effective_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    best_discount_percent = serializers.DecimalField(max_digits=5, decimal_places=2)
+    categories = CategorySerializer(many=True)
+    hashtags = HashtagSerializer(many=True)
+    keywords = KeywordSerializer(many=True)
+    rank = serializers.FloatField()
+    highlight = serializers.SerializerMethodField()
+
+    def get_highlight(self, obj):
+        return {'name': obj.name_highlight, 'description': obj.description_highlight}
+
+
 class AddServiceToPromotionSerializer(serializers.Serializer):
     promotion_id = serializers.UUIDField()
     service_id = serializers.UUIDField()
@@ -177,12 +372,13 @@ class AddServiceToPromotionSerializer(serializers.Serializer):
             promotion = Promotion.objects.get(id=data['promotion_id'])
             service = Service.objects.get(id=data['service_id'])
             
-            if service in promotion.services.all():
+            if promotion.services.filter(pk=service.pk).exists():
                 raise serializers.ValidationError(
                     "Service already added to this promotion"
                 )
                 
-            if service.merchant != self.context['request'].user.merchant:
+            merchant = get_request_merchant(self.context['request'])
+            if merchant is None or service.merchant_id != merchant.pk:
                 raise serializers.ValidationError(
                     "You don't have permission to add this service"
                 )
@@ -205,12 +401,13 @@ class AddProductToPromotionSerializer(serializers.Serializer):
             promotion = Promotion.objects.get(id=data['promotion_id'])
             product = Product.objects.get(id=data['product_id'])
             
-            if product in promotion.products.all():
+            if promotion.products.filter(pk=product.pk).exists():
                 raise serializers.ValidationError(
                     "Product already added to this promotion"
                 )
                 
-            if product.merchant != self.context['request'].user.merchant:
+            merchant = get_request_merchant(self.context['request'])
+            if merchant is None or product.merchant_id != merchant.pk:
                 raise serializers.ValidationError(
                     "You don't have permission to add this product"
                 )
@@ -223,3 +420,39 @@ class AddProductToPromotionSerializer(serializers.Serializer):
             raise serializers.ValidationError("Promotion not found")
         except Product.DoesNotExist:
             raise serializers.ValidationError("Product not found")
+
+
+class PromotionItemsSerializer(serializers.Serializer):
+    """
+    Lists of product and service ids to attach to or detach from a
+    promotion. Ownership of every id is checked with one query per type.
+    """
+    product_ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, default=list,
+        max_length=settings.PROMOTION_MAX_ITEMS
+    )
+    service_ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, default=list,
+        max_length=settings.PROMOTION_MAX_ITEMS
+    )
+    item_fields = {'product_ids': Product, 'service_ids': Service}
+
+    def validate(self, data):
+        if not data['product_ids'] and not data['service_ids']:
+            raise serializers.ValidationError("Provide product_ids or service_ids")
+
+        merchant = get_request_merchant(self.context['request'])
+        errors = {}
+        for field_name, model in self.item_fields.items():
+            requested = set(data[field_name])
+            if not requested:
+                continue
+            owned = set(model.objects.filter(
+                pk__in=requested, merchant=merchant
+            ).values_list('pk', flat=True))
+            missing = requested - owned
+            if missing:
+                errors[field_name] = [f"Unknown ids: {', '.join(sorted(str(pk) for pk in missing))}"]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
@@ -0,0 +1,227 @@
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from core.cache import invalidate_catalog, invalidate_taxonomy
+from core.images import process_upload, release_upload, track_upload
+from core.products.bulk import RELATION_MODELS
+from core.products.pricing import CATALOG_ITEM_MODELS, best_discount, refresh_prices, refresh_promotion_items
+from core.products.search import refresh_search_vectors, search_vector
+from core.products.models import (
+    Category,
+    Hashtag,
+    Keyword,
+    Product,
+    Service,
+    Promotion,
+)
+
+
+def promotion_merchant_ids(promotion_ids):
+    product_merchants = Product.objects.filter(
+        promotions__in=promotion_ids
+    ).values_list('merchant_id', flat=True)
+    service_merchants = Service.objects.filter(
+        promotions__in=promotion_ids
+    ).values_list('merchant_id', flat=True)
+    return set(product_merchants) | set(service_merchants)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Service)
+def catalog_item_changed(sender, instance, **kwargs):
+    invalidate_catalog([instance.merchant_id])
+
+
+@receiver(pre_delete, sender=Product)
+@receiver(pre_delete, sender=Service)
+def catalog_item_deleting(sender, instance, **kwargs):
+    # Memberships are gone by post_delete, collect the promotions first
+    instance._promotion_ids = list(instance.promotions.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Service)
+def catalog_item_deleted(sender, instance, **kwargs):
+    Promotion.objects.filter(pk__in=getattr(instance, '_promotion_ids', [])).sync_merchants()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Service)
+def catalog_item_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        # save() writes back whatever discount the instance was loaded with,
+        # recompute it along with the search vector in the same UPDATE
+        sender.objects.filter(pk=instance.pk).update(
+            search_vector=search_vector(sender),
+            best_discount_percent=best_discount(sender),
+        )
+
+
+@receiver(pre_save, sender=Product)
+def product_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        track_upload(instance, 'image')
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    process_upload(instance, 'image')
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    release_upload(instance.image)
+
+
+def linked_items(instance):
+    """(model, pk queryset) pairs of the items tagged with a taxonomy row."""
+    relation_name = next(name for name, model in RELATION_MODELS.items() if isinstance(instance, model))
+    return [
+        (model, model.objects.filter(**{relation_name: instance}).values('pk'))
+        for model in (Product, Service)
+    ]
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Hashtag)
+@receiver(post_save, sender=Keyword)
+def taxonomy_saved(sender, instance, created, raw=False, **kwargs):
+    # A renamed category/hashtag/keyword changes the vectors of its items
+    if not created and not raw:
+        for model, pks in linked_items(instance):
+            refresh_search_vectors(model, pks)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Hashtag)
+@receiver(pre_delete, sender=Keyword)
+def taxonomy_deleting(sender, instance, **kwargs):
+    # The through rows are gone by post_delete, collect the items first
+    instance._search_items = [(model, list(pks)) for model, pks in linked_items(instance)]
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Hashtag)
+@receiver(post_delete, sender=Keyword)
+def taxonomy_deleted(sender, instance, **kwargs):
+    for model, pks in getattr(instance, '_search_items', []):
+        refresh_search_vectors(model, [row['pk'] for row in pks])
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Hashtag)
+@receiver([post_save, post_delete], sender=Keyword)
+def taxonomy_changed(sender, instance, **kwargs):
+    invalidate_taxonomy()
+
+
+@receiver(post_save, sender=Promotion)
+def promotion_saved(sender, instance, **kwargs):
+    refresh_promotion_items([instance.pk])
+    invalidate_catalog(promotion_merchant_ids([instance.pk]))
+
+
+@receiver(pre_delete, sender=Promotion)
+def promotion_deleted(sender, instance, **kwargs):
+    # Memberships are gone by post_delete, collect the merchants and items first
+    invalidate_catalog(promotion_merchant_ids([instance.pk]))
+    instance._priced_items = [
+        (model, list(model.objects.filter(promotions=instance).values_list('pk', flat=True)))
+        for model in CATALOG_ITEM_MODELS
+    ]
+
+
+@receiver(post_delete, sender=Promotion)
+def promotion_removed(sender, instance, **kwargs):
+    for model, pks in getattr(instance, '_priced_items', []):
+        refresh_prices(model, pks)
+
+
+def catalog_relation_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if isinstance(instance, (Product, Service)):
+        invalidate_catalog([instance.merchant_id])
+    elif isinstance(instance, Promotion):
+        if action == 'pre_clear':
+            invalidate_catalog(promotion_merchant_ids([instance.pk]))
+        else:
+            invalidate_catalog(
+                model.objects.filter(pk__in=pk_set).values_list('merchant_id', flat=True)
+            )
+    elif action == 'pre_clear':
+        # A category/hashtag/keyword dropped from every item
+        invalidate_taxonomy()
+    else:
+        invalidate_catalog(
+            model.objects.filter(pk__in=pk_set).values_list('merchant_id', flat=True)
+        )
+
+
+def search_relation_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_search_vectors(type(instance), [instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        refresh_search_vectors(model, pk_set)
+    elif action == 'pre_clear':
+        # A category/hashtag/keyword removed from every item
+        source = f'{model._meta.model_name}_id'
+        instance._search_cleared = list(
+            sender.objects.filter(**{instance._meta.model_name: instance}).values_list(source, flat=True)
+        )
+    elif action == 'post_clear':
+        refresh_search_vectors(model, getattr(instance, '_search_cleared', []))
+
+
+for through in (
+    Product.categories.through,
+    Product.hashtags.through,
+    Product.keywords.through,
+    Service.categories.through,
+    Service.hashtags.through,
+    Service.keywords.through,
+):
+    m2m_changed.connect(search_relation_changed, sender=through)
+
+
+def promotion_relation_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # Keeps the discounted prices and Promotion.merchants in step
+    if reverse:
+        # item.promotions.add(...)/remove(...)/clear()
+        if action == 'pre_clear':
+            instance._promotions_cleared = list(
+                instance.promotions.values_list('pk', flat=True)
+            )
+        elif action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_prices(type(instance), [instance.pk])
+            promotion_ids = pk_set if action != 'post_clear' else getattr(instance, '_promotions_cleared', [])
+            Promotion.objects.filter(pk__in=promotion_ids).sync_merchants()
+    elif action in ('post_add', 'post_remove'):
+        refresh_prices(model, pk_set)
+        Promotion.objects.filter(pk=instance.pk).sync_merchants()
+    elif action == 'pre_clear':
+        source = f'{model._meta.model_name}_id'
+        instance._prices_cleared = list(
+            sender.objects.filter(promotion=instance).values_list(source, flat=True)
+        )
+    elif action == 'post_clear':
+        refresh_prices(model, getattr(instance, '_prices_cleared', []))
+        Promotion.objects.filter(pk=instance.pk).sync_merchants()
+
+
+for through in (Promotion.products.through, Promotion.services.through):
+    m2m_changed.connect(promotion_relation_changed, sender=through)
+
+
+for through in (
+    Product.categories.through,
+    Product.hashtags.through,
+    Product.keywords.through,
+    Service.categories.through,
+    Service.hashtags.through,
+    Service.keywords.through,
+    Promotion.products.through,
+    Promotion.services.through,
+):
+    m2m_changed.connect(catalog_relation_changed, sender=through)
@@ -0,0 +1,96 @@
+import io
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import resolve, reverse
+from core.cache import response_cache
+from core.products.catalog_io import CATALOG_MODELS, CatalogImporter, read_rows
+from core.tasks.registry import task
+
+
+# First pages rendered into the response cache after a catalog changes in bulk
+WARM_URL_NAMES = ('products:product-list', 'products:service-list', 'products:promotion-list')
+
+
+@task('catalog.import', queue='imports', concurrency=2, bind=True)
+def import_catalog(task, path, merchant_id, kind, fmt, host=None, secure=False):
+    """
+    Import an uploaded catalog file. Progress is recorded in the
+    transaction of every chunk, so a retried attempt resumes where the
+    last one stopped. The upload is deleted once imported, or once the
+    last attempt failed.
+    """
+    importer = CatalogImporter(CATALOG_MODELS[kind], merchant_id)
+    importer.created = task.progress.get('created', 0)
+    importer.invalid = task.progress.get('invalid', 0)
+
+    def report(importer):
+        task.set_progress(rows=importer.rows, created=importer.created, invalid=importer.invalid)
+
+    try:
+        with default_storage.open(path, 'rb') as raw, io.TextIOWrapper(raw, encoding='utf-8', newline='') as stream:
+            importer.run(read_rows(stream, fmt), skip=task.progress.get('rows', 0), on_chunk=report)
+    except Exception:
+        if task.attempts >= task.max_attempts:
+            default_storage.delete(path)
+        raise
+    default_storage.delete(path)
+
+    if host and task.user_id:
+        warm_catalog_cache.enqueue(user=task.user, user_id=str(task.user_id), host=host, secure=secure)
+    return {
+        'rows': importer.rows,
+        'created': importer.created,
+        'invalid': importer.invalid,
+        'errors': [{'row': line, 'errors': errors} for line, errors in importer.errors],
+    }
+
+
+@task('catalog.warm_cache', max_attempts=1)
+def warm_catalog_cache(user_id, host, secure=False):
+    """
+    Cache the first list pages of a merchant's catalog, under the keys and
+    with the data the list views would use when the merchant requests them
+    from ``host``.
+    """
+    user = get_user_model().objects.get(pk=user_id)
+    warmed = []
+    for url_name in WARM_URL_NAMES:
+        path = reverse(url_name)
+        if warm_list(resolve(path).func.view_class, path, user, host, secure):
+            warmed.append(path)
+    return {'warmed': warmed}
+
+
+def warm_list(view_class, path, user, host, secure):
+    """Cache the first page of a CachedResponseMixin list view, False when it is not cached for ``user``."""
+    view = view_class()
+    view.setup(WSGIRequest({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': '',
+        'HTTP_HOST': host,
+        'SERVER_PORT': '443' if secure else '80',
+        'wsgi.url_scheme': 'https' if secure else 'http',
+        'wsgi.input': io.BytesIO(),
+    }))
+    # Rendered as the merchant, who already passed the view's permissions
+    view.request = view.initialize_request(view.request)
+    view.request.user = user
+    view.format_kwarg = None
+
+    key = view.get_cache_key(view.request)
+    if key is None:
+        return False
+    if response_cache().get(key) is not None:
+        return True
+    with view.read_context():
+        queryset = view.filter_queryset(view.get_queryset())
+        page = view.paginate_queryset(queryset)
+        if page is None:
+            data = view.get_serializer(queryset, many=True).data
+        else:
+            data = view.get_paginated_response(view.get_serializer(page, many=True).data).data
+    response_cache().set(key, data, view.get_cache_timeout())
+    return True
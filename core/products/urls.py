@@ -1,10 +1,11 @@
 from django.urls import path
 from core.products.views import (
     CategoryViewSet, HashtagViewSet, KeywordViewSet,
-    ProductListCreateView, ProductRetrieveUpdateDestroyView,
-    ServiceListCreateView, ServiceRetrieveUpdateDestroyView,
+    ProductListCreateView, ProductRetrieveUpdateDestroyView, ProductBulkView,
+    ServiceListCreateView, ServiceRetrieveUpdateDestroyView, ServiceBulkView,
     PromotionListCreateView, PromotionRetrieveUpdateDestroyView,
-    AddProductToPromotionView, AddServiceToPromotionView
+    AddProductToPromotionView, AddServiceToPromotionView, PromotionItemsView,
+    CatalogExportView, CatalogImportView, CatalogSearchView,
 )
 
 
@@ -17,12 +18,15 @@ urlpatterns = [
     
     path('products/', ProductListCreateView.as_view(), name='product-list'),
     path('products/<uuid:pk>/', ProductRetrieveUpdateDestroyView.as_view(), name='product-detail'),
+    path('products/bulk/', ProductBulkView.as_view(), name='product-bulk'),
     
     path('services/', ServiceListCreateView.as_view(), name='service-list'),
     path('services/<uuid:pk>/', ServiceRetrieveUpdateDestroyView.as_view(), name='service-detail'),
+    path('services/bulk/', ServiceBulkView.as_view(), name='service-bulk'),
     
     path('promotions/', PromotionListCreateView.as_view(), name='promotion-list'),
     path('promotions/<uuid:pk>/', PromotionRetrieveUpdateDestroyView.as_view(), name='promotion-detail'),
+    path('promotions/<uuid:promotion_id>/items/', PromotionItemsView.as_view(), name='promotion-items'),
     path(
         'promotions/<uuid:promotion_id>/add-product/<uuid:product_id>/',
         AddProductToPromotionView.as_view(),
@@ -33,4 +37,8 @@ urlpatterns = [
         AddServiceToPromotionView.as_view(),
         name='add-service-to-promotion'
     ),
+
+    path('search/', CatalogSearchView.as_view(), name='catalog-search'),
+    path('export/<str:kind>/', CatalogExportView.as_view(), name='catalog-export'),
+    path('import/<str:kind>/', CatalogImportView.as_view(), name='catalog-import'),
 ]
@@ -1,5 +1,12 @@
-from django.db.models import Q
+import uuid
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
 from rest_framework import generics, permissions, status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
 from core.products.models import (
     Category,
     Hashtag,
@@ -13,70 +20,110 @@ from core.products.serializers import (
     HashtagSerializer,
     KeywordSerializer,
     ProductSerializer,
+    ProductListSerializer,
     ServiceSerializer,
+    ServiceListSerializer,
     PromotionSerializer,
     AddServiceToPromotionSerializer,
     AddProductToPromotionSerializer,
+    CatalogSearchQuerySerializer,
+    CatalogSearchResultSerializer,
+    TaxonomySuggestQuerySerializer,
+    TaxonomySuggestionSerializer,
+    PromotionItemsSerializer,
+    CatalogImportSerializer,
 )
+from core.products.catalog_io import CATALOG_MODELS, CONTENT_TYPES, EXPORT_KINDS, FORMATS, export_catalog
+from core.products.autocomplete import suggest
+from core.products.bulk import add_promotion_items, delete_items, remove_promotion_items
+from core.products.filters import EffectivePriceFilter, StableOrderingFilter
+from core.products.search import search_catalog
+from core.products.tasks import import_catalog
+from core.tasks.serializers import TaskSerializer
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.response import Response
-from django.core.exceptions import ObjectDoesNotExist
 from core.permissions import HasMerchantPermission
+from core.merchants.context import get_request_merchant
+from core.cache import CachedResponseMixin, MerchantScopedCacheMixin, TAXONOMY_NAMESPACE
 from django.core.exceptions import PermissionDenied
 
 
-class CategoryViewSet(generics.ListCreateAPIView):
-    queryset = Category.objects.all()
-    serializer_class = CategorySerializer
+class TaxonomyListCreateView(CachedResponseMixin, generics.ListCreateAPIView):
+    """
+    Paginated list of categories/hashtags/keywords, or with ``?q=`` the top
+    ``limit`` suggestions for a tag picker (see core.products.autocomplete).
+    """
     permission_classes = [permissions.IsAuthenticated]
+    cache_namespaces = (TAXONOMY_NAMESPACE,)
+
+    def get_cache_timeout(self):
+        if 'q' in self.request.query_params:
+            return settings.AUTOCOMPLETE_CACHE_TTL
+        return super().get_cache_timeout()
 
+    def list(self, request, *args, **kwargs):
+        if 'q' not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(self.suggest, request, *args, **kwargs)
 
-class HashtagViewSet(generics.ListCreateAPIView):
-    queryset = Hashtag.objects.all()
+    def suggest(self, request, *args, **kwargs):
+        params = TaxonomySuggestQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        suggestions = suggest(self.queryset.model, params.validated_data['q'], params.validated_data['limit'])
+        return Response({'results': TaxonomySuggestionSerializer(suggestions, many=True).data})
+
+    @swagger_auto_schema(
+        operation_description="List, or suggest by name with ?q=",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=10),
+        ],
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class CategoryViewSet(TaxonomyListCreateView):
+    queryset = Category.objects.order_by('-created_at', '-id')
+    serializer_class = CategorySerializer
+
+
+class HashtagViewSet(TaxonomyListCreateView):
+    queryset = Hashtag.objects.order_by('-created_at', '-id')
     serializer_class = HashtagSerializer
-    permission_classes = [permissions.IsAuthenticated]
 
 
-class KeywordViewSet(generics.ListCreateAPIView):
-    queryset = Keyword.objects.all()
+class KeywordViewSet(TaxonomyListCreateView):
+    queryset = Keyword.objects.order_by('-created_at', '-id')
     serializer_class = KeywordSerializer
-    permission_classes = [permissions.IsAuthenticated]
 
 
-class ProductListCreateView(generics.ListCreateAPIView):
-    serializer_class = ProductSerializer
+class ProductListCreateView(MerchantScopedCacheMixin, generics.ListCreateAPIView):
+    serializer_class = ProductListSerializer
+    filter_backends = [EffectivePriceFilter, StableOrderingFilter]
+    ordering_fields = ('created_at', 'price', 'effective_price', 'best_discount_percent')
+    ordering = ('-created_at', '-id')
     permission_classes = [permissions.IsAuthenticated, HasMerchantPermission]
     
     def get_queryset(self):
-        # Check if user is authenticated first
-        if not self.request.user.is_authenticated:
-            return Product.objects.none()
-        
-        try:
-            merchant = self.request.user.merchant
-            return Product.objects.filter(merchant=merchant)
-        except ObjectDoesNotExist:
+        merchant = get_request_merchant(self.request)
+        if merchant is None:
             return Product.objects.none()
+        return Product.objects.filter(merchant_id=merchant.pk).with_related(promotions=False)
             
     def create(self, request, *args, **kwargs):
-        try:
-            if not hasattr(request.user, 'merchant'):
-                return Response(
-                    {"error": "You need to create a merchant before adding products"},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            return super().create(request, *args, **kwargs)
-        except ObjectDoesNotExist:
+        if get_request_merchant(request) is None:
             return Response(
                 {"error": "You need to create a merchant before adding products"},
                 status=status.HTTP_403_FORBIDDEN
             )
+        return super().create(request, *args, **kwargs)
     
     @swagger_auto_schema(
         operation_description="List all products for authenticated merchant",
         responses={
-            200: ProductSerializer(many=True),
+            200: ProductListSerializer(many=True),
             401: "Unauthorized"
         }
     )
@@ -86,7 +133,7 @@ class ProductListCreateView(generics.ListCreateAPIView):
     @swagger_auto_schema(
         operation_description="Create a new product",
         responses={
-            201: ProductSerializer,
+            201: ProductListSerializer,
             400: "Bad Request",
             401: "Unauthorized"
         }
@@ -96,97 +143,338 @@ class ProductListCreateView(generics.ListCreateAPIView):
         return super().post(request, *args, **kwargs)
     
     def perform_create(self, serializer):
-        serializer.save(merchant=self.request.user.merchant)
+        serializer.save(merchant=get_request_merchant(self.request))
 
 
-class ProductRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class ProductRetrieveUpdateDestroyView(MerchantScopedCacheMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        try:
-            if getattr(self, 'swagger_fake_view', False):
-                return Product.objects.none()
-            return Product.objects.filter(merchant=self.request.user.merchant)
-        except ObjectDoesNotExist:
+        merchant = get_request_merchant(self.request)
+        if merchant is None:
             return Product.objects.none()
+        return Product.objects.filter(merchant_id=merchant.pk).with_related()
 
 
-class ServiceListCreateView(generics.ListCreateAPIView):
-    serializer_class = ServiceSerializer
+class CatalogBulkView(generics.GenericAPIView):
+    """
+    POST a list of items to create them, PATCH a list of items carrying
+    their ``id`` to update them, DELETE ``{"ids": [...]}`` to delete them.
+    Every call is validated as a whole and written in one transaction.
+    """
+    permission_classes = [permissions.IsAuthenticated, HasMerchantPermission]
+    throttle_group = 'bulk'
+
+    def get_queryset(self):
+        model = self.get_serializer_class().Meta.model
+        if getattr(self, 'swagger_fake_view', False):
+            return model.objects.none()
+        return model.objects.filter(merchant_id=get_request_merchant(self.request).pk)
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        objects = serializer.save()
+        return Response({
+            'results': [
+                {'index': index, 'id': obj.pk, 'status': 'created'}
+                for index, obj in enumerate(objects)
+            ]
+        }, status=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response(
+                {'errors': ['Expected a list of items.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        ids = [item.get('id') for item in request.data if isinstance(item, dict)]
+        instances = {
+            str(obj.pk): obj
+            for obj in self.get_queryset().filter(pk__in=self.valid_uuids(ids))
+        }
+        serializer = self.get_serializer(instances, data=request.data, many=True, partial=True)
+        if not serializer.is_valid():
+            return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        objects = serializer.save()
+        return Response({
+            'results': [
+                {'index': index, 'id': obj.pk, 'status': 'updated'}
+                for index, obj in enumerate(objects)
+            ]
+        })
+
+    def delete(self, request, *args, **kwargs):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids:
+            return Response(
+                {'errors': {'ids': ['Expected a non-empty list of ids.']}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > settings.BULK_MAX_ITEMS:
+            return Response(
+                {'errors': {'ids': [f'Ensure this field has no more than {settings.BULK_MAX_ITEMS} elements.']}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        found = {str(pk) for pk in delete_items(self.get_queryset().filter(pk__in=self.valid_uuids(ids)))}
+        return Response({
+            'results': [
+                {'index': index, 'id': pk, 'status': 'deleted' if str(pk) in found else 'not_found'}
+                for index, pk in enumerate(ids)
+            ]
+        })
+
+    @staticmethod
+    def valid_uuids(values):
+        uuids = []
+        for value in values:
+            try:
+                uuids.append(uuid.UUID(str(value)))
+            except ValueError:
+                pass
+        return uuids
+
+
+class ProductBulkView(CatalogBulkView):
+    serializer_class = ProductSerializer
+
+
+class ServiceListCreateView(MerchantScopedCacheMixin, generics.ListCreateAPIView):
+    serializer_class = ServiceListSerializer
+    filter_backends = [EffectivePriceFilter, StableOrderingFilter]
+    ordering_fields = ('created_at', 'price', 'effective_price', 'best_discount_percent')
+    ordering = ('-created_at', '-id')
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        try:
-            return Service.objects.filter(merchant=self.request.user.merchant)
-        except ObjectDoesNotExist:
+        merchant = get_request_merchant(self.request)
+        if merchant is None:
             return Service.objects.none()
+        return Service.objects.filter(merchant_id=merchant.pk).with_related(promotions=False)
             
     def create(self, request, *args, **kwargs):
-        try:
-            if not hasattr(request.user, 'merchant'):
-                return Response(
-                    {"error": "You need to create a merchant before adding services"},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            return super().create(request, *args, **kwargs)
-        except ObjectDoesNotExist:
+        if get_request_merchant(request) is None:
             return Response(
                 {"error": "You need to create a merchant before adding services"},
                 status=status.HTTP_403_FORBIDDEN
             )
+        return super().create(request, *args, **kwargs)
 
 
-class ServiceRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class ServiceRetrieveUpdateDestroyView(MerchantScopedCacheMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ServiceSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        try:
-            return Service.objects.filter(merchant=self.request.user.merchant)
-        except ObjectDoesNotExist:
+        merchant = get_request_merchant(self.request)
+        if merchant is None:
             return Service.objects.none()
+        return Service.objects.filter(merchant_id=merchant.pk).with_related()
+
+
+class ServiceBulkView(CatalogBulkView):
+    serializer_class = ServiceSerializer
+
+
+class CatalogExportView(generics.GenericAPIView):
+    """
+    Stream the merchant's products, services or promotions as CSV or JSONL
+    (``?output=jsonl``). Rows are encoded as they are read, so the response
+    starts immediately and memory stays flat for any catalog size.
+    """
+    permission_classes = [permissions.IsAuthenticated, HasMerchantPermission]
+    throttle_group = 'bulk'
+    pagination_class = None
 
+    @swagger_auto_schema(
+        operation_description="Export the merchant catalog as CSV or JSONL",
+        manual_parameters=[
+            openapi.Parameter(
+                'output', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                enum=list(FORMATS), default='csv'
+            ),
+        ],
+        responses={200: "CSV or JSONL stream", 401: "Unauthorized"}
+    )
+    def get(self, request, kind, *args, **kwargs):
+        if kind not in EXPORT_KINDS:
+            return Response({"error": "Unknown export type"}, status=status.HTTP_404_NOT_FOUND)
+        fmt = request.query_params.get('output', 'csv')
+        if fmt not in FORMATS:
+            return Response(
+                {"error": f"output must be one of: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = StreamingHttpResponse(
+            export_catalog(kind, get_request_merchant(request).pk, fmt),
+            content_type=CONTENT_TYPES[fmt]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+        return response
+
+
+class CatalogImportView(generics.GenericAPIView):
+    """
+    Upload a CSV or JSONL catalog file for a background import into the
+    merchant's products or services. Responds 202 with the task to poll at
+    /api/tasks/<id>/; the first list pages are re-cached once it succeeds.
+    """
+    serializer_class = CatalogImportSerializer
+    permission_classes = [permissions.IsAuthenticated, HasMerchantPermission]
+    throttle_group = 'bulk'
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(
+        operation_description="Queue an import of a CSV or JSONL catalog file",
+        responses={202: TaskSerializer, 400: "Bad Request", 401: "Unauthorized"}
+    )
+    def post(self, request, kind, *args, **kwargs):
+        if kind not in CATALOG_MODELS:
+            return Response({"error": "Unknown import type"}, status=status.HTTP_404_NOT_FOUND)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fmt = serializer.validated_data['format']
 
-class PromotionListCreateView(generics.ListCreateAPIView):
+        path = default_storage.save(f'imports/{uuid.uuid4()}.{fmt}', serializer.validated_data['file'])
+        task = import_catalog.enqueue(
+            user=request.user,
+            path=path,
+            merchant_id=str(get_request_merchant(request).pk),
+            kind=kind,
+            fmt=fmt,
+            host=request.get_host(),
+            secure=request.is_secure(),
+        )
+        return Response(TaskSerializer(task).data, status=status.HTTP_202_ACCEPTED)
+
+
+class CatalogSearchView(generics.ListAPIView):
+    """
+    Full-text search over active products or services (``?type=services``),
+    ranked by relevance with ``<mark>`` highlights. Narrow with ``merchant``,
+    ``category``, ``min_price``/``max_price`` (after discounts) and
+    ``promotion=true|false``.
+    """
+    serializer_class = CatalogSearchResultSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # Results are ordered by rank, which keyset pagination cannot follow
+    pagination_class = PageNumberPagination
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Product.objects.none()
+        params = CatalogSearchQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        model = CATALOG_MODELS[filters.pop('type')]
+        text = filters.pop('q')
+        filters['on_promotion'] = filters.pop('promotion')
+        return search_catalog(model, text, **filters)
+
+    @swagger_auto_schema(
+        operation_description="Search products or services by name, description, category, hashtag and keyword",
+        query_serializer=CatalogSearchQuerySerializer,
+        responses={
+            200: CatalogSearchResultSerializer(many=True),
+            400: "Bad Request",
+            401: "Unauthorized"
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class PromotionListCreateView(MerchantScopedCacheMixin, generics.ListCreateAPIView):
     serializer_class = PromotionSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        try:
-            merchant = self.request.user.merchant
-            return Promotion.objects.filter(
-                Q(products__merchant=merchant) | 
-                Q(services__merchant=merchant)
-            ).distinct()
-        except ObjectDoesNotExist:
+        merchant = get_request_merchant(self.request)
+        if merchant is None:
             return Promotion.objects.none()
+        return Promotion.objects.for_merchant(merchant.pk).order_by(
+            '-created_at', '-id'
+        ).prefetch_related(
+            Prefetch('products', queryset=Product.objects.only('id')),
+            Prefetch('services', queryset=Service.objects.only('id')),
+        )
             
     def create(self, request, *args, **kwargs):
-        try:
-            if not hasattr(request.user, 'merchant'):
-                return Response(
-                    {"error": "You need to create a merchant before creating promotions"},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            return super().create(request, *args, **kwargs)
-        except ObjectDoesNotExist:
+        if get_request_merchant(request) is None:
             return Response(
                 {"error": "You need to create a merchant before creating promotions"},
                 status=status.HTTP_403_FORBIDDEN
             )
+        return super().create(request, *args, **kwargs)
 
 
-class PromotionRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class PromotionRetrieveUpdateDestroyView(MerchantScopedCacheMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PromotionSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        merchant = self.request.user.merchant
-        return Promotion.objects.filter(
-            Q(products__merchant=merchant) | 
-            Q(services__merchant=merchant)
-        ).distinct()
+        merchant = get_request_merchant(self.request)
+        if merchant is None:
+            return Promotion.objects.none()
+        return Promotion.objects.for_merchant(merchant.pk).prefetch_related(
+            Prefetch('products', queryset=Product.objects.only('id')),
+            Prefetch('services', queryset=Service.objects.only('id')),
+        )
+
+
+class PromotionItemsView(generics.GenericAPIView):
+    """
+    POST ``{"product_ids": [...], "service_ids": [...]}`` to attach the
+    merchant's items to a promotion, DELETE the same body to detach them.
+    Each call costs a fixed number of queries whatever the number of ids.
+
+    Promotions belong to no merchant, any merchant may attach items to any
+    of them (as with the add-product/add-service endpoints); only the
+    items are checked to be the merchant's own.
+    """
+    serializer_class = PromotionItemsSerializer
+    permission_classes = [permissions.IsAuthenticated, HasMerchantPermission]
+    throttle_group = 'bulk'
+    item_models = {'product_ids': ('products', Product), 'service_ids': ('services', Service)}
+
+    def apply(self, request, promotion_id, action, done_label, skipped_label):
+        try:
+            promotion = Promotion.objects.get(pk=promotion_id)
+        except Promotion.DoesNotExist:
+            return Response({"error": "Promotion not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        merchant = get_request_merchant(request)
+
+        result = {'promotion': promotion.pk}
+        with transaction.atomic():
+            for field_name, (label, model) in self.item_models.items():
+                pks = serializer.validated_data[field_name]
+                if pks:
+                    done, skipped = action(promotion, model, merchant.pk, pks)
+                    result[label] = {done_label: len(done), skipped_label: len(skipped)}
+        return Response(result)
+
+    @swagger_auto_schema(
+        operation_description="Attach products and services to a promotion",
+        request_body=PromotionItemsSerializer,
+        responses={200: "Counts of added and already attached items", 400: "Bad Request", 404: "Not Found"}
+    )
+    def post(self, request, promotion_id, *args, **kwargs):
+        return self.apply(request, promotion_id, add_promotion_items, 'added', 'already_added')
+
+    @swagger_auto_schema(
+        operation_description="Detach products and services from a promotion",
+        request_body=PromotionItemsSerializer,
+        responses={200: "Counts of removed and not attached items", 400: "Bad Request", 404: "Not Found"}
+    )
+    def delete(self, request, promotion_id, *args, **kwargs):
+        return self.apply(request, promotion_id, remove_promotion_items, 'removed', 'not_found')
 
 
 class AddProductToPromotionView(generics.CreateAPIView):
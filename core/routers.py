@@ -0,0 +1,99 @@
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# The replica reads of the current request go to, None for the primary
+_read_alias = ContextVar('read_alias', default=None)
+# alias -> (monotonic time of the check, lag in seconds or None if unreachable)
+_replica_lag = {}
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def replica_lag(alias):
+    """Seconds the replica's replay is behind, None when it cannot be queried."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+    except DatabaseError:
+        connection.close()
+        return None
+
+
+def fresh_replicas():
+    """Replicas within REPLICA_MAX_LAG, checked at most every REPLICA_LAG_CHECK_INTERVAL."""
+    now = time.monotonic()
+    fresh = []
+    for alias in settings.DATABASE_REPLICAS:
+        checked_at, lag = _replica_lag.get(alias, (None, None))
+        if checked_at is None or now - checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL:
+            lag = replica_lag(alias)
+            _replica_lag[alias] = (now, lag)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG:
+            fresh.append(alias)
+    return fresh
+
+
+@contextmanager
+def replica_reads():
+    """
+    Sends the reads of the block to one fresh replica, or to the primary
+    when none is configured or fresh. All reads of a block use the same
+    database so that counts and pages agree.
+    """
+    replicas = fresh_replicas() if settings.DATABASE_REPLICAS else []
+    token = _read_alias.set(random.choice(replicas) if replicas else None)
+    try:
+        yield _read_alias.get() or DEFAULT_DB_ALIAS
+    finally:
+        _read_alias.reset(token)
+
+
+@asynccontextmanager
+async def areplica_reads():
+    """replica_reads() for async code, the replicas' lag is checked in a thread."""
+    replicas = await sync_to_async(fresh_replicas)() if settings.DATABASE_REPLICAS else []
+    token = _read_alias.set(random.choice(replicas) if replicas else None)
+    try:
+        yield _read_alias.get() or DEFAULT_DB_ALIAS
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Routes the reads made inside replica_reads() to a replica; everything
+    else, writes included, uses the default database. Replicas are never
+    migrated, they follow the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from django.core.cache.backends import memcached
+
+# One pooled client per process and configuration, see PyMemcacheCache
+_clients = {}
+_clients_lock = threading.Lock()
+# Sockets must not be shared with the parent after a fork (gunicorn preload)
+os.register_at_fork(after_in_child=_clients.clear)
+
+_missing = object()
+
+
+class PyMemcacheCache(memcached.PyMemcacheCache):
+    """
+    Django's PyMemcacheCache builds a client per thread and disconnects it
+    after every request. This backend shares one pooled, thread-safe client
+    per process, keeping connections open across requests (size the pool
+    with max_pool_size). Several LOCATIONs are spread with pymemcache's
+    rendezvous hashing, so adding or losing a node only moves its share of
+    the keys.
+
+    Each instance (one per thread or async context, like the database
+    connections) counts its lookups, hits and time spent for
+    ServerTimingMiddleware.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.lookups = 0
+        self.hits = 0
+        self.elapsed = 0.0
+
+    @property
+    def _cache(self):
+        key = repr((self._servers, sorted(self._options.items(), key=lambda item: item[0])))
+        client = _clients.get(key)
+        if client is None:
+            with _clients_lock:
+                client = _clients.get(key)
+                if client is None:
+                    client = _clients[key] = self._class(self.client_servers, **self._options)
+        return client
+
+    def close(self, **kwargs):
+        # The pooled connections are reused by the next request
+        pass
+
+    @contextmanager
+    def timed(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+    def get(self, key, default=None, version=None):
+        with self.timed():
+            value = super().get(key, _missing, version)
+        self.lookups += 1
+        if value is _missing:
+            return default
+        self.hits += 1
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        with self.timed():
+            values = super().get_many(keys, version)
+        self.lookups += len(keys)
+        self.hits += len(values)
+        return values
+
+    def set(self, *args, **kwargs):
+        with self.timed():
+            return super().set(*args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        with self.timed():
+            return super().add(*args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        with self.timed():
+            return super().set_many(*args, **kwargs)
+
+    def touch(self, *args, **kwargs):
+        with self.timed():
+            return super().touch(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with self.timed():
+            return super().delete(*args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        with self.timed():
+            return super().delete_many(*args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        with self.timed():
+            return super().incr(*args, **kwargs)
+
+    def decr(self, *args, **kwargs):
+        with self.timed():
+            return super().decr(*args, **kwargs)
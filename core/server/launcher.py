@@ -0,0 +1,114 @@
+import gc
+import os
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from core.accounts.logins import flush_logins
+from core.accounts.revocation import flush_revocations
+from gunicorn.app.base import BaseApplication
+
+
+MODES = ('wsgi', 'asgi')
+WORKER_CLASSES = {
+    'wsgi': 'gthread',
+    'asgi': 'uvicorn_worker.UvicornWorker',
+}
+
+
+def cpu_count():
+    # Honours the CPUs a container is pinned to, unlike os.cpu_count()
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_workers(mode, cpus=None):
+    """
+    WSGI workers block a thread per request on the database, so run two
+    per CPU plus one; an ASGI worker multiplexes its requests on one event
+    loop and only needs a CPU of its own.
+    """
+    cpus = cpus or cpu_count()
+    return cpus * 2 + 1 if mode == 'wsgi' else max(cpus, 2)
+
+
+def when_ready(server):
+    # Objects loaded by preload_app are shared copy-on-write with the
+    # workers; keep the garbage collector from touching (and copying) them
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Nothing opened while preloading may be shared between processes
+    connections.close_all()
+    caches.close_all()
+
+
+def worker_exit(server, worker):
+    # Logins and revocations since the last flush would be lost with the process
+    flush_logins(force=True)
+    flush_revocations(force=True)
+
+
+def build_options(mode=None, bind=None, workers=None, threads=None, keepalive=None,
+                  timeout=None, max_requests=None, pidfile=None):
+    """gunicorn settings for serving the project, defaults from the SERVER_* settings."""
+    mode = mode or settings.SERVER_MODE
+    if mode not in MODES:
+        raise ValueError(f'Unknown server mode {mode}')
+    max_requests = settings.SERVER_MAX_REQUESTS if max_requests is None else max_requests
+    options = {
+        'bind': bind or settings.SERVER_BIND,
+        'worker_class': WORKER_CLASSES[mode],
+        'workers': workers or settings.SERVER_WORKERS or default_workers(mode),
+        # Import Django once in the master, workers fork with it loaded
+        'preload_app': True,
+        'keepalive': settings.SERVER_KEEPALIVE if keepalive is None else keepalive,
+        'timeout': timeout or settings.SERVER_TIMEOUT,
+        'graceful_timeout': timeout or settings.SERVER_TIMEOUT,
+        # Recycle workers now and then, jittered so they do not restart together
+        'max_requests': max_requests,
+        'max_requests_jitter': max_requests // 10,
+        'forwarded_allow_ips': settings.SERVER_FORWARDED_ALLOW_IPS,
+        'accesslog': '-',
+        'errorlog': '-',
+        'when_ready': when_ready,
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+    }
+    if mode == 'wsgi':
+        options['threads'] = threads or settings.SERVER_THREADS
+    if pidfile:
+        options['pidfile'] = pidfile
+    # Worker heartbeats are file writes, keep them off overlay filesystems
+    if os.path.isdir('/dev/shm'):
+        options['worker_tmp_dir'] = '/dev/shm'
+    return options
+
+
+class DjangoApplication(BaseApplication):
+    """
+    Runs the project's WSGI or ASGI application under gunicorn.
+
+    SIGHUP gracefully replaces the workers (new settings, same code, since
+    the application is preloaded); deploy new code with SIGUSR2 followed by
+    SIGQUIT to the old master, or a restart.
+    """
+
+    def __init__(self, mode, options):
+        self.mode = mode
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for name, value in self.options.items():
+            self.cfg.set(name, value)
+
+    def load(self):
+        if self.mode == 'asgi':
+            from merchant_app.asgi import application
+        else:
+            from merchant_app.wsgi import application
+        return application
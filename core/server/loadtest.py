@@ -0,0 +1,122 @@
+import http.client
+import socket
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from django.conf import settings
+
+
+@dataclass
+class LoadResult:
+    requests: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    latencies: list = field(default_factory=list)
+
+    @property
+    def rps(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p):
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+
+    def summary(self):
+        return (
+            f'{self.rps:8.1f} req/s  p50 {self.percentile(50):7.1f} ms  '
+            f'p95 {self.percentile(95):7.1f} ms  p99 {self.percentile(99):7.1f} ms  '
+            f'{self.requests} requests, {self.errors} errors'
+        )
+
+
+def run_load(host, port, path, headers=None, concurrency=10, duration=10.0):
+    """
+    GETs ``path`` from ``concurrency`` threads for ``duration`` seconds, each
+    thread reusing one keep-alive connection like a browser or proxy does.
+    """
+    result = LoadResult()
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        latencies, errors = [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers or {})
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+                if response.will_close:
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+        conn.close()
+        with lock:
+            result.latencies.extend(latencies)
+            result.requests += len(latencies)
+            result.errors += errors
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server did not listen on {port} within {timeout:.0f}s')
+
+
+def start_server(target, port, workers=None):
+    """Starts ``runserver`` or ``serve --mode <target>`` on a local port."""
+    manage = str(settings.BASE_DIR / 'manage.py')
+    if target == 'runserver':
+        command = [sys.executable, manage, 'runserver', '--noreload', f'127.0.0.1:{port}']
+    else:
+        command = [sys.executable, manage, 'serve', '--mode', target, '--bind', f'127.0.0.1:{port}']
+        if workers:
+            command += ['--workers', str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port, process)
+    except RuntimeError:
+        stop_server(process)
+        raise
+    return process
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
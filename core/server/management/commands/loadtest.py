@@ -0,0 +1,73 @@
+from urllib.parse import urlsplit
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+from core.server.loadtest import free_port, run_load, start_server, stop_server
+
+TARGETS = ('runserver', 'wsgi', 'asgi')
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test an endpoint over keep-alive connections and report "
+        "throughput and latency percentiles. With --compare, start each "
+        "server in turn (runserver, serve WSGI, serve ASGI) and test them "
+        "against the same database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='/api/products/')
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server to test without --compare')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run')
+        parser.add_argument('--user', help='Username to send a JWT access token for')
+        parser.add_argument('--compare', help=f'Comma separated servers to start and test: {", ".join(TARGETS)}')
+        parser.add_argument('--workers', type=int, help='Workers of the compared serve runs')
+        parser.add_argument('--asgi-path', help='Path for the asgi run, e.g. the /api/async/ variant')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be positive')
+        headers = {}
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'No user {options["user"]}')
+            headers['Authorization'] = f'Bearer {AccessToken.for_user(user)}'
+
+        load = dict(headers=headers, concurrency=options['concurrency'], duration=options['duration'])
+        if not options['compare']:
+            url = urlsplit(options['url'])
+            result = run_load(url.hostname, url.port or 80, options['path'], **load)
+            self.stdout.write(f'{options["url"]}{options["path"]}: {result.summary()}')
+            return
+
+        targets = [t.strip() for t in options['compare'].split(',')]
+        unknown = set(targets) - set(TARGETS)
+        if unknown:
+            raise CommandError(f'Unknown servers: {", ".join(sorted(unknown))}')
+
+        results = {}
+        for target in targets:
+            path = options['asgi_path'] if target == 'asgi' and options['asgi_path'] else options['path']
+            port = free_port()
+            try:
+                process = start_server(target, port, options['workers'])
+            except RuntimeError as exc:
+                raise CommandError(f'{target}: {exc}')
+            try:
+                # Warm up connections, caches and imports before measuring
+                run_load('127.0.0.1', port, path, headers=headers, concurrency=options['concurrency'], duration=1)
+                results[target] = run_load('127.0.0.1', port, path, **load)
+            finally:
+                stop_server(process)
+            self.stdout.write(f'{target:>9} {path}: {results[target].summary()}')
+
+        baseline = results[targets[0]]
+        for target in targets[1:]:
+            if baseline.rps:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{target} vs {targets[0]}: {results[target].rps / baseline.rps:.2f}x throughput, '
+                    f'p99 {results[target].percentile(99):.1f} ms vs {baseline.percentile(99):.1f} ms'
+                ))
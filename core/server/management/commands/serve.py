@@ -0,0 +1,64 @@
+import os
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.server.launcher import MODES, DjangoApplication, build_options
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the project with gunicorn: threaded WSGI workers or uvicorn "
+        "ASGI workers, sized from the CPU count unless SERVER_WORKERS is set. "
+        "Use instead of runserver outside development."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=MODES, help='Defaults to SERVER_MODE')
+        parser.add_argument('--bind', help='Defaults to SERVER_BIND')
+        parser.add_argument('--workers', type=int, help='Defaults to SERVER_WORKERS, or one derived from the CPUs')
+        parser.add_argument('--threads', type=int, help='Threads per WSGI worker')
+        parser.add_argument('--keepalive', type=int, help='Seconds an idle keep-alive connection stays open')
+        parser.add_argument('--timeout', type=int, help='Seconds before a silent worker is restarted')
+        parser.add_argument('--max-requests', type=int, help='Requests before a worker is recycled, 0 to disable')
+        parser.add_argument('--pidfile', default=settings.SERVER_PIDFILE or None)
+        parser.add_argument(
+            '--reload', action='store_true',
+            help='Gracefully replace the workers of the server running with --pidfile and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['reload']:
+            return self.reload(options['pidfile'])
+
+        mode = options['mode'] or settings.SERVER_MODE
+        try:
+            gunicorn_options = build_options(
+                mode=mode,
+                bind=options['bind'],
+                workers=options['workers'],
+                threads=options['threads'],
+                keepalive=options['keepalive'],
+                timeout=options['timeout'],
+                max_requests=options['max_requests'],
+                pidfile=options['pidfile'],
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        threads = f" x {gunicorn_options['threads']} threads" if 'threads' in gunicorn_options else ''
+        self.stdout.write(
+            f"Serving {mode.upper()} on {gunicorn_options['bind']} with "
+            f"{gunicorn_options['workers']} workers{threads}"
+        )
+        DjangoApplication(mode, gunicorn_options).run()
+
+    def reload(self, pidfile):
+        if not pidfile:
+            raise CommandError('--reload needs --pidfile or SERVER_PIDFILE')
+        try:
+            with open(pidfile) as f:
+                pid = int(f.read().strip())
+            os.kill(pid, signal.SIGHUP)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'No server running with {pidfile}: {exc}')
+        self.stdout.write(self.style.SUCCESS(f'Reloading workers of {pid}'))
@@ -0,0 +1,97 @@
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+db_logger = logging.getLogger('core.server.db')
+cache_logger = logging.getLogger('core.server.cache')
+
+
+class ServerTimingMiddleware:
+    """
+    Reports, per request, how long it waited for database connections and
+    how its cache aliases performed, as ``Server-Timing`` metrics when
+    SERVER_TIMING is on and on the ``core.server.db`` / ``core.server.cache``
+    loggers at INFO:
+
+    - ``db-acquire``: time to obtain connections. Near zero with persistent
+      connections; in pooling mode a growing value means the pool is too small.
+    - ``cache-<alias>``: time spent in the alias, with its hits and lookups.
+
+    Only the core.server.postgresql and core.server.cache backends are timed.
+    Database connections are per thread: under ASGI their stats are read
+    through sync_to_async, on the thread running the request's ORM calls.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.reset()
+        self.reset_connections()
+        response = self.get_response(request)
+        return self.report(request, response, self.report_connections(request))
+
+    async def __acall__(self, request):
+        self.reset()
+        await sync_to_async(self.reset_connections)()
+        response = await self.get_response(request)
+        return self.report(request, response, await sync_to_async(self.report_connections)(request))
+
+    def timed_connections(self):
+        return [
+            connection for connection in connections.all(initialized_only=True)
+            if hasattr(connection, 'reset_acquire_stats')
+        ]
+
+    def timed_caches(self):
+        return [(alias, caches[alias]) for alias in caches if hasattr(caches[alias], 'reset_stats')]
+
+    def reset(self):
+        for _, cache in self.timed_caches():
+            cache.reset_stats()
+
+    def reset_connections(self):
+        for connection in self.timed_connections():
+            connection.reset_acquire_stats()
+
+    def report(self, request, response, db_metric):
+        metrics = [db_metric]
+        for alias, cache in self.timed_caches():
+            if cache.lookups or cache.elapsed:
+                metrics.append(f'cache-{alias};dur={cache.elapsed * 1000:.2f};desc="{cache.hits}/{cache.lookups} hits"')
+                cache_logger.info(
+                    '%s %s cache %s: %d/%d hits in %.2f ms',
+                    request.method, request.path, alias, cache.hits, cache.lookups, cache.elapsed * 1000,
+                )
+
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = ', '.join(filter(None, [response.get('Server-Timing'), *metrics]))
+        return response
+
+    def report_connections(self, request):
+        count, elapsed, pools = 0, 0.0, []
+        for connection in self.timed_connections():
+            count += connection.acquire_count
+            elapsed += connection.acquire_time
+            if connection.pool is not None:
+                stats = connection.pool.get_stats()
+                pools.append(
+                    f"{connection.alias} pool {stats['pool_size'] - stats['pool_available']}"
+                    f"/{stats['pool_max']} in use, {stats.get('requests_waiting', 0)} waiting"
+                )
+
+        if count:
+            db_logger.info(
+                '%s %s acquired %d connections in %.2f ms%s',
+                request.method, request.path, count, elapsed * 1000,
+                ''.join(f'; {pool}' for pool in pools),
+            )
+        return f'db-acquire;dur={elapsed * 1000:.2f};desc="{count} connections"'
@@ -0,0 +1,36 @@
+import time
+from django.db.backends.postgresql import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that times obtaining a usable connection: opening
+    one, borrowing one from the pool in pooling mode, and the health check
+    of a persistent one. core.server.middleware.ServerTimingMiddleware
+    reports it per request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset_acquire_stats()
+
+    def reset_acquire_stats(self):
+        self.acquire_count = 0
+        self.acquire_time = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            self.acquire_count += 1
+            self.acquire_time += time.perf_counter() - started
+
+    def close_if_health_check_failed(self):
+        if self.connection is None or not self.health_check_enabled or self.health_check_done:
+            return
+        started = time.perf_counter()
+        try:
+            super().close_if_health_check_failed()
+        finally:
+            self.acquire_time += time.perf_counter() - started
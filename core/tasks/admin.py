@@ -0,0 +1,13 @@
+from django.contrib import admin
+from core.tasks.models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'queue', 'status', 'attempts', 'user', 'created_at', 'finished_at')
+    list_filter = ('status', 'queue', 'name')
+    search_fields = ('name', 'user__username')
+    readonly_fields = ('created_at', 'updated_at', 'started_at', 'finished_at', 'worker')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
@@ -0,0 +1,33 @@
+import signal
+from django.core.management.base import BaseCommand, CommandError
+from core.tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks (image renditions, catalog imports, "
+        "cache warmups). Start one or more workers next to the web server; "
+        "SIGINT/SIGTERM let the running tasks finish before exiting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queues', help='Comma separated queues, defaults to all')
+        parser.add_argument('--concurrency', type=int, default=2, help='Tasks run at once')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls when idle')
+        parser.add_argument('--burst', action='store_true', help='Exit once no task is due')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be positive')
+        queues = [q.strip() for q in options['queues'].split(',')] if options['queues'] else None
+
+        worker = Worker(queues, options['concurrency'], options['poll_interval'])
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+
+        self.stdout.write(
+            f'Worker {worker.name} on {", ".join(queues) if queues else "all queues"} '
+            f'with concurrency {worker.concurrency}'
+        )
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} tasks'))
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from core.models import BaseModel
+
+
+class Task(BaseModel):
+    """
+    A queued call of a registered task handler, see core.tasks.registry.
+    The table is the broker: workers claim pending rows with
+    ``SELECT ... FOR UPDATE SKIP LOCKED``.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    )
+
+    name = models.CharField(max_length=100)
+    queue = models.CharField(max_length=50, default='default')
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    # User who started the task, the only one allowed to read its status
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    progress = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'tasks'
+        indexes = [
+            # Only the rows workers poll for, finished tasks stay out of it
+            models.Index(
+                fields=['queue', 'run_after'],
+                name='tasks_pending_idx',
+                condition=Q(status='pending'),
+            ),
+            models.Index(
+                fields=['name', 'started_at'],
+                name='tasks_running_idx',
+                condition=Q(status='running'),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+    def set_progress(self, **progress):
+        """
+        Record progress of a running task, readable from the status
+        endpoint. Also renews the worker's lease (TASKS_LEASE_TIMEOUT runs
+        from ``started_at``), so a long task reporting progress is not
+        handed to another worker while it still runs.
+        """
+        self.progress = {**self.progress, **progress}
+        self.started_at = timezone.now()
+        Task.objects.filter(pk=self.pk).update(progress=self.progress, started_at=self.started_at)
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+
+# Task handlers by name, filled by the @task decorator
+handlers = {}
+
+
+class TaskHandler:
+    def __init__(self, func, name, queue, max_attempts, concurrency, bind):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.max_attempts = max_attempts
+        # Most tasks of this name running at once across all workers
+        self.concurrency = concurrency
+        self.bind = bind
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, user=None, delay=None, **kwargs):
+        """
+        Queue a call with JSON serializable keyword arguments. The row is
+        written in the current transaction, so workers only see it once
+        the caller commits. With TASKS_EAGER it runs in-process on commit.
+        """
+        from core.tasks.models import Task
+
+        task = Task.objects.create(
+            name=self.name,
+            queue=self.queue,
+            payload=kwargs,
+            user=user,
+            max_attempts=self.max_attempts,
+            run_after=timezone.now() + (delay or timedelta()),
+        )
+        if settings.TASKS_EAGER:
+            from core.tasks.worker import run_task
+
+            transaction.on_commit(lambda: run_task(task.pk))
+        return task
+
+
+def task(name, queue='default', max_attempts=3, concurrency=None, bind=False):
+    """
+    Register a task handler. Handlers must be idempotent, a failed or
+    interrupted call is retried up to ``max_attempts`` times. With
+    ``bind`` the Task row is passed as the first argument.
+    """
+    def decorator(func):
+        if name in handlers:
+            raise ValueError(f'Task {name} is already registered')
+        handlers[name] = TaskHandler(func, name, queue, max_attempts, concurrency, bind)
+        return handlers[name]
+    return decorator
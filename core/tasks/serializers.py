@@ -0,0 +1,13 @@
+from rest_framework import serializers
+from core.tasks.models import Task
+
+
+class TaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = (
+            'id', 'name', 'status', 'attempts', 'max_attempts', 'progress',
+            'result', 'error', 'run_after', 'started_at', 'finished_at',
+            'created_at', 'updated_at',
+        )
+        read_only_fields = fields
@@ -0,0 +1,10 @@
+from django.urls import path
+from core.tasks.views import TaskListView, TaskRetrieveView
+
+
+app_name = 'tasks'
+
+urlpatterns = [
+    path('', TaskListView.as_view(), name='task-list'),
+    path('<uuid:pk>/', TaskRetrieveView.as_view(), name='task-detail'),
+]
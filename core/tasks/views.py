@@ -0,0 +1,39 @@
+from rest_framework import generics, permissions
+from drf_yasg.utils import swagger_auto_schema
+from core.tasks.models import Task
+from core.tasks.serializers import TaskSerializer
+
+
+class TaskListView(generics.ListAPIView):
+    """Background tasks started by the current user, newest first."""
+    serializer_class = TaskSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Task.objects.filter(user=self.request.user).order_by('-created_at', '-id')
+        status = self.request.query_params.get('status')
+        if status:
+            queryset = queryset.filter(status=status)
+        return queryset
+
+    @swagger_auto_schema(
+        operation_description="List the background tasks of the current user",
+        responses={200: TaskSerializer(many=True), 401: "Unauthorized"}
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class TaskRetrieveView(generics.RetrieveAPIView):
+    serializer_class = TaskSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Task.objects.filter(user=self.request.user)
+
+    @swagger_auto_schema(
+        operation_description="Get the status, progress and result of a background task",
+        responses={200: TaskSerializer, 404: "Not Found"}
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
@@ -0,0 +1,177 @@
+import logging
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from core.tasks.models import Task
+from core.tasks.registry import handlers
+
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def release_expired(now=None):
+    """
+    Hand running tasks whose worker died back to the queue, or fail them
+    once they are out of attempts.
+    """
+    now = now or timezone.now()
+    expired = Task.objects.filter(
+        status=Task.RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.TASKS_LEASE_TIMEOUT),
+    )
+    expired.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, error='Worker lease expired', finished_at=now,
+    )
+    expired.update(status=Task.PENDING, run_after=now)
+
+
+def _lock_name(name):
+    # Serializes the running count check of one task name across workers,
+    # released when the claiming transaction ends
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'tasks:{name}'])
+
+
+def claim(queues=None, limit=1, worker=''):
+    """
+    Mark up to ``limit`` due tasks as running and return them. Rows locked
+    by another worker are skipped, and tasks registered with a
+    ``concurrency`` are left pending while that many already run.
+    """
+    now = timezone.now()
+    release_expired(now)
+    with transaction.atomic():
+        due = Task.objects.select_for_update(skip_locked=True).filter(
+            status=Task.PENDING, run_after__lte=now,
+        )
+        if queues:
+            due = due.filter(queue__in=queues)
+
+        claimed = []
+        slots = {}
+        for task in due.order_by('run_after')[:limit]:
+            handler = handlers.get(task.name)
+            if handler is None:
+                Task.objects.filter(pk=task.pk).update(
+                    status=Task.FAILED, error=f'Unknown task {task.name}', finished_at=now,
+                )
+                continue
+            if handler.concurrency:
+                if task.name not in slots:
+                    _lock_name(task.name)
+                    running = Task.objects.filter(name=task.name, status=Task.RUNNING).count()
+                    slots[task.name] = handler.concurrency - running
+                if slots[task.name] <= 0:
+                    continue
+                slots[task.name] -= 1
+            claimed.append(task)
+
+        Task.objects.filter(pk__in=[task.pk for task in claimed]).update(
+            status=Task.RUNNING, started_at=now, worker=worker, attempts=F('attempts') + 1,
+        )
+    for task in claimed:
+        task.status, task.started_at, task.worker = Task.RUNNING, now, worker
+        task.attempts += 1
+    return claimed
+
+
+def execute(task):
+    """Run a claimed task and record its outcome, scheduling a retry on failure."""
+    handler = handlers[task.name]
+    args = (task,) if handler.bind else ()
+    try:
+        result = handler(*args, **task.payload)
+    except Exception:
+        logger.exception('Task %s %s failed (attempt %s)', task.name, task.pk, task.attempts)
+        error = traceback.format_exc()
+        now = timezone.now()
+        if task.attempts < task.max_attempts:
+            # Exponential backoff: 1x, 2x, 4x... the base delay
+            delay = settings.TASKS_RETRY_DELAY * 2 ** (task.attempts - 1)
+            task.status = Task.PENDING
+            Task.objects.filter(pk=task.pk).update(
+                status=Task.PENDING, error=error, run_after=now + timedelta(seconds=delay),
+            )
+        else:
+            task.status = Task.FAILED
+            Task.objects.filter(pk=task.pk).update(status=Task.FAILED, error=error, finished_at=now)
+    else:
+        task.status = Task.SUCCEEDED
+        Task.objects.filter(pk=task.pk).update(
+            status=Task.SUCCEEDED, result=result, error='', finished_at=timezone.now(),
+        )
+    return task
+
+
+def run_task(pk):
+    """Run one pending task in-process, used for TASKS_EAGER."""
+    now = timezone.now()
+    if Task.objects.filter(pk=pk, status=Task.PENDING).update(
+        status=Task.RUNNING, started_at=now, worker='eager', attempts=F('attempts') + 1,
+    ):
+        return execute(Task.objects.get(pk=pk))
+
+
+def run_pending(queues=None, worker='inline'):
+    """Run due tasks one by one until none is left, returning how many ran."""
+    count = 0
+    while tasks := claim(queues, 1, worker):
+        execute(tasks[0])
+        count += 1
+    return count
+
+
+class Worker:
+    """
+    Polls the task table and runs up to ``concurrency`` tasks at once in a
+    thread pool. ``stop()`` lets the running tasks finish.
+    """
+
+    def __init__(self, queues=None, concurrency=1, poll_interval=1.0, name=None):
+        self.queues = queues
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.name = name or default_worker_name()
+        self.stopping = False
+        self.processed = 0
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def execute(self, task):
+        try:
+            return execute(task)
+        finally:
+            # Connections are per thread, do not leave one open per pool thread
+            connections.close_all()
+
+    def run(self, burst=False):
+        """Process tasks until stopped, or until the queue is empty with ``burst``."""
+        running = set()
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix='task') as pool:
+            while not self.stopping:
+                free = self.concurrency - len(running)
+                tasks = claim(self.queues, free, self.name) if free else []
+                running.update(pool.submit(self.execute, task) for task in tasks)
+
+                if not running:
+                    if burst:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                # Also wakes up every poll_interval to claim into free slots
+                done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                self.processed += len(done)
+            self.processed += len(wait(running).done)
+        return self.processed
@@ -0,0 +1,144 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from core.merchants.models import Merchant
+from core.products.models import Product, Promotion, Service
+from core.tests.test_setup import TestSetUp
+
+User = get_user_model()
+
+
+class TestAsyncReadViews(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.token = str(AccessToken.for_user(self.user))
+
+    def async_get(self, url, token=None, **params):
+        return self.client.get(url, params, HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+
+    def create_product(self, name='Test Product', price='100.00', merchant=None):
+        product = Product.objects.create(
+            merchant=merchant or self.merchant,
+            name=name,
+            description='Test Description',
+            price=Decimal(price)
+        )
+        product.categories.add(self.category)
+        return product
+
+    def assertSameResults(self, sync_url, async_url, **params):
+        expected = self.client.get(sync_url, params)
+        response = self.async_get(async_url, **params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        if 'results' in expected.data:
+            self.assertEqual(response.json()['count'], expected.json()['count'])
+            self.assertEqual(response.json()['results'], expected.json()['results'])
+        else:
+            self.assertEqual(response.json(), expected.json())
+        return response
+
+    def test_product_list_and_detail(self):
+        cheap = self.create_product('Cheap', '10.00')
+        self.create_product('Dear', '90.00')
+        promotion = Promotion.objects.create(
+            name='Sale',
+            description='Sale',
+            discount_percent=Decimal('10.00'),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=1),
+        )
+        promotion.products.add(cheap)
+
+        self.assertSameResults(reverse('products:product-list'), reverse('products-async:product-list'))
+        response = self.assertSameResults(
+            reverse('products:product-list'), reverse('products-async:product-list'),
+            ordering='-effective_price', max_price='50.00',
+        )
+        self.assertEqual([item['name'] for item in response.json()['results']], ['Cheap'])
+        response = self.assertSameResults(
+            reverse('products:product-detail', args=[cheap.id]),
+            reverse('products-async:product-detail', args=[cheap.id]),
+        )
+        self.assertEqual(response.json()['promotions'][0]['id'], str(promotion.id))
+
+    def test_service_and_promotion_endpoints(self):
+        service = Service.objects.create(
+            merchant=self.merchant,
+            name='Test Service',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+        promotion = Promotion.objects.create(
+            name='Sale',
+            description='Sale',
+            discount_percent=Decimal('10.00'),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=1),
+        )
+        promotion.services.add(service)
+
+        self.assertSameResults(reverse('products:service-list'), reverse('products-async:service-list'))
+        self.assertSameResults(
+            reverse('products:service-detail', args=[service.id]),
+            reverse('products-async:service-detail', args=[service.id]),
+        )
+        self.assertSameResults(reverse('products:promotion-list'), reverse('products-async:promotion-list'))
+        self.assertSameResults(
+            reverse('products:promotion-detail', args=[promotion.id]),
+            reverse('products-async:promotion-detail', args=[promotion.id]),
+        )
+
+    def test_merchant_endpoints(self):
+        self.assertSameResults(reverse('merchants:merchant-list'), reverse('merchants-async:merchant-list'))
+        self.assertSameResults(
+            reverse('merchants:merchant-detail', args=[self.merchant.id]),
+            reverse('merchants-async:merchant-detail', args=[self.merchant.id]),
+        )
+
+    def test_pagination(self):
+        for i in range(11):
+            self.create_product(f'Test Product {i}')
+        url = reverse('products-async:product-list')
+
+        response = self.async_get(url, page=2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertIn(url, response.json()['previous'])
+        self.assertEqual(self.async_get(url, page=3).status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.async_get(url, pagination='cursor')
+        self.assertEqual(len(response.json()['results']), 10)
+        self.assertIn('cursor=', response.json()['next'])
+
+    def test_authentication_and_permissions(self):
+        url = reverse('products-async:product-list')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+        self.assertEqual(self.async_get(url, token='invalid').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        other = User.objects.create_user(username='other', password='testpass123')
+        response = self.async_get(url, token=str(AccessToken.for_user(other)))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        other_merchant = Merchant.objects.create(user=other, name='Other', address='Other')
+        foreign = self.create_product(merchant=other_merchant)
+        response = self.async_get(reverse('products-async:product-detail', args=[foreign.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cached_response_needs_no_queries(self):
+        self.create_product()
+        url = reverse('products-async:product-list')
+        self.async_get(url)
+
+        # The principal of the JWT authentication is cached as well
+        with self.assertNumQueries(0):
+            response = self.async_get(url)
+
+        self.assertEqual(response.json()['count'], 1)
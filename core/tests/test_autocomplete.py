@@ -0,0 +1,64 @@
+from io import StringIO
+from rest_framework import status
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from core.tests.test_setup import TestSetUp
+from core.products.autocomplete import trigram_available
+from core.products.models import Hashtag, Product
+from decimal import Decimal
+
+
+class TestTaxonomyAutocomplete(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.coffee = Hashtag.objects.create(name='coffee')
+        self.coffeehouse = Hashtag.objects.create(name='coffeehouse')
+        self.cocoa = Hashtag.objects.create(name='cocoa')
+        product = Product.objects.create(
+            merchant=self.merchant,
+            name='Test Product',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+        product.hashtags.add(self.coffeehouse)
+
+    def suggest(self, **params):
+        response = self.client.get(reverse('products:hashtag-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_prefix_matches_ranked_by_usage(self):
+        results = self.suggest(q='Coff')
+
+        self.assertEqual([r['name'] for r in results], ['coffeehouse', 'coffee'])
+        self.assertEqual(results[0]['usage_count'], 1)
+
+    def test_limit(self):
+        self.assertEqual(len(self.suggest(q='c', limit=1)), 1)
+        response = self.client.get(reverse('products:hashtag-list'), {'q': 'c', 'limit': 500})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_suggestions_are_cached_until_taxonomy_changes(self):
+        self.suggest(q='co')
+        with self.assertNumQueries(0):
+            self.suggest(q='co')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Hashtag.objects.create(name='cola')
+        self.assertIn('cola', [r['name'] for r in self.suggest(q='co')])
+
+    def test_without_query_lists_everything(self):
+        response = self.client.get(reverse('products:hashtag-list'))
+        self.assertEqual(response.data['count'], 4)
+
+    def test_fuzzy_matches_with_pg_trgm(self):
+        if not trigram_available():
+            self.skipTest('needs the pg_trgm extension')
+        self.assertIn('coffee', [r['name'] for r in self.suggest(q='cofee')])
+
+    def test_create_trigram_indexes_without_pg_trgm(self):
+        if trigram_available():
+            self.skipTest('CREATE INDEX CONCURRENTLY cannot run in a test transaction')
+        with self.assertRaisesMessage(CommandError, 'pg_trgm extension is not available'):
+            call_command('create_trigram_indexes', stdout=StringIO())
@@ -0,0 +1,156 @@
+from datetime import timedelta
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from core.tests.test_setup import TestSetUp
+from core.merchants.models import Merchant
+from core.products.models import Product, Promotion, Service
+from decimal import Decimal
+import uuid
+
+User = get_user_model()
+
+
+class TestBulkCatalogViews(TestSetUp):
+    def build_items(self, count):
+        return [
+            {
+                'name': f'Test Product {i}',
+                'description': 'Test Description',
+                'price': '100.00',
+                'category_ids': [str(self.category.id)],
+                'hashtag_ids': [str(self.hashtag.id)],
+                'keyword_ids': [str(self.keyword.id)],
+            } for i in range(count)
+        ]
+
+    def test_bulk_create_products(self):
+        items = self.build_items(50)
+
+        # One lookup per relation type, then one INSERT per table and
+        # one search vector UPDATE inside a savepoint
+        with self.assertNumQueries(10):
+            response = self.client.post(reverse('products:product-bulk'), items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['results']), 50)
+        self.assertEqual(Product.objects.filter(merchant=self.merchant).count(), 50)
+        product = Product.objects.get(id=response.data['results'][0]['id'])
+        self.assertEqual(list(product.categories.all()), [self.category])
+        self.assertEqual(list(product.keywords.all()), [self.keyword])
+
+    def test_bulk_create_services(self):
+        response = self.client.post(reverse('products:service-bulk'), self.build_items(5), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Service.objects.filter(merchant=self.merchant).count(), 5)
+
+    def test_bulk_create_reports_per_item_errors_and_writes_nothing(self):
+        items = self.build_items(3)
+        items[1]['price'] = 'not-a-price'
+        items[2]['category_ids'] = [str(uuid.uuid4())]
+
+        response = self.client.post(reverse('products:product-bulk'), items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data['errors']
+        self.assertEqual(errors[0], {})
+        self.assertIn('price', errors[1])
+        self.assertIn('category_ids', errors[2])
+        self.assertEqual(Product.objects.count(), 0)
+
+    def test_bulk_update_products(self):
+        products = [
+            Product.objects.create(
+                merchant=self.merchant,
+                name=f'Test Product {i}',
+                description='Test Description',
+                price=Decimal('100.00')
+            ) for i in range(3)
+        ]
+        products[0].categories.add(self.category)
+
+        response = self.client.patch(reverse('products:product-bulk'), [
+            {'id': str(products[0].id), 'price': '50.00', 'category_ids': []},
+            {'id': str(products[1].id), 'name': 'Renamed', 'hashtag_ids': [str(self.hashtag.id)]},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        products[0].refresh_from_db()
+        products[1].refresh_from_db()
+        self.assertEqual(products[0].price, Decimal('50.00'))
+        self.assertEqual(products[0].categories.count(), 0)
+        self.assertEqual(products[1].name, 'Renamed')
+        self.assertEqual(list(products[1].hashtags.all()), [self.hashtag])
+
+    def test_bulk_update_rejects_foreign_items(self):
+        other_user = User.objects.create_user(username='other', password='testpass123')
+        other_merchant = Merchant.objects.create(user=other_user, name='Other', address='Other')
+        foreign = Product.objects.create(
+            merchant=other_merchant,
+            name='Foreign Product',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+
+        response = self.client.patch(reverse('products:product-bulk'), [
+            {'id': str(foreign.id), 'price': '1.00'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', response.data['errors'][0])
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.price, Decimal('100.00'))
+
+    def test_bulk_delete_products(self):
+        product = Product.objects.create(
+            merchant=self.merchant,
+            name='Test Product',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+        missing = str(uuid.uuid4())
+
+        response = self.client.delete(
+            reverse('products:product-bulk'),
+            {'ids': [str(product.id), missing]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r['status'] for r in response.data['results']],
+            ['deleted', 'not_found']
+        )
+        self.assertFalse(Product.objects.exists())
+
+    def delete_products(self, count, promotion):
+        products = [
+            Product.objects.create(merchant=self.merchant, name=f'Product {i}', description='', price='10.00')
+            for i in range(count)
+        ]
+        for product in products:
+            product.categories.add(self.category)
+        promotion.products.add(*products)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(
+                reverse('products:product-bulk'), {'ids': [str(p.id) for p in products]}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_bulk_delete_queries_do_not_grow_with_items(self):
+        now = timezone.now()
+        promotion = Promotion.objects.create(
+            name='Sale', description='', discount_percent=Decimal('10.00'),
+            start_date=now - timedelta(days=1), end_date=now + timedelta(days=1),
+        )
+
+        self.assertEqual(self.delete_products(2, promotion), self.delete_products(20, promotion))
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(Product.categories.through.objects.exists())
+        self.assertFalse(promotion.merchants.exists())
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from core.tests.test_setup import TestSetUp
+from core.merchants.models import Merchant
+from core.products.catalog_io import export_catalog
+from core.products.models import Product, Promotion
+from decimal import Decimal
+from datetime import timedelta
+
+User = get_user_model()
+
+class TestExportCatalog(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.products = []
+        for i in range(5):
+            product = Product.objects.create(
+                merchant=self.merchant,
+                name=f'Test Product {i}',
+                description='Test Description',
+                price=Decimal('100.00')
+            )
+            product.categories.add(self.category)
+            product.hashtags.add(self.hashtag)
+            self.products.append(product)
+
+    def read_stream(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_products_csv(self):
+        response = self.client.get(reverse('products:catalog-export', kwargs={'kind': 'products'}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.read_stream(response))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['categories'], 'Test Category')
+        self.assertEqual(rows[0]['hashtags'], 'testhashtag')
+        self.assertEqual(rows[0]['keywords'], '')
+
+    def test_export_promotions_jsonl(self):
+        promotion = Promotion.objects.create(
+            name='Test Promotion',
+            description='Test Description',
+            discount_percent=Decimal('10.00'),
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(days=7)
+        )
+        promotion.products.add(*self.products[:2])
+
+        response = self.client.get(
+            reverse('products:catalog-export', kwargs={'kind': 'promotions'}),
+            {'output': 'jsonl'}
+        )
+
+        lines = [json.loads(line) for line in self.read_stream(response).splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(
+            sorted(lines[0]['products']),
+            sorted(str(p.id) for p in self.products[:2])
+        )
+
+    def test_export_relation_queries_are_batched(self):
+        # One chunk of rows, then one query per relation for the chunk
+        with self.assertNumQueries(4):
+            lines = ''.join(export_catalog('products', self.merchant.id, 'csv', 100)).splitlines()
+        self.assertEqual(len(lines), 6)
+
+    def test_unknown_kind(self):
+        response = self.client.get(reverse('products:catalog-export', kwargs={'kind': 'users'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_command_malformed_merchant_id(self):
+        with self.assertRaisesMessage(CommandError, 'Merchant not-a-uuid not found'):
+            call_command('export_catalog', merchant='not-a-uuid', stdout=StringIO())
+
+    def test_export_command_round_trips_through_import(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'products.jsonl')
+            call_command('export_catalog', merchant=str(self.merchant.id), output=path)
+
+            other_user = User.objects.create_user(username='other', password='testpass123')
+            other = Merchant.objects.create(user=other_user, name='Other', address='Other')
+            call_command('import_catalog', path, merchant=str(other.id), stdout=StringIO())
+
+        imported = Product.objects.filter(merchant=other)
+        self.assertEqual(
+            sorted(imported.values_list('name', flat=True)),
+            sorted(p.name for p in self.products)
+        )
+        self.assertEqual(list(imported[0].categories.all()), [self.category])
@@ -0,0 +1,167 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from core.images import generate_renditions, rendition_name
+from core.products.models import Product
+from core.tasks.models import Task
+from core.tasks.worker import run_pending
+from core.tests.test_setup import TestSetUp
+
+
+def upload(name='photo.jpg', size=(2000, 1500), fmt='JPEG', mode='RGB', color='red', **save_options):
+    buffer = BytesIO()
+    Image.new(mode, size, color).save(buffer, fmt, **save_options)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{fmt.lower()}')
+
+
+class TestImageRenditions(TestSetUp):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        return super().setUp()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        return super().tearDown()
+
+    def create_product(self, image):
+        response = self.client.post(reverse('products:product-list'), {
+            'name': 'Test Product',
+            'description': 'Test Description',
+            'price': '100.00',
+            'image': image,
+        }, format='multipart')
+        # Renditions are generated by the background worker
+        run_pending()
+        return response
+
+    def open_rendition(self, field_file, rendition, fmt):
+        return Image.open(field_file.storage.open(rendition_name(field_file.name, rendition, fmt)))
+
+    def test_upload_generates_renditions(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera Maker'
+        response = self.create_product(upload(exif=exif.tobytes()))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        product = Product.objects.get()
+        renditions = self.client.get(reverse('products:product-detail', args=[product.pk])).data['image_renditions']
+        self.assertEqual(set(renditions), {'thumbnail', 'card', 'full'})
+        self.assertTrue(renditions['card']['webp'].endswith('_card.webp'))
+
+        with self.open_rendition(product.image, 'thumbnail', 'webp') as thumbnail:
+            self.assertEqual(thumbnail.format, 'WEBP')
+            self.assertEqual(thumbnail.size, (160, 120))
+        with self.open_rendition(product.image, 'full', 'jpeg') as full:
+            self.assertEqual(full.size, (1280, 960))
+            self.assertTrue(full.info.get('progressive'))
+            self.assertNotIn('exif', full.info)
+
+    def test_original_is_served_until_renditions_are_generated(self):
+        response = self.client.post(reverse('products:product-list'), {
+            'name': 'Test Product',
+            'description': 'Test Description',
+            'price': '100.00',
+            'image': upload(),
+        }, format='multipart')
+        detail = reverse('products:product-detail', args=[response.data['id']])
+
+        for data in (response.data, self.client.get(detail).data):
+            self.assertEqual(
+                {url for formats in data['image_renditions'].values() for url in formats.values()},
+                {data['image']},
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            run_pending()
+
+        renditions = self.client.get(detail).data['image_renditions']
+        self.assertTrue(renditions['card']['webp'].endswith('_card.webp'))
+
+    def test_small_images_are_not_upscaled(self):
+        self.create_product(upload(size=(100, 80)))
+
+        with self.open_rendition(Product.objects.get().image, 'full', 'webp') as full:
+            self.assertEqual(full.size, (100, 80))
+
+    def test_transparent_images_get_jpeg_renditions(self):
+        self.create_product(upload('logo.png', size=(300, 300), fmt='PNG', mode='RGBA', color=(255, 0, 0, 0)))
+
+        image = Product.objects.get().image
+        with self.open_rendition(image, 'card', 'jpeg') as card:
+            self.assertEqual(card.mode, 'RGB')
+        with self.open_rendition(image, 'card', 'webp') as card:
+            self.assertEqual(card.mode, 'RGBA')
+
+    @override_settings(IMAGE_MAX_UPLOAD_SIZE=1024)
+    def test_oversized_upload_is_rejected(self):
+        response = self.create_product(upload(size=(800, 800), quality=100))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', response.data)
+        self.assertFalse(Product.objects.exists())
+
+    @override_settings(IMAGE_MAX_PIXELS=1000)
+    def test_too_many_pixels_is_rejected(self):
+        response = self.create_product(upload(size=(100, 100)))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', response.data)
+
+    def test_merchant_logo_renditions(self):
+        response = self.client.put(
+            reverse('merchants:merchant-detail', args=[self.merchant.id]),
+            {'name': 'Test Merchant', 'address': 'Test Address', 'logo': upload('logo.jpg')},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(run_pending(), 1)
+        response = self.client.get(reverse('merchants:merchant-detail', args=[self.merchant.id]))
+        self.assertTrue(response.data['logo_renditions']['thumbnail']['jpeg'].endswith('_thumbnail.jpg'))
+        self.merchant.refresh_from_db()
+        with self.open_rendition(self.merchant.logo, 'thumbnail', 'jpeg') as thumbnail:
+            self.assertEqual(thumbnail.size, (160, 120))
+
+    def test_updates_without_upload_do_not_rerender(self):
+        self.create_product(upload())
+        product = Product.objects.get()
+        name = rendition_name(product.image.name, 'card', 'webp')
+        product.image.storage.delete(name)
+
+        product.name = 'Renamed'
+        product.save()
+
+        self.assertEqual(run_pending(), 0)
+        self.assertFalse(product.image.storage.exists(name))
+        call_command('generate_renditions', '--type', 'products', stdout=StringIO())
+        self.assertTrue(product.image.storage.exists(name))
+
+    def test_upload_request_does_not_render(self):
+        self.client.post(reverse('products:product-list'), {
+            'name': 'Test Product',
+            'description': 'Test Description',
+            'price': '100.00',
+            'image': upload(),
+        }, format='multipart')
+
+        image = Product.objects.get().image
+        self.assertFalse(image.storage.exists(rendition_name(image.name, 'card', 'webp')))
+        self.assertEqual(Task.objects.get().name, 'images.render')
+
+        run_pending()
+        self.assertTrue(image.storage.exists(rendition_name(image.name, 'card', 'webp')))
+
+    def test_generate_renditions_returns_storage_names(self):
+        self.create_product(upload())
+        image = Product.objects.get().image
+
+        self.assertEqual(len(generate_renditions(image)), 6)
@@ -0,0 +1,141 @@
+import json
+import os
+import tempfile
+import uuid
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from core.tests.test_setup import TestSetUp
+from core.products.models import Category, Hashtag, Product, Service
+
+
+CSV_ROWS = """name,description,price,is_active,categories,hashtags,keywords
+Product 1,Description,100.00,true,Test Category|Drinks,#sale,coffee
+Product 2,Description,120.00,,Drinks,,
+Product 3,Description,not-a-price,true,,,
+Product 4,Description,80.50,false,Food,#sale|#new,
+Product 5,Description,10.00,true,,,tea
+"""
+
+
+class TestImportCatalog(TestSetUp):
+    def write_file(self, content, suffix):
+        f = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False, encoding='utf-8')
+        f.write(content)
+        f.close()
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    def test_import_csv(self):
+        path = self.write_file(CSV_ROWS, '.csv')
+        out, err = StringIO(), StringIO()
+
+        call_command(
+            'import_catalog', path,
+            merchant=str(self.merchant.id), chunk_size=2,
+            stdout=out, stderr=err
+        )
+
+        self.assertEqual(Product.objects.filter(merchant=self.merchant).count(), 4)
+        self.assertIn('Row 3', err.getvalue())
+        product = Product.objects.get(name='Product 1')
+        # Existing categories are reused, missing ones created once
+        self.assertEqual(
+            sorted(product.categories.values_list('name', flat=True)),
+            ['Drinks', 'Test Category']
+        )
+        self.assertEqual(Category.objects.filter(name='Drinks').count(), 1)
+        self.assertEqual(Category.objects.filter(name='Test Category').count(), 1)
+        self.assertEqual(Hashtag.objects.filter(name='sale').count(), 1)
+        self.assertFalse(Product.objects.get(name='Product 4').is_active)
+
+    def test_import_jsonl_services(self):
+        lines = [
+            {'name': f'Service {i}', 'description': '', 'price': '50.00', 'keywords': ['spa']}
+            for i in range(3)
+        ]
+        path = self.write_file('\n'.join(json.dumps(line) for line in lines), '.jsonl')
+
+        call_command(
+            'import_catalog', path,
+            merchant=str(self.merchant.id), type='services',
+            stdout=StringIO()
+        )
+
+        self.assertEqual(Service.objects.filter(merchant=self.merchant).count(), 3)
+        self.assertEqual(Service.objects.first().keywords.get().name, 'spa')
+
+    def test_malformed_jsonl_lines_are_invalid_rows(self):
+        lines = [
+            json.dumps({'name': 'Service 1', 'price': '50.00'}),
+            '{"name": "Service 2", ',
+            json.dumps(['not', 'an', 'object']),
+            json.dumps({'name': 'Service 4', 'price': '50.00'}),
+        ]
+        path = self.write_file('\n'.join(lines), '.jsonl')
+        err = StringIO()
+
+        call_command(
+            'import_catalog', path,
+            merchant=str(self.merchant.id), type='services',
+            stdout=StringIO(), stderr=err
+        )
+
+        self.assertEqual(
+            sorted(Service.objects.values_list('name', flat=True)), ['Service 1', 'Service 4']
+        )
+        self.assertIn('Row 2', err.getvalue())
+        self.assertIn('Invalid JSON', err.getvalue())
+        self.assertIn('Row 3', err.getvalue())
+
+    def test_malformed_merchant_id(self):
+        path = self.write_file(CSV_ROWS, '.csv')
+
+        with self.assertRaisesMessage(CommandError, 'Merchant not-a-uuid not found'):
+            call_command('import_catalog', path, merchant='not-a-uuid', stdout=StringIO())
+
+    def test_resume_from_checkpoint(self):
+        path = self.write_file(CSV_ROWS, '.csv')
+        checkpoint = path + '.checkpoint'
+        self.addCleanup(lambda: os.path.exists(checkpoint) and os.unlink(checkpoint))
+        with open(checkpoint, 'w') as f:
+            json.dump({'source': os.path.abspath(path), 'rows': 3}, f)
+
+        call_command(
+            'import_catalog', path,
+            merchant=str(self.merchant.id), checkpoint=checkpoint,
+            stdout=StringIO(), stderr=StringIO()
+        )
+
+        self.assertEqual(
+            sorted(Product.objects.values_list('name', flat=True)),
+            ['Product 4', 'Product 5']
+        )
+        with open(checkpoint) as f:
+            self.assertEqual(json.load(f), {'source': os.path.abspath(path), 'rows': 5})
+
+    def test_resume_from_pending_chunk(self):
+        path = self.write_file(CSV_ROWS, '.csv')
+        checkpoint = path + '.checkpoint'
+        self.addCleanup(lambda: os.path.exists(checkpoint) and os.unlink(checkpoint))
+        first = Product.objects.create(merchant=self.merchant, name='Product 1', price='100.00')
+
+        # Interrupted between writing the checkpoint of rows 1-2 and their
+        # chunk's commit: they are imported again only if it did not commit
+        for created_id, expected in (
+            (first.pk, ['Product 1', 'Product 4', 'Product 5']),
+            (uuid.uuid4(), ['Product 1', 'Product 1', 'Product 2', 'Product 4', 'Product 5']),
+        ):
+            Product.objects.exclude(pk=first.pk).delete()
+            with open(checkpoint, 'w') as f:
+                json.dump({
+                    'source': os.path.abspath(path), 'rows': 0,
+                    'pending': {'rows': 2, 'id': str(created_id)},
+                }, f)
+
+            call_command(
+                'import_catalog', path, merchant=str(self.merchant.id), checkpoint=checkpoint,
+                chunk_size=2, stdout=StringIO(), stderr=StringIO()
+            )
+
+            self.assertEqual(sorted(Product.objects.values_list('name', flat=True)), expected)
@@ -0,0 +1,201 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from core.images import rendition_name
+from core.media.models import Blob
+from core.media.storage import media_storage
+from core.products.models import Product
+from core.tasks.models import Task
+from core.tasks.worker import run_pending
+from core.tests.test_setup import TestSetUp
+
+
+def image_bytes(color='red'):
+    buffer = BytesIO()
+    Image.new('RGB', (40, 30), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class TestContentAddressedMedia(TestSetUp):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        return super().setUp()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        return super().tearDown()
+
+    def create_product(self, content, name='photo.jpg'):
+        response = self.client.post(reverse('products:product-list'), {
+            'name': 'Test Product',
+            'description': 'Test Description',
+            'price': '100.00',
+            'image': SimpleUploadedFile(name, content, content_type='image/jpeg'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Product.objects.get(pk=response.data['id'])
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.create_product(image_bytes(), 'a.jpg')
+        second = self.create_product(image_bytes(), 'B.JPG')
+        other = self.create_product(image_bytes('blue'))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r'^blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertEqual(Blob.objects.get(name=first.image.name).refcount, 2)
+        self.assertEqual(len(os.listdir(os.path.dirname(first.image.path))), 1)
+
+    def test_last_reference_deletes_the_blob(self):
+        first = self.create_product(image_bytes())
+        second = self.create_product(image_bytes())
+        run_pending()
+        name = first.image.name
+        storage = media_storage()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(Blob.objects.get(name=name).refcount, 1)
+        self.assertTrue(storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(Blob.objects.filter(name=name).exists())
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(storage.exists(rendition_name(name, 'card', 'webp')))
+
+    def test_bulk_delete_releases_uploads(self):
+        products = [self.create_product(image_bytes()) for _ in range(2)]
+        run_pending()
+        name = products[0].image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(
+                reverse('products:product-bulk'), {'ids': [str(p.id) for p in products]}, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Blob.objects.filter(name=name).exists())
+        self.assertFalse(media_storage().exists(name))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, rendition_name(name, 'card', 'webp'))))
+
+    def test_upload_during_release_keeps_the_blob(self):
+        first = self.create_product(image_bytes())
+        name = first.image.name
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            first.delete()
+
+        def exists_then_release(path):
+            # The release commits while the upload finds the file in place
+            found = exists(path)
+            while path.endswith(name) and callbacks:
+                callbacks.pop(0)()
+            return found
+
+        exists = os.path.exists
+        with mock.patch('core.media.storage.os.path.exists', side_effect=exists_then_release):
+            self.create_product(image_bytes())
+
+        self.assertEqual(Blob.objects.get(name=name).refcount, 1)
+        self.assertTrue(media_storage().exists(name))
+
+    def test_replaced_upload_is_released(self):
+        product = self.create_product(image_bytes())
+        old_name = product.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('products:product-detail', args=[product.id]),
+                {'image': SimpleUploadedFile('new.jpg', image_bytes('blue'), content_type='image/jpeg')},
+                format='multipart'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Blob.objects.filter(name=old_name).exists())
+        self.assertFalse(media_storage().exists(old_name))
+
+    def test_identical_uploads_are_rendered_once(self):
+        self.create_product(image_bytes())
+        self.create_product(image_bytes())
+
+        run_pending()
+
+        results = Task.objects.filter(name='images.render').order_by('created_at').values_list('result', flat=True)
+        self.assertEqual(len(results[0]), 6)
+        self.assertEqual(results[1], [])
+
+    def test_blobs_are_served_immutable_with_etag(self):
+        product = self.create_product(image_bytes())
+        run_pending()
+        url = f'/media/{product.image.name}'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn(product.image.name.rsplit('/', 1)[1][:64], response['ETag'])
+        self.assertEqual(b''.join(response.streaming_content), image_bytes())
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = self.client.get(f"/media/{rendition_name(product.image.name, 'thumbnail', 'webp')}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertTrue(response.has_header('ETag'))
+
+        self.assertEqual(self.client.get('/media/blobs/00/00/missing.jpg').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_only_blobs_and_renditions_are_served(self):
+        product = self.create_product(image_bytes())
+        run_pending()
+        os.makedirs(os.path.join(self.media_root, 'imports'))
+        for path in ('imports/catalog.csv', 'blobs/legacy.jpg'):
+            with open(os.path.join(self.media_root, path), 'w') as f:
+                f.write('private')
+        root = product.image.name.rsplit('.', 1)[0]
+
+        for path in ('blobs/../imports/catalog.csv', 'blobs/legacy.jpg', f'{root}_thumbnail.exe', f'{root}_other.webp'):
+            self.assertEqual(self.client.get(f'/media/{path}').status_code, status.HTTP_404_NOT_FOUND, path)
+
+    def test_dedupe_media_moves_legacy_uploads(self):
+        os.makedirs(os.path.join(self.media_root, 'products', 'images'))
+        for name in ('one.jpg', 'two.jpg'):
+            with open(os.path.join(self.media_root, 'products', 'images', name), 'wb') as f:
+                f.write(image_bytes())
+        for name in ('one.jpg', 'two.jpg', 'two.jpg'):
+            Product.objects.create(
+                merchant=self.merchant,
+                name='Legacy',
+                description='Test Description',
+                price='100.00',
+                image=f'products/images/{name}',
+            )
+
+        # Cached with the legacy URLs
+        self.client.get(reverse('products:product-list'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedupe_media', '--type', 'products', stdout=StringIO())
+
+        names = set(Product.objects.values_list('image', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(name.startswith('blobs/'))
+        self.assertEqual(Blob.objects.get(name=name).refcount, 3)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'products', 'images', 'one.jpg')))
+        response = self.client.get(reverse('products:product-list'))
+        self.assertTrue(all('/blobs/' in item['image'] for item in response.data['results']))
@@ -0,0 +1,55 @@
+from rest_framework import status
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.tests.test_setup import TestSetUp
+from core.products.models import Product
+from decimal import Decimal
+
+
+class TestCursorPagination(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.products = Product.objects.bulk_create([
+            Product(
+                merchant=self.merchant,
+                name=f'Test Product {i}',
+                description='Test Description',
+                price=Decimal('100.00')
+            ) for i in range(25)
+        ])
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get(reverse('products:product-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 25)
+
+    def test_cursor_pagination_walks_every_item_once(self):
+        url = reverse('products:product-list')
+        response = self.client.get(url, {'pagination': 'cursor'})
+        self.assertNotIn('count', response.data)
+
+        seen = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(set(seen), {str(p.id) for p in self.products})
+
+    def test_cursor_pagination_skips_count_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('products:product-list'), {'pagination': 'cursor'})
+
+        self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+
+    def test_merchant_list_supports_cursor_pagination(self):
+        response = self.client.get(reverse('merchants:merchant-list'), {'pagination': 'cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
@@ -0,0 +1,111 @@
+from rest_framework import status
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from core.tests.test_setup import TestSetUp
+from core.products.models import Product, Service, Promotion
+from decimal import Decimal
+from datetime import timedelta
+from io import StringIO
+
+
+class TestEffectivePrices(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(
+            merchant=self.merchant,
+            name='Test Product',
+            description='Test Description',
+            price=Decimal('200.00')
+        )
+
+    def create_promotion(self, discount, start=None, end=None, **kwargs):
+        now = timezone.now()
+        return Promotion.objects.create(
+            name='Test Promotion',
+            description='Test Description',
+            discount_percent=Decimal(discount),
+            start_date=start or now - timedelta(days=1),
+            end_date=end or now + timedelta(days=7),
+            **kwargs
+        )
+
+    def assertPrice(self, item, effective_price, discount):
+        item.refresh_from_db()
+        self.assertEqual(item.effective_price, Decimal(effective_price))
+        self.assertEqual(item.best_discount_percent, Decimal(discount))
+
+    def test_new_items_are_not_discounted(self):
+        self.assertPrice(self.product, '200.00', '0')
+
+    def test_best_active_promotion_wins(self):
+        self.create_promotion('10').products.add(self.product)
+        self.create_promotion('25').products.add(self.product)
+        self.create_promotion('50', is_active=False).products.add(self.product)
+
+        self.assertPrice(self.product, '150.00', '25')
+
+    def test_promotion_changes_are_applied(self):
+        promotion = self.create_promotion('10')
+        self.product.promotions.add(promotion)
+        self.assertPrice(self.product, '180.00', '10')
+
+        promotion.discount_percent = Decimal('33.33')
+        promotion.save()
+        self.assertPrice(self.product, '133.34', '33.33')
+
+        promotion.products.clear()
+        self.assertPrice(self.product, '200.00', '0')
+
+        promotion.products.add(self.product)
+        promotion.delete()
+        self.assertPrice(self.product, '200.00', '0')
+
+    def test_price_changes_follow_the_discount(self):
+        self.create_promotion('10').products.add(self.product)
+        self.product.price = Decimal('50.00')
+        self.product.save()
+
+        self.assertPrice(self.product, '45.00', '10')
+
+    def test_scheduled_refresh_applies_window_changes(self):
+        now = timezone.now()
+        service = Service.objects.create(
+            merchant=self.merchant,
+            name='Test Service',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+        upcoming = self.create_promotion('20', start=now + timedelta(minutes=1))
+        upcoming.services.add(service)
+        self.assertPrice(service, '100.00', '0')
+
+        # The window opens, then the job runs
+        Promotion.objects.filter(pk=upcoming.pk).update(start_date=now - timedelta(minutes=1))
+        call_command('refresh_promotion_prices', stdout=StringIO())
+        self.assertPrice(service, '80.00', '20')
+
+        Promotion.objects.filter(pk=upcoming.pk).update(end_date=now - timedelta(minutes=1))
+        call_command('refresh_promotion_prices', stdout=StringIO())
+        self.assertPrice(service, '100.00', '0')
+
+    def test_list_sorts_and_filters_by_effective_price(self):
+        cheap = Product.objects.create(
+            merchant=self.merchant,
+            name='Cheap Product',
+            description='Test Description',
+            price=Decimal('120.00')
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_promotion('50').products.add(self.product)
+
+        url = reverse('products:product-list')
+        response = self.client.get(url, {'ordering': 'effective_price'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [str(self.product.id), str(cheap.id)]
+        )
+
+        response = self.client.get(url, {'max_price': '110', 'on_sale': 'true'})
+        self.assertEqual([item['id'] for item in response.data['results']], [str(self.product.id)])
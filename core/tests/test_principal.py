@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from core.accounts.authentication import PrincipalJWTAuthentication
+from core.merchants.models import Merchant
+from core.tests.test_setup import TestSetUp
+
+User = get_user_model()
+
+
+class TestPrincipalAuthentication(TestSetUp):
+    def authenticate(self, user):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return PrincipalJWTAuthentication().authenticate(request)[0]
+
+    def test_login_embeds_principal_claims(self):
+        response = self.client.post(reverse('accounts:login'), {
+            'username': 'testuser',
+            'password': 'testpass123',
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = AccessToken(response.data['access'])
+        self.assertEqual(token['merchant_id'], str(self.merchant.pk))
+        self.assertFalse(token['is_staff'])
+
+    def test_principal_is_cached(self):
+        with self.assertNumQueries(1):
+            self.authenticate(self.user)
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(self.user)
+            self.assertEqual(user, self.user)
+            self.assertTrue(user.is_authenticated)
+            self.assertEqual(user.merchant, self.merchant)
+            self.assertEqual(user.merchant.user, user)
+
+        # Fields outside the principal are loaded on access
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'test@example.com')
+
+    def test_user_without_merchant(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.authenticate(other)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(hasattr(self.authenticate(other), 'merchant'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            merchant = Merchant.objects.create(user=other, name='Other', address='Other')
+        self.assertEqual(self.authenticate(other).merchant, merchant)
+
+    def test_user_changes_invalidate_principal(self):
+        self.authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.user)
+
+    def test_authenticated_reads_need_no_auth_queries(self):
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        url = reverse('products:product-list')
+        self.client.get(url)
+
+        # Principal and response both come from the cache
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
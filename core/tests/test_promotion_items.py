@@ -0,0 +1,131 @@
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from core.cache import CATALOG_NAMESPACE, get_versions, version_key
+from core.tests.test_setup import TestSetUp
+from core.merchants.models import Merchant
+from core.products.models import Product, Service, Promotion
+from decimal import Decimal
+from datetime import timedelta
+
+User = get_user_model()
+
+
+class TestPromotionItems(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.promotion = Promotion.objects.create(
+            name='Test Promotion',
+            description='Test Description',
+            discount_percent=Decimal('10.00'),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=7)
+        )
+        self.url = reverse('products:promotion-items', kwargs={'promotion_id': self.promotion.id})
+
+    def create_items(self, model, count):
+        return model.objects.bulk_create([
+            model(
+                merchant=self.merchant,
+                name=f'Test Item {i}',
+                description='Test Description',
+                price=Decimal('100.00')
+            ) for i in range(count)
+        ])
+
+    def count_add_queries(self, count):
+        promotion = Promotion.objects.create(
+            name='Other Promotion',
+            description='Test Description',
+            discount_percent=Decimal('10.00'),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=7)
+        )
+        url = reverse('products:promotion-items', kwargs={'promotion_id': promotion.id})
+        products = self.create_items(Product, count)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url, {'product_ids': [str(p.id) for p in products]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def test_add_items_in_one_call(self):
+        products = self.create_items(Product, 50)
+        services = self.create_items(Service, 5)
+
+        response = self.client.post(self.url, {
+            'product_ids': [str(p.id) for p in products],
+            'service_ids': [str(s.id) for s in services],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['products'], {'added': 50, 'already_added': 0})
+        self.assertEqual(response.data['services'], {'added': 5, 'already_added': 0})
+        self.assertEqual(self.promotion.products.count(), 50)
+        self.assertEqual(list(Promotion.objects.for_merchant(self.merchant.pk)), [self.promotion])
+        products[0].refresh_from_db()
+        self.assertEqual(products[0].effective_price, Decimal('90.00'))
+
+        response = self.client.post(self.url, {'product_ids': [str(products[0].id)]}, format='json')
+        self.assertEqual(response.data['products'], {'added': 0, 'already_added': 1})
+
+    def test_query_count_does_not_grow_with_items(self):
+        self.assertEqual(self.count_add_queries(5), self.count_add_queries(200))
+
+    def test_remove_items(self):
+        products = self.create_items(Product, 3)
+        self.promotion.products.add(*products)
+
+        response = self.client.delete(self.url, {
+            'product_ids': [str(p.id) for p in products[:2]] + [str(products[0].id)],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['products'], {'removed': 2, 'not_found': 0})
+        self.assertEqual(list(self.promotion.products.all()), [products[2]])
+        products[0].refresh_from_db()
+        self.assertEqual(products[0].effective_price, Decimal('100.00'))
+
+    def test_rejects_items_of_other_merchants(self):
+        other_user = User.objects.create_user(username='other', password='testpass123')
+        other_merchant = Merchant.objects.create(user=other_user, name='Other', address='Other')
+        foreign = Product.objects.create(
+            merchant=other_merchant,
+            name='Foreign Product',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+        own = self.create_items(Product, 1)[0]
+
+        response = self.client.post(self.url, {'product_ids': [str(own.id), str(foreign.id)]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(foreign.id), response.data['product_ids'][0])
+        self.assertFalse(self.promotion.products.exists())
+
+    def test_invalidates_every_merchant_of_the_promotion(self):
+        other_user = User.objects.create_user(username='other', password='testpass123')
+        other_merchant = Merchant.objects.create(user=other_user, name='Other', address='Other')
+        foreign = Product.objects.create(
+            merchant=other_merchant, name='Foreign Product', description='Test Description', price=Decimal('100.00')
+        )
+        self.promotion.products.add(foreign)
+        key = version_key(CATALOG_NAMESPACE, str(other_merchant.pk))
+        product = self.create_items(Product, 1)[0]
+
+        for method in (self.client.post, self.client.delete):
+            version = get_versions([key])[0]
+            with self.captureOnCommitCallbacks(execute=True):
+                response = method(self.url, {'product_ids': [str(product.id)]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertGreater(get_versions([key])[0], version)
+
+    def test_requires_ids_and_existing_promotion(self):
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = reverse('products:promotion-items', kwargs={'promotion_id': self.merchant.id})
+        response = self.client.post(url, {'product_ids': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,91 @@
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from core.tests.test_setup import TestSetUp
+from core.merchants.models import Merchant
+from core.products.models import Product, Service, Promotion
+from decimal import Decimal
+from datetime import timedelta
+from io import StringIO
+
+User = get_user_model()
+
+
+class TestMerchantPromotionLookup(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.promotion = Promotion.objects.create(
+            name='Test Promotion',
+            description='Test Description',
+            discount_percent=Decimal('10.00'),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=7)
+        )
+        self.product = Product.objects.create(
+            merchant=self.merchant,
+            name='Test Product',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+        self.service = Service.objects.create(
+            merchant=self.merchant,
+            name='Test Service',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+
+    def lookup(self):
+        return list(Promotion.objects.for_merchant(self.merchant.pk))
+
+    def test_follows_membership_changes(self):
+        self.assertEqual(self.lookup(), [])
+
+        self.promotion.products.add(self.product)
+        self.service.promotions.add(self.promotion)
+        self.assertEqual(self.lookup(), [self.promotion])
+
+        self.promotion.products.remove(self.product)
+        self.assertEqual(self.lookup(), [self.promotion])
+
+        self.service.promotions.clear()
+        self.assertEqual(self.lookup(), [])
+
+    def test_follows_item_deletion(self):
+        self.promotion.products.add(self.product)
+        self.product.delete()
+
+        self.assertEqual(self.lookup(), [])
+
+    def test_scoped_per_merchant_without_distinct(self):
+        other_user = User.objects.create_user(username='other', password='testpass123')
+        other_merchant = Merchant.objects.create(user=other_user, name='Other', address='Other')
+        other_product = Product.objects.create(
+            merchant=other_merchant,
+            name='Other Product',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+        self.promotion.products.add(self.product, other_product)
+        self.promotion.services.add(self.service)
+
+        queryset = Promotion.objects.for_merchant(self.merchant.pk)
+        self.assertEqual(list(queryset), [self.promotion])
+        self.assertNotIn('DISTINCT', str(queryset.query))
+        self.assertEqual(list(Promotion.objects.for_merchant(other_merchant.pk)), [self.promotion])
+
+    def test_views_use_the_lookup(self):
+        self.promotion.products.add(self.product)
+
+        response = self.client.get(reverse('products:promotion-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data['results']], [str(self.promotion.id)])
+
+        response = self.client.get(reverse('products:promotion-detail', kwargs={'pk': self.promotion.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_promotion_lookup', items='10', promotions=2, repeat=1, stdout=out)
+        self.assertIn('for_merchant', out.getvalue())
@@ -0,0 +1,199 @@
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from core.tests.test_setup import TestSetUp
+from core.products.models import Product, Service, Promotion
+from decimal import Decimal
+from datetime import timedelta
+
+User = get_user_model()
+
+
+class TestListQueryCounts(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.promotion = Promotion.objects.create(
+            name='Test Promotion',
+            description='Test Description',
+            discount_percent=Decimal('10.00'),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=7)
+        )
+        # Expired promotion must not show up in responses
+        self.expired_promotion = Promotion.objects.create(
+            name='Expired Promotion',
+            description='Test Description',
+            discount_percent=Decimal('20.00'),
+            start_date=timezone.now() - timedelta(days=7),
+            end_date=timezone.now() - timedelta(days=1)
+        )
+
+    def create_items(self, model, count):
+        items = []
+        # Run the cache invalidation hooks so lists are not served from cache
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                item = model.objects.create(
+                    merchant=self.merchant,
+                    name=f'Test Item {i}',
+                    description='Test Description',
+                    price=Decimal('100.00')
+                )
+                item.categories.add(self.category)
+                item.hashtags.add(self.hashtag)
+                item.keywords.add(self.keyword)
+                items.append(item)
+            self.promotion.products.add(*[i for i in items if isinstance(i, Product)])
+            self.promotion.services.add(*[i for i in items if isinstance(i, Service)])
+            self.expired_promotion.products.add(*[i for i in items if isinstance(i, Product)])
+            self.expired_promotion.services.add(*[i for i in items if isinstance(i, Service)])
+        return items
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_product_list_queries_do_not_grow_with_page_size(self):
+        self.create_items(Product, 2)
+        small, _ = self.count_queries(reverse('products:product-list'))
+
+        self.create_items(Product, 8)
+        full, response = self.count_queries(reverse('products:product-list'))
+
+        self.assertEqual(small, full)
+        self.assertEqual(len(response.data['results']), 10)
+        for item in response.data['results']:
+            self.assertEqual(len(item['categories']), 1)
+            self.assertNotIn('promotions', item)
+            self.assertEqual(item['best_discount_percent'], '10.00')
+            self.assertEqual(item['effective_price'], '90.00')
+
+    def test_product_list_query_count(self):
+        self.create_items(Product, 10)
+        # count, page, categories, hashtags, keywords; prices are
+        # denormalized so the promotions tables are never read
+        with self.assertNumQueries(5):
+            self.client.get(reverse('products:product-list'))
+
+    def test_service_list_queries_do_not_grow_with_page_size(self):
+        self.create_items(Service, 2)
+        small, _ = self.count_queries(reverse('products:service-list'))
+
+        self.create_items(Service, 8)
+        full, response = self.count_queries(reverse('products:service-list'))
+
+        self.assertEqual(small, full)
+        self.assertEqual(len(response.data['results']), 10)
+        for item in response.data['results']:
+            self.assertEqual(item['effective_price'], '90.00')
+
+    def test_product_detail_query_count(self):
+        product = self.create_items(Product, 1)[0]
+        with self.assertNumQueries(7):
+            response = self.client.get(
+                reverse('products:product-detail', kwargs={'pk': product.id})
+            )
+        self.assertEqual(len(response.data['promotions']), 1)
+
+
+class TestWriteQueryCounts(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.promotion = Promotion.objects.create(
+            name='Test Promotion',
+            description='Test Description',
+            discount_percent=Decimal('10.00'),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=7)
+        )
+        self.product = Product.objects.create(
+            merchant=self.merchant, name='Test Product', description='Test Description', price=Decimal('100.00')
+        )
+        self.service = Service.objects.create(
+            merchant=self.merchant, name='Test Service', description='Test Description', price=Decimal('100.00')
+        )
+
+    def authenticate(self, user):
+        # A freshly loaded user, so the merchant lookup is part of the count
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk))
+
+    def count_queries(self, method, url, data=None):
+        self.authenticate(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, format='json')
+        merchant_queries = [q for q in ctx.captured_queries if 'FROM "merchants"' in q['sql']]
+        # Permission, view and serializer share a single merchant lookup
+        self.assertEqual(len(merchant_queries), 1)
+        return len(ctx.captured_queries), response
+
+    def test_product_create_query_count(self):
+        # merchant, insert, search vector, categories: lookup, existing,
+        # insert, search vector; response: categories, hashtags, keywords
+        count, response = self.count_queries('post', reverse('products:product-list'), {
+            'name': 'New Product',
+            'description': 'Test Description',
+            'price': '10.00',
+            'category_ids': [str(self.category.id)],
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(count, 11)
+
+    def test_service_create_query_count(self):
+        count, response = self.count_queries('post', reverse('products:service-list'), {
+            'name': 'New Service', 'description': 'Test Description', 'price': '10.00',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(count, 6)
+
+    def test_promotion_create_query_count(self):
+        count, response = self.count_queries('post', reverse('products:promotion-list'), {
+            'name': 'New Promotion',
+            'description': 'Test Description',
+            'discount_percent': '5.00',
+            'start_date': timezone.now().isoformat(),
+            'end_date': (timezone.now() + timedelta(days=1)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(count, 8)
+
+    def test_add_product_to_promotion_query_count(self):
+        count, response = self.count_queries(
+            'post', reverse('products:add-product-to-promotion', args=[self.promotion.id, self.product.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(count, 13)
+
+    def test_add_service_to_promotion_query_count(self):
+        count, response = self.count_queries(
+            'post', reverse('products:add-service-to-promotion', args=[self.promotion.id, self.service.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(count, 13)
+
+    def test_promotion_items_query_count(self):
+        count, response = self.count_queries(
+            'post', reverse('products:promotion-items', args=[self.promotion.id]),
+            {'product_ids': [str(self.product.id)]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(count, 15)
+
+    def test_product_detail_query_count(self):
+        count, response = self.count_queries('get', reverse('products:product-detail', args=[self.product.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(count, 6)
+
+    def test_user_without_merchant_is_refused_with_one_query(self):
+        user = User.objects.create_user(username='nomerchant', password='testpass123')
+        self.authenticate(user)
+        # The missing merchant is remembered, not looked up again
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('products:product-list'), {
+                'name': 'New Product', 'description': 'Test Description', 'price': '10.00',
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,16 @@
+import unittest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN checks need PostgreSQL')
+class TestQueryPlans(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+
+        self.assertIn('uses products_merchant_active_idx', out.getvalue())
+        self.assertIn('uses promotions_active_window_idx', out.getvalue())
+        self.assertIn('uses products_search_idx', out.getvalue())
@@ -0,0 +1,100 @@
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, router
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from core import routers
+from core.merchants.models import Merchant
+from core.products.models import Product
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_MAX_LAG=2.0, REPLICA_PIN_SECONDS=5.0)
+class TestReplicaRouting(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        routers._replica_lag.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.merchant = Merchant.objects.create(user=self.user, name='Test Merchant', address='Test Address')
+        Product.objects.create(merchant=self.merchant, name='Product', description='Test', price=Decimal('10.00'))
+        # Forget the primary pins of the writes above
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get_counting_replica_queries(self, url):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(replica.captured_queries)
+
+    def test_list_and_detail_read_from_replica(self):
+        response, replica_queries = self.get_counting_replica_queries(reverse('products:product-list'))
+        self.assertEqual(response.data['count'], 1)
+        self.assertGreater(replica_queries, 0)
+
+        product = Product.objects.get()
+        _, replica_queries = self.get_counting_replica_queries(reverse('products:product-detail', args=[product.id]))
+        self.assertGreater(replica_queries, 0)
+
+        _, replica_queries = self.get_counting_replica_queries(reverse('merchants:merchant-list'))
+        self.assertGreater(replica_queries, 0)
+
+    def test_reads_after_a_write_use_primary(self):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.post(reverse('products:product-list'), {
+                'name': 'New Product',
+                'description': 'New',
+                'price': '20.00',
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(replica.captured_queries), 0)
+
+        response, replica_queries = self.get_counting_replica_queries(reverse('products:product-list'))
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(replica_queries, 0)
+
+        # Other namespaces are not pinned
+        _, replica_queries = self.get_counting_replica_queries(reverse('merchants:merchant-list'))
+        self.assertGreater(replica_queries, 0)
+
+    def test_async_reads_use_replica(self):
+        url = reverse('products-async:product-list')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertGreater(len(replica.captured_queries), 0)
+
+        # Pinned to the primary after a write, as the sync views
+        self.client.post(reverse('products:product-list'), {'name': 'New', 'description': 'New', 'price': '20.00'})
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(len(replica.captured_queries), 0)
+
+    def test_lagging_replica_is_skipped(self):
+        with mock.patch('core.routers.replica_lag', return_value=10.0) as lag:
+            _, replica_queries = self.get_counting_replica_queries(reverse('products:product-list'))
+            self.assertEqual(replica_queries, 0)
+
+            # The lag is remembered for REPLICA_LAG_CHECK_INTERVAL
+            self.client.get(reverse('merchants:merchant-list'))
+            self.assertEqual(lag.call_count, 1)
+
+    def test_writes_and_migrations_use_primary(self):
+        with routers.replica_reads() as alias:
+            self.assertEqual(alias, 'replica')
+            self.assertEqual(router.db_for_read(Product), 'replica')
+            self.assertEqual(router.db_for_write(Product), 'default')
+        self.assertEqual(router.db_for_read(Product), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'products'))
+        self.assertTrue(router.allow_migrate('default', 'products'))
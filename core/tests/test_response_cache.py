@@ -0,0 +1,116 @@
+from rest_framework import status
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core.tests.test_setup import TestSetUp
+from core.merchants.models import Merchant
+from core.products.models import Product, Promotion
+from decimal import Decimal
+from datetime import timedelta
+
+User = get_user_model()
+
+
+class TestResponseCache(TestSetUp):
+    def create_product(self, merchant=None, name='Test Product'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Product.objects.create(
+                merchant=merchant or self.merchant,
+                name=name,
+                description='Test Description',
+                price=Decimal('100.00')
+            )
+
+    def test_list_hit_does_not_query_database(self):
+        self.create_product()
+        url = reverse('products:product-list')
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+
+    def test_query_params_are_part_of_the_key(self):
+        for i in range(11):
+            self.create_product(name=f'Test Product {i}')
+        url = reverse('products:product-list')
+
+        first = self.client.get(url)
+        second = self.client.get(url, {'page': 2})
+
+        self.assertEqual(len(first.data['results']), 10)
+        self.assertEqual(len(second.data['results']), 1)
+
+    def test_responses_are_scoped_per_merchant(self):
+        self.create_product()
+        url = reverse('products:product-list')
+        self.client.get(url)
+
+        other_user = User.objects.create_user(username='other', password='testpass123')
+        other_merchant = Merchant.objects.create(
+            user=other_user,
+            name='Other Merchant',
+            address='Other Address'
+        )
+        self.create_product(merchant=other_merchant, name='Other Product')
+        self.create_product(merchant=other_merchant, name='Another Product')
+        self.client.force_authenticate(user=other_user)
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_product_write_invalidates_list(self):
+        url = reverse('products:product-list')
+        self.assertEqual(self.client.get(url).data['count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {
+                'name': 'Test Product',
+                'description': 'Test Description',
+                'price': '100.00',
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.client.get(url).data['count'], 1)
+
+    def test_promotion_membership_invalidates_detail(self):
+        product = self.create_product()
+        url = reverse('products:product-detail', kwargs={'pk': product.id})
+        self.assertEqual(self.client.get(url).data['promotions'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            promotion = Promotion.objects.create(
+                name='Test Promotion',
+                description='Test Description',
+                discount_percent=Decimal('10.00'),
+                start_date=timezone.now() - timedelta(days=1),
+                end_date=timezone.now() + timedelta(days=7)
+            )
+            promotion.products.add(product)
+
+        self.assertEqual(len(self.client.get(url).data['promotions']), 1)
+
+    def test_taxonomy_write_invalidates_embedded_names(self):
+        product = self.create_product()
+        product.categories.add(self.category)
+        url = reverse('products:product-detail', kwargs={'pk': product.id})
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Renamed Category'
+            self.category.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['categories'][0]['name'], 'Renamed Category')
+
+    def test_merchant_update_invalidates_detail(self):
+        url = reverse('merchants:merchant-detail', kwargs={'pk': self.merchant.id})
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.merchant.name = 'Renamed Merchant'
+            self.merchant.save()
+
+        self.assertEqual(self.client.get(url).data['name'], 'Renamed Merchant')
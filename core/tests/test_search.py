@@ -0,0 +1,100 @@
+from rest_framework import status
+from django.urls import reverse
+from django.utils import timezone
+from core.tests.test_setup import TestSetUp
+from core.products.models import Category, Product, Service, Promotion
+from decimal import Decimal
+from datetime import timedelta
+
+
+class TestCatalogSearch(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.coffee = Product.objects.create(
+            merchant=self.merchant,
+            name='Iced coffee',
+            description='Ca phe sua da',
+            price=Decimal('30000.00')
+        )
+        self.coffee.categories.add(self.category)
+        self.tea = Product.objects.create(
+            merchant=self.merchant,
+            name='Tra dao',
+            description='Peach tea with coffee jelly',
+            price=Decimal('45000.00')
+        )
+        self.tea.keywords.add(self.keyword)
+
+    def search(self, **params):
+        response = self.client.get(reverse('products:catalog-search'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_name_matches_rank_above_description_matches(self):
+        results = self.search(q='coffee')
+
+        self.assertEqual([r['id'] for r in results], [str(self.coffee.id), str(self.tea.id)])
+        self.assertIn('<mark>coffee</mark>', results[1]['highlight']['description'])
+
+    def test_matches_taxonomy_names(self):
+        results = self.search(q='testkeyword')
+        self.assertEqual([r['id'] for r in results], [str(self.tea.id)])
+
+        self.tea.keywords.clear()
+        self.assertEqual(self.search(q='testkeyword'), [])
+
+    def test_renamed_category_is_searchable(self):
+        self.category.name = 'Beverages'
+        self.category.save()
+
+        self.assertEqual([r['id'] for r in self.search(q='beverages')], [str(self.coffee.id)])
+
+    def test_reverse_relation_changes_refresh_items(self):
+        category = Category.objects.create(name='Breakfast')
+        category.product_set.add(self.tea)
+        self.assertEqual([r['id'] for r in self.search(q='breakfast')], [str(self.tea.id)])
+
+        category.product_set.clear()
+        self.assertEqual(self.search(q='breakfast'), [])
+
+    def test_filters(self):
+        Promotion.objects.create(
+            name='Test Promotion',
+            description='Test Description',
+            discount_percent=Decimal('10.00'),
+            start_date=timezone.now() - timedelta(days=1),
+            end_date=timezone.now() + timedelta(days=7)
+        ).products.add(self.tea)
+
+        self.assertEqual([r['id'] for r in self.search(q='coffee', max_price='40000')], [str(self.coffee.id)])
+        self.assertEqual([r['id'] for r in self.search(q='coffee', category=self.category.id)], [str(self.coffee.id)])
+        self.assertEqual([r['id'] for r in self.search(q='coffee', promotion='true')], [str(self.tea.id)])
+        self.assertEqual([r['id'] for r in self.search(q='coffee', promotion='false')], [str(self.coffee.id)])
+
+    def test_inactive_items_are_hidden(self):
+        self.coffee.is_active = False
+        self.coffee.save()
+
+        self.assertEqual([r['id'] for r in self.search(q='coffee')], [str(self.tea.id)])
+
+    def test_searches_services(self):
+        service = Service.objects.create(
+            merchant=self.merchant,
+            name='Coffee catering',
+            description='Test Description',
+            price=Decimal('100.00')
+        )
+
+        self.assertEqual([r['id'] for r in self.search(q='coffee', type='services')], [str(service.id)])
+
+    def test_bulk_created_items_are_searchable(self):
+        response = self.client.post(reverse('products:product-bulk'), [
+            {'name': 'Banh mi', 'description': 'Test Description', 'price': '20000.00'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(len(self.search(q='banh')), 1)
+
+    def test_query_is_required(self):
+        response = self.client.get(reverse('products:catalog-search'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,189 @@
+from io import StringIO
+import signal
+import tempfile
+from unittest import mock
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from pymemcache.test.utils import MockMemcacheClient
+from core.server import cache as cache_backend
+from core.server.launcher import DjangoApplication, build_options, default_workers
+from core.server.middleware import ServerTimingMiddleware
+from core.tests.test_setup import TestSetUp
+
+
+def mock_client(servers, serde, **options):
+    return MockMemcacheClient(serde=serde, allow_unicode_keys=True)
+
+
+class MockMemcachedCache(cache_backend.PyMemcacheCache):
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = mock_client
+
+
+class TestServerLauncher(SimpleTestCase):
+    def test_workers_follow_cpu_count(self):
+        self.assertEqual(default_workers('wsgi', cpus=4), 9)
+        self.assertEqual(default_workers('asgi', cpus=4), 4)
+        self.assertEqual(default_workers('asgi', cpus=1), 2)
+
+    @override_settings(SERVER_WORKERS=0, SERVER_THREADS=8, SERVER_KEEPALIVE=5, SERVER_MAX_REQUESTS=1000)
+    def test_wsgi_options(self):
+        with mock.patch('core.server.launcher.cpu_count', return_value=2):
+            options = build_options(mode='wsgi', bind='127.0.0.1:9000')
+
+        self.assertEqual(options['worker_class'], 'gthread')
+        self.assertEqual(options['workers'], 5)
+        self.assertEqual(options['threads'], 8)
+        self.assertEqual(options['bind'], '127.0.0.1:9000')
+        self.assertTrue(options['preload_app'])
+        self.assertEqual(options['keepalive'], 5)
+        self.assertEqual(options['max_requests_jitter'], 100)
+
+        # Every option must be a gunicorn setting
+        application = DjangoApplication('wsgi', options)
+        self.assertEqual(application.cfg.workers, 5)
+        self.assertEqual(application.cfg.threads, 8)
+
+    @override_settings(SERVER_WORKERS=3)
+    def test_asgi_options(self):
+        options = build_options(mode='asgi', keepalive=0, max_requests=0)
+
+        self.assertEqual(options['worker_class'], 'uvicorn_worker.UvicornWorker')
+        self.assertEqual(options['workers'], 3)
+        self.assertNotIn('threads', options)
+        self.assertEqual(options['keepalive'], 0)
+        self.assertEqual(options['max_requests'], 0)
+        with self.assertRaises(ValueError):
+            build_options(mode='fastcgi')
+
+    def test_reload_signals_master(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.pid') as pidfile:
+            pidfile.write('4242\n')
+            pidfile.flush()
+            with mock.patch('os.kill') as kill:
+                call_command('serve', reload=True, pidfile=pidfile.name, stdout=StringIO())
+            kill.assert_called_once_with(4242, signal.SIGHUP)
+
+        with self.assertRaises(CommandError):
+            call_command('serve', reload=True, pidfile='/nonexistent/gunicorn.pid')
+
+
+class TestServerTiming(TestCase):
+    def test_backend_times_connecting(self):
+        wrapper = connection.copy()
+        try:
+            wrapper.ensure_connection()
+            self.assertEqual(wrapper.acquire_count, 1)
+            self.assertGreater(wrapper.acquire_time, 0)
+
+            # A persistent connection is reused until it is closed
+            wrapper.ensure_connection()
+            self.assertEqual(wrapper.acquire_count, 1)
+        finally:
+            wrapper.close()
+
+    def test_backend_times_pool_checkout(self):
+        settings_dict = {
+            **connection.settings_dict,
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {**connection.settings_dict['OPTIONS'], 'pool': {'min_size': 1, 'max_size': 2}},
+        }
+        wrapper = connection.copy()
+        wrapper.settings_dict = settings_dict
+        try:
+            wrapper.ensure_connection()
+            self.assertEqual(wrapper.acquire_count, 1)
+            self.assertEqual(wrapper.pool.get_stats()['pool_max'], 2)
+        finally:
+            wrapper.close()
+            wrapper.close_pool()
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('schema-swagger-ui'))
+
+        self.assertRegex(response['Server-Timing'], r'^db-acquire;dur=\d+\.\d{2};desc="\d+ connections"$')
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_counts_async_view_connections(self):
+        def connect():
+            # As DatabaseWrapper.connect does, on the thread of the ORM calls
+            connections['default'].acquire_count += 1
+
+        async def view(request):
+            await sync_to_async(connect)()
+            return HttpResponse()
+
+        response = async_to_sync(ServerTimingMiddleware(view))(RequestFactory().get('/'))
+
+        self.assertIn('desc="1 connections"', response['Server-Timing'])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        response = self.client.get(reverse('schema-swagger-ui'))
+
+        self.assertNotIn('Server-Timing', response)
+
+
+class TestMemcachedBackend(SimpleTestCase):
+    def setUp(self):
+        self.servers = []
+        self.addCleanup(cache_backend._clients.clear)
+
+    def make_cache(self):
+        cache = cache_backend.PyMemcacheCache('10.0.0.1:11211,10.0.0.2:11211', {'OPTIONS': {'max_pool_size': 4}})
+        cache._class = self.create_client
+        return cache
+
+    def create_client(self, servers, **options):
+        self.servers.append(servers)
+        return mock_client(servers, **options)
+
+    def test_client_is_shared_and_kept_open(self):
+        first, second = self.make_cache(), self.make_cache()
+        first.set('key', {'value': 1})
+        first.close()
+
+        self.assertEqual(second.get('key'), {'value': 1})
+        self.assertEqual(self.servers, [['10.0.0.1:11211', '10.0.0.2:11211']])
+
+    def test_counts_hits_and_time(self):
+        cache = self.make_cache()
+        cache.set('a', 1)
+        cache.reset_stats()
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('b', 'default'), 'default')
+        self.assertEqual(cache.get_many(['a', 'b']), {'a': 1})
+        self.assertEqual((cache.hits, cache.lookups), (2, 5))
+        self.assertGreater(cache.elapsed, 0)
+
+
+@override_settings(
+    SERVER_TIMING=True,
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'responses': {'BACKEND': 'core.tests.test_server.MockMemcachedCache', 'LOCATION': 'responses:11211'},
+        'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    },
+)
+class TestCacheTiming(TestSetUp):
+    def tearDown(self):
+        cache_backend._clients.clear()
+        super().tearDown()
+
+    def test_server_timing_reports_response_cache(self):
+        url = reverse('merchants:merchant-list')
+        self.client.get(url)
+        response = self.client.get(url)
+
+        metrics = response['Server-Timing'].split(', ')
+        self.assertRegex(metrics[0], r'^db-acquire;')
+        self.assertRegex(metrics[1], r'^cache-responses;dur=\d+\.\d{2};desc="1/1 hits"$')
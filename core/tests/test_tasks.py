@@ -0,0 +1,239 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from core.products.models import Product
+from core.products.tasks import warm_catalog_cache
+from core.products.views import ProductListCreateView
+from core.tasks.models import Task
+from core.tasks.registry import handlers, task
+from core.tasks.worker import claim, execute, run_pending
+from core.tests.test_setup import TestSetUp
+
+User = get_user_model()
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+    return {'value': value}
+
+
+@task('tests.flaky', max_attempts=2)
+def flaky():
+    raise RuntimeError('boom')
+
+
+@task('tests.limited', concurrency=1)
+def limited():
+    pass
+
+
+class TestTaskWorker(TestSetUp):
+    def setUp(self):
+        calls.clear()
+        return super().setUp()
+
+    def test_enqueued_task_runs_and_stores_result(self):
+        queued = record.enqueue(user=self.user, value=3)
+
+        self.assertEqual(run_pending(), 1)
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.SUCCEEDED)
+        self.assertEqual(queued.result, {'value': 3})
+        self.assertEqual(queued.attempts, 1)
+        self.assertEqual(calls, [3])
+
+    def test_failed_task_is_retried_with_backoff_then_failed(self):
+        queued = flaky.enqueue()
+
+        execute(claim()[0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertIn('RuntimeError: boom', queued.error)
+        self.assertGreater(queued.run_after, timezone.now())
+        # Not due yet
+        self.assertEqual(claim(), [])
+
+        Task.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+        execute(claim()[0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_concurrency_limit_leaves_tasks_pending(self):
+        limited.enqueue()
+        limited.enqueue()
+
+        self.assertEqual(len(claim(limit=2)), 1)
+        self.assertEqual(claim(limit=2), [])
+
+    def test_queues_are_claimed_separately(self):
+        record.enqueue(value=1)
+
+        self.assertEqual(claim(queues=['images']), [])
+        self.assertEqual(len(claim(queues=['default'])), 1)
+
+    def test_expired_lease_is_released(self):
+        queued = record.enqueue(value=1)
+        claim()
+        Task.objects.filter(pk=queued.pk).update(started_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(run_pending(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.SUCCEEDED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_progress_renews_the_lease(self):
+        queued = record.enqueue(value=1)
+        running = claim()[0]
+        Task.objects.filter(pk=queued.pk).update(started_at=timezone.now() - timedelta(hours=1))
+
+        running.set_progress(rows=10)
+
+        self.assertEqual(claim(), [])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.RUNNING)
+        self.assertEqual(queued.attempts, 1)
+
+    def test_unknown_task_fails(self):
+        queued = Task.objects.create(name='tests.missing', run_after=timezone.now())
+
+        claim()
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertNotIn('tests.missing', handlers)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_tasks_run_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queued = record.enqueue(value=5)
+            self.assertEqual(calls, [])
+
+        self.assertEqual(calls, [5])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.SUCCEEDED)
+
+
+class TestTaskViews(TestSetUp):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        return super().setUp()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        return super().tearDown()
+
+    def test_task_status_is_private(self):
+        queued = record.enqueue(user=self.user, value=1)
+        other = User.objects.create_user(username='other', password='testpass123')
+        foreign = record.enqueue(user=other, value=2)
+
+        response = self.client.get(reverse('tasks:task-detail', args=[queued.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], Task.PENDING)
+
+        response = self.client.get(reverse('tasks:task-detail', args=[foreign.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(reverse('tasks:task-list'))
+        self.assertEqual([t['id'] for t in response.data['results']], [str(queued.id)])
+
+    def test_catalog_import_runs_in_background(self):
+        upload = SimpleUploadedFile(
+            'catalog.csv',
+            b'name,description,price\nProduct 1,Description,100.00\nProduct 2,Description,bad\n',
+            content_type='text/csv',
+        )
+
+        response = self.client.post(
+            reverse('products:catalog-import', args=['products']),
+            {'file': upload},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Product.objects.exists())
+
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            run_pending()
+
+        queued = Task.objects.get(pk=response.data['id'])
+        self.assertEqual(queued.status, Task.SUCCEEDED)
+        self.assertEqual(queued.result['created'], 1)
+        self.assertEqual(queued.result['invalid'], 1)
+        self.assertEqual(queued.progress['rows'], 2)
+        self.assertEqual(Product.objects.filter(merchant=self.merchant).count(), 1)
+        # The warmup queued by the import filled the product list cache
+        warmup = Task.objects.get(name='catalog.warm_cache')
+        self.assertEqual(warmup.status, Task.SUCCEEDED)
+        self.assertIn(reverse('products:product-list'), warmup.result['warmed'])
+        # Warmed again once the import's cache invalidation ran, the test
+        # runs both in one transaction
+        warm_catalog_cache(user_id=str(self.user.pk), host='testserver')
+        with mock.patch.object(ProductListCreateView, 'get_queryset') as get_queryset:
+            response = self.client.get(reverse('products:product-list'))
+        get_queryset.assert_not_called()
+        self.assertEqual([item['name'] for item in response.data['results']], ['Product 1'])
+
+    def test_catalog_import_progress_commits_with_the_chunk(self):
+        upload = SimpleUploadedFile('catalog.csv', b'name,description,price\nProduct 1,Description,100.00\n')
+        response = self.client.post(
+            reverse('products:catalog-import', args=['products']), {'file': upload}, format='multipart'
+        )
+
+        with mock.patch.object(Task, 'set_progress', side_effect=DatabaseError):
+            run_pending()
+
+        queued = Task.objects.get(pk=response.data['id'])
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertEqual(queued.progress, {})
+        # Imported again by the retry, not skipped
+        self.assertFalse(Product.objects.exists())
+
+    def test_catalog_upload_is_deleted_after_the_last_attempt(self):
+        upload = SimpleUploadedFile('catalog.csv', b'name,description,price\nProduct 1,Description,100.00\n')
+        response = self.client.post(
+            reverse('products:catalog-import', args=['products']), {'file': upload}, format='multipart'
+        )
+        queued = Task.objects.get(pk=response.data['id'])
+        path = queued.payload['path']
+
+        with mock.patch.object(Task, 'set_progress', side_effect=DatabaseError):
+            execute(claim()[0])
+            # Kept for the retry
+            self.assertTrue(default_storage.exists(path))
+            Task.objects.filter(pk=queued.pk).update(max_attempts=2, run_after=timezone.now())
+            execute(claim()[0])
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertFalse(default_storage.exists(path))
+
+    def test_catalog_import_rejects_unknown_type(self):
+        upload = SimpleUploadedFile('catalog.csv', b'name\n', content_type='text/csv')
+
+        response = self.client.post(
+            reverse('products:catalog-import', args=['promotions']),
+            {'file': upload},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
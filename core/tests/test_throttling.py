@@ -0,0 +1,202 @@
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from core.merchants.models import Merchant
+from core.tests.test_setup import TestSetUp
+from core.throttling import MerchantThrottle, ScopedTokenBucketThrottle
+
+User = get_user_model()
+
+RATES = {
+    'login': '4/min',
+    'login_username': '2/min',
+    'register': '2/hour',
+    'register_username': '2/hour',
+}
+
+
+@mock.patch.object(ScopedTokenBucketThrottle, 'THROTTLE_RATES', RATES)
+class TestAuthThrottling(TestSetUp):
+    def login(self, username='testuser', password='testpass123', ip='10.0.0.1'):
+        return self.client.post(
+            reverse('accounts:login'), {'username': username, 'password': password},
+            format='json', REMOTE_ADDR=ip,
+        )
+
+    def test_username_is_throttled_before_hashing(self):
+        self.assertEqual(self.login(ip='10.0.0.1').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login(password='wrong', ip='10.0.0.2').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with mock.patch('core.accounts.views.authenticate') as authenticate:
+            response = self.login(ip='10.0.0.3')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        authenticate.assert_not_called()
+        # One token back every 30 seconds
+        self.assertEqual(response['Retry-After'], '30')
+        # Usernames differing in case or spaces share the bucket
+        self.assertEqual(self.login(username=' TestUser ').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_client_is_throttled_across_usernames(self):
+        for i in range(4):
+            self.assertEqual(self.login(username=f'user{i}').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.assertEqual(self.login(username='user4').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login(ip='10.0.0.2').status_code, status.HTTP_200_OK)
+
+    def test_bucket_refills_over_time(self):
+        with mock.patch.object(ScopedTokenBucketThrottle, 'timer', return_value=1000.0):
+            self.login()
+            self.login()
+            self.assertEqual(self.login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        with mock.patch.object(ScopedTokenBucketThrottle, 'timer', return_value=1030.0):
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+            self.assertEqual(self.login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_full_bucket_gives_no_extra_tokens(self):
+        with mock.patch.object(ScopedTokenBucketThrottle, 'timer', return_value=1000.0):
+            self.login()
+
+        # Full again, the entry has not expired yet
+        with mock.patch.object(ScopedTokenBucketThrottle, 'timer', return_value=1100.0):
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+            self.assertEqual(self.login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_bucket_is_updated_atomically(self):
+        self.login()
+
+        with mock.patch.object(ScopedTokenBucketThrottle, 'cache', wraps=ScopedTokenBucketThrottle.cache) as cache:
+            self.login()
+            self.assertEqual(self.login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        # No read-modify-write a concurrent request could interleave with
+        self.assertEqual({call[0] for call in cache.method_calls}, {'incr', 'decr', 'touch'})
+
+    def test_register_is_throttled(self):
+        url = reverse('accounts:register')
+        for i in range(2):
+            response = self.client.post(url, {'username': f'new{i}', 'password': 'testpass123'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(url, {'username': 'new2', 'password': 'testpass123'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(User.objects.filter(username='new2').exists())
+
+
+class TestPasswordHashing(TestSetUp):
+    def login(self):
+        response = self.client.post(reverse('accounts:login'), {
+            'username': 'testuser',
+            'password': 'testpass123',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+
+    def test_new_passwords_use_tuned_argon2(self):
+        self.assertTrue(self.user.password.startswith('argon2$argon2id$v=19$m=19456,t=2,p=1$'))
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password('testpass123', hasher='pbkdf2_sha256'))
+
+        self.login()
+
+        self.assertTrue(self.user.password.startswith('argon2$'))
+
+    def test_cost_change_is_applied_on_login(self):
+        with override_settings(PASSWORD_ARGON2_TIME_COST=3):
+            self.login()
+
+        self.assertIn('t=3', self.user.password)
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_password_hashers', duration=0.01, hashers='argon2', stdout=out)
+
+        self.assertRegex(out.getvalue(), r'argon2\s+\d+\.\d\s+\d+\.\d\s+variety argon2id')
+
+
+MERCHANT_RATES = {
+    'merchant_read': '3/min',
+    'merchant_write': '2/min',
+    'merchant_bulk': '1/min',
+}
+
+
+@mock.patch.object(MerchantThrottle, 'THROTTLE_RATES', MERCHANT_RATES)
+@mock.patch.object(MerchantThrottle, 'timer', return_value=6000.0)
+class TestMerchantThrottling(TestSetUp):
+    def create_product(self):
+        return self.client.post(reverse('products:product-list'), {
+            'name': 'New Product', 'description': 'Test Description', 'price': '10.00',
+        }, format='json')
+
+    def test_reads_are_throttled_per_merchant(self, timer):
+        url = reverse('products:product-list')
+        for _ in range(3):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '60')
+        # Other endpoints of the group share the limit, writes have their own
+        self.assertEqual(self.client.get(reverse('merchants:merchant-list')).status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.create_product().status_code, status.HTTP_201_CREATED)
+
+        # Another merchant is not affected
+        other = User.objects.create_user(username='other', password='testpass123')
+        Merchant.objects.create(user=other, name='Other', description='Other', address='Other')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_bulk_endpoints_have_their_own_limit(self, timer):
+        url = reverse('products:product-bulk')
+        item = [{'name': 'Bulk', 'description': 'Bulk', 'price': '10.00'}]
+        self.assertEqual(self.client.post(url, item, format='json').status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.client.post(url, item, format='json').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.create_product().status_code, status.HTTP_201_CREATED)
+
+    def test_window_slides(self, timer):
+        url = reverse('products:product-list')
+        for _ in range(3):
+            self.client.get(url)
+
+        # Half way through the next window, half of the previous one counts
+        timer.return_value = 6090.0
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '10')
+
+        timer.return_value = 6120.0
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_one_cache_round_trip_per_request(self, timer):
+        url = reverse('products:product-list')
+        self.client.get(url)
+        self.client.get(url)
+
+        with mock.patch.object(MerchantThrottle, 'cache', wraps=MerchantThrottle.cache) as cache:
+            self.client.get(url)
+
+        self.assertEqual([call[0] for call in cache.method_calls], ['incr'])
+
+    def test_async_views_are_throttled(self, timer):
+        url = reverse('products-async:product-list')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        for _ in range(3):
+            self.assertEqual(self.client.get(url, **headers).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '60')
@@ -0,0 +1,169 @@
+import time
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from core.accounts import logins, revocation
+from core.accounts.models import RevokedToken
+from core.accounts.tokens import PrincipalRefreshToken
+from core.tests.test_setup import TestSetUp
+
+User = get_user_model()
+
+
+@override_settings(TOKEN_REVOCATION_FLUSH_INTERVAL=60)
+class TestTokenRevocation(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        revocation._pending.clear()
+
+    def refresh(self, token):
+        return self.client.post(reverse('accounts:token_refresh'), {'refresh': str(token)}, format='json')
+
+    def test_refresh_rotates_without_writes(self):
+        token = PrincipalRefreshToken.for_user(self.user)
+
+        # Only the revocation lookup behind the cache miss
+        with self.assertNumQueries(1):
+            response = self.refresh(token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rotated = PrincipalRefreshToken(response.data['refresh'])
+        self.assertNotEqual(rotated['jti'], token['jti'])
+        self.assertEqual(rotated['merchant_id'], str(self.merchant.pk))
+        self.assertEqual(self.refresh(rotated).status_code, status.HTTP_200_OK)
+
+    def test_refresh_token_is_single_use(self):
+        token = PrincipalRefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_200_OK)
+
+        response = self.refresh(token)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['code'], 'token_not_valid')
+
+    def test_concurrent_refresh_loses_the_race(self):
+        token = PrincipalRefreshToken.for_user(self.user)
+        # Both requests passed the blacklist check, the first one revokes
+        self.assertTrue(revocation.revoke(token['jti'], token['exp']))
+        self.assertFalse(revocation.revoke(token['jti'], token['exp']))
+
+    def test_logout_revokes_refresh_token(self):
+        token = PrincipalRefreshToken.for_user(self.user)
+
+        response = self.client.post(reverse('accounts:logout'), {'refresh': str(token)}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_expires_with_the_token(self):
+        token = PrincipalRefreshToken.for_user(self.user)
+        cache = caches['tokens']
+
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            revocation.revoke(token['jti'], token['exp'])
+
+        timeout = add.call_args.args[2]
+        self.assertAlmostEqual(timeout, token['exp'] - time.time(), delta=2)
+        # Written behind the cache
+        self.assertFalse(RevokedToken.objects.exists())
+        self.assertEqual(revocation.flush_revocations(force=True), 1)
+        self.assertEqual(RevokedToken.objects.get().expires_at.timestamp(), token['exp'])
+
+    def test_flush_purges_expired_revocations(self):
+        RevokedToken.objects.create(jti='expired', expires_at=timezone.now() - timedelta(minutes=1))
+        token = PrincipalRefreshToken.for_user(self.user)
+        revocation.revoke(token['jti'], token['exp'])
+
+        revocation.flush_revocations(force=True)
+
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), [token['jti']])
+
+    def test_falls_back_to_database_when_cache_is_unreachable(self):
+        token = PrincipalRefreshToken.for_user(self.user)
+        broken = mock.Mock(**{'add.side_effect': ConnectionError, 'get.side_effect': ConnectionError})
+
+        with mock.patch('core.accounts.revocation.token_cache', return_value=broken):
+            self.assertTrue(revocation.revoke(token['jti'], token['exp']))
+            self.assertFalse(revocation.revoke(token['jti'], token['exp']))
+            self.assertTrue(revocation.is_revoked(token['jti']))
+            self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_during_outage_survives_cache_recovery(self):
+        token = PrincipalRefreshToken.for_user(self.user)
+        broken = mock.Mock(**{'add.side_effect': ConnectionError, 'get.side_effect': ConnectionError})
+
+        with mock.patch('core.accounts.revocation.token_cache', return_value=broken):
+            self.assertEqual(self.refresh(token).status_code, status.HTTP_200_OK)
+
+        # The cache is back, without the revocation
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+        # and has been given it again
+        self.assertIsNotNone(caches['tokens'].get(revocation.revocation_key(token['jti'])))
+
+    def test_evicted_revocation_is_still_refused(self):
+        token = PrincipalRefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_200_OK)
+        revocation.flush_revocations(force=True)
+
+        caches['tokens'].delete(revocation.revocation_key(token['jti']))
+
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_pending_revocation_is_refused_before_flush(self):
+        token = PrincipalRefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_200_OK)
+
+        caches['tokens'].delete(revocation.revocation_key(token['jti']))
+
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(LAST_LOGIN_FLUSH_INTERVAL=60)
+class TestLastLogin(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        logins.flush_logins(force=True)
+
+    def login(self):
+        response = self.client.post(reverse('accounts:login'), {
+            'username': 'testuser',
+            'password': 'testpass123',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_logins_are_written_in_batches(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.login()
+        logins.record_login(other)
+
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(logins.flush_logins(force=True), 2)
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertIsNotNone(other.last_login)
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=0)
+    def test_flushed_after_request_once_due(self):
+        self.login()
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_last_login_never_moves_back(self):
+        logins.record_login(self.user)
+        later = timezone.now() + timedelta(minutes=5)
+        User.objects.filter(pk=self.user.pk).update(last_login=later)
+
+        logins.flush_logins(force=True)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, later)
@@ -0,0 +1,218 @@
+import hashlib
+import math
+from collections.abc import Mapping
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+from core.merchants.context import get_request_merchant
+
+# Counts of finished windows, which no longer change, per process
+_closed_windows = {}
+_CLOSED_WINDOWS_MAX = 10000
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket with the rate ``num/period`` of the scope: a bucket holds
+    up to ``num`` tokens and refills one every period/num seconds, each
+    request takes one.
+
+    Kept as the time at which the bucket is full again, in milliseconds,
+    which every request moves forward by one token with an atomic cache
+    incr (a refused request takes it back with decr): one counter shared by
+    every worker, without a read-modify-write race. The entry expires
+    about when the bucket is full, which is then a missing entry; a value
+    already in the past is moved up to now first, so a full bucket never
+    holds more than ``num`` tokens.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = int(self.timer() * 1000)
+        period = self.duration * 1000
+        interval = period // self.num_requests
+        full_at = self.spend(now, interval)
+        if full_at is None:
+            return True
+        if full_at - now > period:
+            self.cache.decr(self.key, interval)
+            self.wait_seconds = (full_at - now - period) / 1000
+            return False
+        # Rounded up, the entry outlives the tokens it holds by under a second
+        self.cache.touch(self.key, math.ceil((full_at - now) / 1000) + 1)
+        return True
+
+    def spend(self, now, interval):
+        """Take one token, returning when the bucket will be full; None when the cache fails."""
+        try:
+            full_at = self.cache.incr(self.key, interval)
+        except ValueError:
+            if self.cache.add(self.key, now + interval, math.ceil(interval / 1000) + 1):
+                return now + interval
+            try:
+                full_at = self.cache.incr(self.key, interval)
+            except ValueError:
+                return None
+        if full_at < now + interval:
+            # The entry outlived a full bucket, which holds no extra tokens.
+            # Moved forward with incr too: concurrent requests may push it
+            # past now + their tokens, never behind.
+            try:
+                full_at = self.cache.incr(self.key, now + interval - full_at)
+            except ValueError:
+                return None
+        return full_at
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """
+    TokenBucketThrottle with the rate of the view's ``throttle_scope``
+    (plus ``scope_suffix``), as ScopedRateThrottle does.
+    """
+    scope_suffix = ''
+
+    def __init__(self):
+        # The rate is only known once the view is, see allow_request
+        pass
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return True
+
+        self.scope = scope + self.scope_suffix
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+
+class ClientThrottle(ScopedTokenBucketThrottle):
+    """Per client IP address (see NUM_PROXIES behind a proxy)."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UsernameThrottle(ScopedTokenBucketThrottle):
+    """
+    Per username sent in the request body, whichever clients send it:
+    guessing one account's password from many addresses is throttled too.
+    """
+    scope_suffix = '_username'
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username') if isinstance(request.data, Mapping) else None
+        if not isinstance(username, str) or not username.strip():
+            return None
+        # Any text can be sent, keep the key memcached safe
+        ident = hashlib.sha256(username.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class WindowThrottle(SimpleRateThrottle):
+    """
+    Counts requests per window of the rate's period with an atomic cache
+    incr: one round trip per request, and every worker shares the count.
+
+    Fixed windows let a client send twice the rate across a window
+    boundary. With ``sliding``, the count of the previous window is added,
+    weighted by how much of it the last period still covers; that count
+    no longer changes, so each process reads it once.
+
+    Refused requests are counted too, a client ignoring Retry-After stays
+    throttled. When the cache is unreachable requests are let through.
+    """
+    sliding = False
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        window, elapsed = divmod(self.timer(), self.duration)
+        current = self.increment(f'{self.key}:{window:.0f}')
+        previous = self.closed_count(f'{self.key}:{window - 1:.0f}') if self.sliding else 0
+        return self.allow(current, previous, elapsed)
+
+    def allow(self, current, previous, elapsed):
+        count = current + previous * (1 - elapsed / self.duration)
+        if count <= self.num_requests:
+            return True
+        self.wait_seconds = self.duration - elapsed
+        if current <= self.num_requests:
+            # Until the share of the previous window has dropped enough
+            self.wait_seconds = min(self.wait_seconds, (count - self.num_requests) / previous * self.duration)
+        return False
+
+    def increment(self, key):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            pass
+        # First request of the window, unless a concurrent one added it.
+        # Kept for two periods, the next window reads it when sliding.
+        if self.cache.add(key, 1, self.duration * 2):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            return 0
+
+    def closed_count(self, key):
+        if key not in _closed_windows:
+            self.remember(key, self.cache.get(key, 0))
+        return _closed_windows[key]
+
+    @staticmethod
+    def remember(key, count):
+        if len(_closed_windows) >= _CLOSED_WINDOWS_MAX:
+            _closed_windows.clear()
+        _closed_windows[key] = count
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class MerchantThrottle(WindowThrottle):
+    """
+    Sliding window per merchant and endpoint group, the rates
+    ``merchant_<group>``. The group is the view's ``throttle_group``
+    ('bulk' for the bulk, import and export endpoints), otherwise 'read'
+    for safe methods and 'write' for the others.
+
+    Users without a merchant are counted on their own, anonymous requests
+    per client IP.
+    """
+    sliding = True
+
+    def __init__(self):
+        # The rate is only known once the view is, see allow_request
+        pass
+
+    def allow_request(self, request, view):
+        group = getattr(view, 'throttle_group', None) or ('read' if request.method in SAFE_METHODS else 'write')
+        self.scope = f'merchant_{group}'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        merchant = get_request_merchant(request)
+        if merchant is not None:
+            ident = f'merchant:{merchant.pk}'
+        elif request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
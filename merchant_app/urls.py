@@ -21,6 +21,8 @@ from django.conf.urls.static import static
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from core.media.storage import BLOB_PREFIX
+from core.media.views import serve_blob
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -39,8 +41,13 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('core.accounts.urls')),
     path('api/merchants/', include('core.merchants.urls')),
+    path('api/tasks/', include('core.tasks.urls')),
+    # Async read-only variants of the hot list/detail endpoints, for ASGI
+    path('api/async/merchants/', include('core.merchants.async_urls')),
+    path('api/async/', include('core.products.async_urls')),
     path('api/', include('core.products.urls')),
     path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path(f"{settings.MEDIA_URL.lstrip('/')}{BLOB_PREFIX}/<path:path>", serve_blob, name='media-blob'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)